@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from fastapi import APIRouter, HTTPException, Query
 from services.audio_processing import convert_video_to_mp3, transcribe_audio_to_text
@@ -15,10 +16,10 @@ async def convert_to_mp3(report_id: str = Query(...), video_path: str = Query(No
         
         # If video_path is provided, pass it to the conversion function
         if video_path:
-            output_audio_path = convert_video_to_mp3(report_id, video_path)
+            output_audio_path = await asyncio.to_thread(convert_video_to_mp3, report_id, video_path)
         else:
             # Fallback to original behavior where it finds the video using report_id
-            output_audio_path = convert_video_to_mp3(report_id)
+            output_audio_path = await asyncio.to_thread(convert_video_to_mp3, report_id)
             
         return {"message": f"Successfully converted video to MP3. File saved at: {output_audio_path}"}
 
@@ -37,7 +38,7 @@ async def convert_to_mp3(report_id: str = Query(...), video_path: str = Query(No
 async def transcribe(report_id: str = Query(...)):
     try:
         logger.info(f"Transcribing audio for report ID: {report_id}")
-        transcription = transcribe_audio_to_text(report_id)
+        transcription = await asyncio.to_thread(transcribe_audio_to_text, report_id)
         return {"transcription": transcription}
 
     except FileNotFoundError as e:
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from pydantic import BaseModel
+from typing import Dict, List, Optional
 from services.auth_service import get_current_user_id
-from services import storage_service, pose_analysis_service
+from services import storage_service, pose_analysis_service, worker_pool
 import os
 import logging
 
@@ -8,6 +10,12 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Body Language Analysis"])
 
+class RescoreRequest(BaseModel):
+    report_ids: Optional[List[str]] = None  # Defaults to every report of the caller with stored landmarks
+    thresholds: Dict[str, float] = {}  # Posture rule threshold overrides, by rule name
+    issue_threshold: float = pose_analysis_service.ISSUE_THRESHOLD_PERCENT
+    update_database: bool = False
+
 @router.get("/score")
 async def get_body_language_score(
     report_id: str = Query(..., description="Report ID"), 
@@ -83,7 +91,10 @@ async def analyze_video(report_id: str = Query(...), video_path: str = Query(Non
         # Generate simplified body language report
         print(f"[2/3] Analyzing body language...")
         try:
-            report_file = pose_analysis_service.generate_posture_report(video_path, report_id)
+            # Run the CPU-bound video analysis in the analysis process pool
+            report_file = await worker_pool.run_in_worker(
+                pose_analysis_service.generate_posture_report, video_path, report_id
+            )
             print(f"[3/3] Saving analysis results...")
             print(f"✓ BODY LANGUAGE ANALYSIS: Completed for report {report_id}")
         except Exception as e:
@@ -97,3 +108,68 @@ async def analyze_video(report_id: str = Query(...), video_path: str = Query(Non
     except Exception as e:
         logger.error(f"Body language analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Body language analysis failed: {str(e)}")
+
+def _get_user_report_ids(user_id):
+    response = storage_service.supabase.table("UserReport") \
+        .select("reportId") \
+        .eq("userId", user_id) \
+        .execute()
+    return [row["reportId"] for row in response.data or []]
+
+@router.post("/rescore")
+async def rescore_body_language(request: RescoreRequest, user_id: str = Depends(get_current_user_id)):
+    """
+    Recompute body language scores from stored landmarks, without the video.
+    
+    Lets posture rule thresholds be tuned and applied to past reports in
+    bulk. With update_database the new scores replace the stored ones.
+    Only the caller's own reports can be re-scored; re-scoring every
+    archived report is left to dev_tools/rescore_body_language.py.
+    
+    Parameters:
+    - report_ids: Reports to re-score, by default every report of the caller with stored landmarks
+    
+    Returns:
+    - Per-report score, detection rate and issues (or an error message)
+    """
+    try:
+        user_report_ids = _get_user_report_ids(user_id)
+    except Exception as e:
+        logger.error(f"Could not list reports of user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    if request.report_ids is None:
+        archived = set(pose_analysis_service.list_archived_reports())
+        report_ids = [report_id for report_id in user_report_ids if report_id in archived]
+    else:
+        if set(request.report_ids) - set(user_report_ids):
+            raise HTTPException(status_code=403, detail="You don't have access to this report")
+        report_ids = request.report_ids
+    
+    try:
+        results = await worker_pool.run_in_worker(
+            pose_analysis_service.rescore_reports,
+            report_ids,
+            request.thresholds,
+            request.issue_threshold,
+            request.update_database
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Body language re-scoring failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Body language re-scoring failed: {str(e)}")
+    
+    reports = {}
+    for report_id, result in results.items():
+        if 'error' in result and 'score' not in result:
+            reports[report_id] = {"error": result['error']}
+        else:
+            reports[report_id] = {
+                "scoreBodyLanguage": result['score'],
+                "detectionRate": result['detection_rate'],
+                "weaknessTopicsBodylan": result['issues']
+            }
+    
+    failed = sum(1 for result in reports.values() if "error" in result)
+    return {"rescored": len(reports) - failed, "failed": failed, "reports": reports}
@@ -6,6 +6,7 @@ from models.user_report_model import UserReport
 from services import storage_service
 import datetime
 from fastapi import status
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,7 +41,7 @@ async def analyze_context(transcription: str, report_id: str):
         
         # Get session data for better context analysis
         try:
-            session_data = analyzer.get_session_data(report_id)
+            session_data = await asyncio.to_thread(analyzer.get_session_data, report_id)
         except Exception as e:
             print(f"! Warning: Error retrieving session data: {str(e)}")
             logger.warning(f"Session data retrieval error: {str(e)}")
@@ -60,7 +61,9 @@ async def analyze_context(transcription: str, report_id: str):
             
         # Call the Gemini service to analyze context with session data
         print(f"[2/3] Running context analysis with AI...")
-        context_results = analyzer.analyze_presentation(
+        # Run the blocking Gemini call off the event loop
+        context_results = await asyncio.to_thread(
+            analyzer.analyze_presentation,
             transcription=transcription, 
             report_id=report_id,
             session_data=session_data
@@ -6,6 +6,7 @@ import datetime
 import uuid
 from fastapi import status
 from services.auth_service import get_current_user_id
+import asyncio
 import logging
 
 # Configure standard logging
@@ -43,7 +44,7 @@ async def analyze_grammar(text: str, report_id: str):
             
         # Analyze grammar with the service
         print(f"[2/3] Running grammar analysis with AI...")
-        grammar_results = analyzer.analyze_grammar(text)
+        grammar_results = await asyncio.to_thread(analyzer.analyze_grammar, text)
         
         # Format the results for storage
         score = grammar_results.get("score", 0)
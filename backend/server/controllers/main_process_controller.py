@@ -1,14 +1,16 @@
 from fastapi import APIRouter, HTTPException, Query
 import os
+import asyncio
 from supabase import create_client, Client
 import logging
 import httpx
 from urllib.parse import urlparse, unquote
 
 # Import the correct audio processing services
-from services.audio_processing import convert_video_to_mp3, transcribe_audio_to_text
+from services.audio_processing import extract_audio, transcribe_audio_to_text, load_transcript
 # Import the task assignment controller
 from controllers.task_assign_controller import assign_challenges_endpoint
+from services import job_queue_service
 
 # Set up standard logging
 logger = logging.getLogger(__name__)
@@ -19,146 +21,223 @@ supabase_url = os.environ.get("SUPABASE_URL")
 supabase_key = os.environ.get("SUPABASE_KEY")
 supabase: Client = create_client(supabase_url, supabase_key)
 
+# Stage dependency graph.
+#   requires: stages that must succeed first (their output is this stage's input)
+#   after:    stages that only need to have finished, successfully or not
+# Body language only needs the video, so it runs alongside audio extraction and
+# transcription; context, grammar and voice all start once the transcript exists.
+PIPELINE_STAGES = {
+    "download": {"label": "Video download", "requires": [], "after": []},
+    "audio_conversion": {"label": "Audio conversion", "requires": ["download"], "after": []},
+    "transcription": {"label": "Transcription", "requires": ["audio_conversion"], "after": []},
+    "body_language": {"label": "Body language analysis", "requires": ["download"], "after": []},
+    "context": {"label": "Context analysis", "requires": ["transcription"], "after": []},
+    "grammar": {"label": "Grammar analysis", "requires": ["transcription"], "after": []},
+    # Voice can transcribe on its own, but waits for the shared transcript when there is one
+    "voice": {"label": "Voice analysis", "requires": ["audio_conversion"], "after": ["transcription"]},
+    "task_assignment": {
+        "label": "Task assignment",
+        "requires": [],
+        "after": ["body_language", "context", "grammar", "voice"]
+    }
+}
+
 @router.post("/")
 async def process_video(video_url: str, report_id: str = Query(...)):
     """
-    Process video and generate complete analysis by coordinating all analysis services.
+    Queue a video for complete analysis and return immediately.
+
+    The analysis stages run on the background job workers. Poll
+    GET /api/process/jobs/{job_id} for per-stage status, timings and errors.
     """
-    errors = []  # Track errors but continue processing
-    
     try:
-        # Better step logging with visual separators
-        print("\n" + "=" * 60)
-        print(f"STARTING PROCESS: Video analysis for report {report_id}")
-        print("=" * 60)
-        
-        logger.info(f"Starting video processing for report {report_id}")
-        
-        # 1. Download video from Supabase storage
-        print("\n[STEP 1/8] Downloading video from URL...")
-        local_video_path = await download_from_supabase(video_url, report_id)
-        print(f"✓ Video downloaded to {local_video_path}")
-        
-        # 2. Convert to MP3 - direct service call
-        try:
-            print("\n[STEP 2/8] Converting video to audio...")
-            audio_path = convert_video_to_mp3(report_id, local_video_path)
-            print(f"✓ Converted video to audio: {audio_path}")
-        except Exception as e:
-            error_msg = f"Audio conversion failed: {str(e)}"
-            print(f"✗ Audio conversion error: {str(e)}")
-            logger.error(error_msg)
-            errors.append(error_msg)
-            audio_path = None
-        
-        # 3. Transcribe - direct service call
-        transcription = ""
-        try:
-            if audio_path:
-                print("\n[STEP 3/8] Transcribing audio...")
-                transcription = transcribe_audio_to_text(report_id)
-                print(f"✓ Transcription complete: {len(transcription)} characters")
-        except Exception as e:
-            error_msg = f"Transcription failed: {str(e)}"
-            print(f"✗ Transcription error: {str(e)}")
-            logger.error(error_msg)
-            errors.append(error_msg)
-            print("! Warning: Proceeding with empty transcription")
-        
-        # 4. Analyze body language
-        try:
-            print("\n[STEP 4/8] Analyzing body language...")
-            from controllers.body_language_analysis_controller import analyze_video
-            body_language_result = await analyze_video(report_id=report_id, video_path=local_video_path)
-            print(f"✓ Body language analysis complete")
-        except Exception as e:
-            error_msg = f"Body language analysis failed: {str(e)}"
-            print(f"✗ Body language analysis error: {str(e)}")
-            logger.error(error_msg)
-            errors.append(error_msg)
-        
-        # 5. Analyze context
-        if transcription:
-            print("\n[STEP 5/8] Analyzing context...")
-            try:
-                from controllers.context_analysis_controller import analyze_context
-                context_result = await analyze_context(transcription=transcription, report_id=report_id)
-                print(f"✓ Context analysis complete")
-            except Exception as e:
-                error_msg = f"Context analysis failed: {str(e)}"
-                print(f"✗ Context analysis error: {str(e)}")
-                logger.error(error_msg)
-                errors.append(error_msg)
-        else:
-            print("\n! Warning: Skipping context analysis - no transcription available")
-            
-        # 6. Analyze grammar
-        if transcription:
-            print("\n[STEP 6/8] Analyzing grammar...")
-            try:
-                from controllers.grammar_analysis_controller import analyze_grammar
-                grammar_result = await analyze_grammar(text=transcription, report_id=report_id)
-                print(f"✓ Grammar analysis complete")
-            except Exception as e:
-                error_msg = f"Grammar analysis failed: {str(e)}"
-                print(f"✗ Grammar analysis error: {str(e)}")
-                logger.error(error_msg)
-                errors.append(error_msg)
-        else:
-            print("\n! Warning: Skipping grammar analysis - no transcription available")
-        
-        # 7. Analyze voice characteristics
-        if audio_path:
-            print("\n[STEP 7/8] Analyzing voice...")
-            try:
-                from controllers.voice_analysis_controller import analyze_voice
-                voice_result = await analyze_voice(report_id=report_id)
-                print(f"✓ Voice analysis complete")
-            except Exception as e:
-                error_msg = f"Voice analysis failed: {str(e)}"
-                print(f"✗ Voice analysis error: {str(e)}")
-                logger.error(error_msg)
-                errors.append(error_msg)
-        else:
-            print("\n! Warning: Skipping voice analysis - no audio file available")
-        
-        # 8. Assign challenges based on analysis
-        print("\n[STEP 8/8] Assigning tasks...")
+        job = job_queue_service.create_job(report_id, PIPELINE_STAGES)
+        await job_queue_service.enqueue_job(job, run_process_pipeline, video_url, report_id)
+        logger.info(f"Queued video processing job {job['job_id']} for report {report_id}")
+
+        return {
+            "message": "Video queued for processing.",
+            "report_id": report_id,
+            "job_id": job["job_id"],
+            "status": job["status"]
+        }
+
+    except Exception as e:
+        logger.error(f"Error queueing video processing: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}")
+async def get_process_job(job_id: str):
+    """
+    Get the status of a video processing job, including per-stage status,
+    timings and errors.
+    """
+    job = job_queue_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job_queue_service.job_status(job)
+
+async def run_stage_graph(job: dict, stages: dict, stage_functions: dict, context: dict):
+    """
+    Run pipeline stages as soon as their dependencies allow.
+
+    Every stage is started as its own task which first waits for the stages it
+    depends on, so independent stages run concurrently and total latency is the
+    longest dependency path rather than the sum of all stages. A stage whose
+    required stages did not succeed is skipped; a failing stage does not stop
+    stages that do not need its output.
+
+    Args:
+        job: Job dict used to record stage status
+        stages: Dependency graph (see PIPELINE_STAGES)
+        stage_functions: Stage name -> coroutine function taking the context dict
+        context: Shared dict stages read their inputs from and write outputs to
+
+    Returns:
+        Dict of stage name -> True if the stage succeeded
+    """
+    _validate_stage_graph(stages)
+    tasks = {}
+
+    async def run_stage(name):
+        spec = stages[name]
+        required = await asyncio.gather(*(get_task(dep) for dep in spec["requires"]))
+        await asyncio.gather(*(get_task(dep) for dep in spec["after"]))
+
+        if not all(required):
+            missing = [dep for dep, ok in zip(spec["requires"], required) if not ok]
+            print(f"\n! Warning: Skipping {spec.get('label', name)} - required stage(s) did not succeed: {', '.join(missing)}")
+            job_queue_service.skip_stage(job, name, f"Required stage(s) did not succeed: {', '.join(missing)}")
+            return False
+
+        job_queue_service.start_stage(job, name)
         try:
-            challenge_assignment = await assign_challenges_endpoint(report_id=report_id)
-            print(f"✓ Tasks assigned successfully")
+            await stage_functions[name](context)
         except Exception as e:
-            error_msg = f"Task assignment failed: {str(e)}"
-            print(f"✗ Task assignment error: {str(e)}")
+            error_msg = f"{spec.get('label', name)} failed: {getattr(e, 'detail', str(e))}"
+            print(f"✗ {error_msg}")
             logger.error(error_msg)
-            errors.append(error_msg)
-            
-        # Return results with any errors that occurred
-        print("\n" + "=" * 60)
-        if errors:
-            print(f"PROCESS COMPLETED WITH {len(errors)} ERRORS:")
-            for i, error in enumerate(errors, 1):
-                print(f"  Error {i}: {error}")
-        else:
-            print("PROCESS COMPLETED SUCCESSFULLY!")
-        print("=" * 60 + "\n")
-        
-        if errors:
-            return {
-                "message": "Video processed with some errors",
-                "report_id": report_id,
-                "errors": errors
-            }
-        else:
-            return {
-                "message": "Video processed and analyzed successfully.",
-                "report_id": report_id
-            }
-        
-    except Exception as e:
-        print(f"\n✗ CRITICAL ERROR: {str(e)}")
-        logger.error(f"Error processing video: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+            job_queue_service.fail_stage(job, name, error_msg)
+            return False
+        job_queue_service.complete_stage(job, name)
+        return True
+
+    def get_task(name):
+        if name not in tasks:
+            tasks[name] = asyncio.ensure_future(run_stage(name))
+        return tasks[name]
+
+    results = await asyncio.gather(*(get_task(name) for name in stages))
+    return dict(zip(stages, results))
+
+def _validate_stage_graph(stages: dict):
+    """Raise ValueError if a stage depends on an unknown stage or the graph has a cycle"""
+    visiting, done = set(), set()
+
+    def visit(name, path):
+        if name not in stages:
+            raise ValueError(f"Unknown pipeline stage: {name}")
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline stage cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in stages[name]["requires"] + stages[name]["after"]:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for name in stages:
+        visit(name, [])
+
+async def _stage_download(context: dict):
+    print("\n[STAGE] Downloading video from URL...")
+    context["video_path"] = await download_from_supabase(context["video_url"], context["report_id"])
+    print(f"✓ Video downloaded to {context['video_path']}")
+
+async def _stage_audio_conversion(context: dict):
+    print("\n[STAGE] Extracting audio from video...")
+    context["audio_path"] = await asyncio.to_thread(
+        extract_audio, context["report_id"], context["video_path"]
+    )
+    print(f"✓ Extracted 16 kHz audio: {context['audio_path']}")
+
+async def _stage_transcription(context: dict):
+    print("\n[STAGE] Transcribing audio...")
+    await asyncio.to_thread(transcribe_audio_to_text, context["report_id"])
+    # Downstream stages share the stored transcript from this single ASR pass
+    context["transcript"] = load_transcript(context["report_id"])
+    print(f"✓ Transcription complete: {len(context['transcript']['text'])} characters")
+
+async def _stage_body_language(context: dict):
+    print("\n[STAGE] Analyzing body language...")
+    from controllers.body_language_analysis_controller import analyze_video
+    await analyze_video(report_id=context["report_id"], video_path=context["video_path"])
+    print(f"✓ Body language analysis complete")
+
+async def _stage_context(context: dict):
+    print("\n[STAGE] Analyzing context...")
+    from controllers.context_analysis_controller import analyze_context
+    await analyze_context(transcription=context["transcript"]["text"], report_id=context["report_id"])
+    print(f"✓ Context analysis complete")
+
+async def _stage_grammar(context: dict):
+    print("\n[STAGE] Analyzing grammar...")
+    from controllers.grammar_analysis_controller import analyze_grammar
+    await analyze_grammar(text=context["transcript"]["text"], report_id=context["report_id"])
+    print(f"✓ Grammar analysis complete")
+
+async def _stage_voice(context: dict):
+    print("\n[STAGE] Analyzing voice...")
+    from controllers.voice_analysis_controller import analyze_voice
+    await analyze_voice(report_id=context["report_id"])
+    print(f"✓ Voice analysis complete")
+
+async def _stage_task_assignment(context: dict):
+    print("\n[STAGE] Assigning tasks...")
+    await assign_challenges_endpoint(report_id=context["report_id"])
+    print(f"✓ Tasks assigned successfully")
+
+STAGE_FUNCTIONS = {
+    "download": _stage_download,
+    "audio_conversion": _stage_audio_conversion,
+    "transcription": _stage_transcription,
+    "body_language": _stage_body_language,
+    "context": _stage_context,
+    "grammar": _stage_grammar,
+    "voice": _stage_voice,
+    "task_assignment": _stage_task_assignment
+}
+
+async def run_process_pipeline(job: dict, video_url: str, report_id: str):
+    """
+    Process video and generate complete analysis by coordinating all analysis services.
+    Runs on a job worker; stage progress is recorded on the job.
+    """
+    # Better step logging with visual separators
+    print("\n" + "=" * 60)
+    print(f"STARTING PROCESS: Video analysis for report {report_id} (job {job['job_id']})")
+    print("=" * 60)
+    
+    logger.info(f"Starting video processing for report {report_id}")
+    
+    context = {"video_url": video_url, "report_id": report_id}
+    results = await run_stage_graph(job, PIPELINE_STAGES, STAGE_FUNCTIONS, context)
+    
+    # Summarize any errors that occurred
+    errors = job["errors"]
+    print("\n" + "=" * 60)
+    if errors:
+        print(f"PROCESS COMPLETED WITH {len(errors)} ERRORS:")
+        for i, error in enumerate(errors, 1):
+            print(f"  Error {i}: {error}")
+    else:
+        print("PROCESS COMPLETED SUCCESSFULLY!")
+    print("=" * 60 + "\n")
+    
+    # Without the video nothing could be analyzed
+    if not results["download"]:
+        raise RuntimeError(errors[0] if errors else "Video download failed")
 
 async def download_from_supabase(video_url: str, report_id: str) -> str:
     """Download video from Supabase storage to local temp directory"""
@@ -5,26 +5,46 @@ import logging
 
 router = APIRouter(tags=["Report"])
 
+REPORT_COLUMNS = [
+    "scoreContext",
+    "weaknessTopicsContext",
+    "scoreGrammar",
+    "weaknessTopicsGrammar",
+    "scoreBodyLanguage",
+    "weaknessTopicsBodylan",
+    "scoreVoice",
+    "weaknessTopicsVoice"
+]
+
+# Columns added after the original UserReport schema. Until a database has
+# them, reports are served without these sections instead of failing.
+OPTIONAL_REPORT_COLUMNS = [
+    "scoreFacial",
+    "weaknessTopicsFacial"
+]
+
+def _fetch_report(report_id):
+    """Select the report columns, retrying without the optional ones if the table lacks them"""
+    table = storage_service.supabase.table("UserReport")
+    try:
+        return table.select(*REPORT_COLUMNS, *OPTIONAL_REPORT_COLUMNS).eq("reportId", report_id).execute()
+    except Exception as e:
+        if not any(column in str(e) for column in OPTIONAL_REPORT_COLUMNS):
+            raise
+        logging.warning(f"UserReport has no facial columns yet, serving report without them: {e}")
+        return table.select(*REPORT_COLUMNS).eq("reportId", report_id).execute()
+
 @router.get("")
 async def get_complete_report(
     report_id: str = Query(..., description="Report ID"), 
     user_id: str = Depends(get_current_user_id)):
     """
-    Get complete report data including context, grammar, body language and voice analysis
+    Get complete report data including context, grammar, body language, voice and facial analysis
     in a single API call
     """
     try:
         # Fetch all report data at once
-        response = storage_service.supabase.table("UserReport").select(
-            "scoreContext",
-            "weaknessTopicsContext",
-            "scoreGrammar",
-            "weaknessTopicsGrammar",
-            "scoreBodyLanguage",
-            "weaknessTopicsBodylan",
-            "scoreVoice",
-            "weaknessTopicsVoice"
-        ).eq("reportId", report_id).execute()
+        response = _fetch_report(report_id)
         
         if not response.data or len(response.data) == 0:
             raise HTTPException(status_code=404, detail="Report not found")
@@ -48,6 +68,10 @@ async def get_complete_report(
             "voice": {
                 "scoreVoice": report_data.get("scoreVoice"),
                 "weaknessTopics": report_data.get("weaknessTopicsVoice", [])
+            },
+            "facial": {
+                "scoreFacial": report_data.get("scoreFacial"),
+                "weaknessTopics": report_data.get("weaknessTopicsFacial", [])
             }
         }
         
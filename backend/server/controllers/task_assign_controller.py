@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List
 from services.task_assign_service import *
 from services.auth_service import get_current_user_id
+import asyncio
 import logging
 
 router = APIRouter()
@@ -29,7 +30,7 @@ class TaskUpdateRequest(BaseModel):
 @router.post("/assign_challenges", response_model=ReportAssignmentResponse)
 async def assign_challenges_endpoint(report_id: str):
     try:       
-        challenge_ids = assign_challenges_for_report(report_id)
+        challenge_ids = await asyncio.to_thread(assign_challenges_for_report, report_id)
         return ReportAssignmentResponse(report_id=report_id, assigned_challenge_ids=challenge_ids)
     except Exception as e:
         logging.error(f"Error in /assign-challenges: {e}")
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from services.auth_service import get_current_user_id
 from services import storage_service
-from services.whisper_service import analyze_speech, transcribe_audio
+from services.whisper_service import analyze_speech
+from services.audio_processing import transcribe_audio_to_text, load_transcript, get_transcript_path, get_audio_path
 import os
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -70,28 +72,23 @@ async def analyze_voice(report_id: str = Query(...)):
         print("-" * 60)
         
         # Check if audio file exists
-        audio_path = f"tmp/{report_id}/audio/audio.mp3"
+        audio_path = get_audio_path(report_id)
         if not os.path.exists(audio_path):
             raise HTTPException(status_code=404, detail=f"Audio file not found at: {audio_path}")
             
-        # Get transcription from file if exists, otherwise run transcription
-        transcription_path = f"tmp/{report_id}/transcription/transcription.txt"
-        if (os.path.exists(transcription_path)):
-            print(f"[1/3] Using existing transcription from: {transcription_path}")
-            with open(transcription_path, 'r', encoding='utf-8') as f:
-                transcription = f.read()
+        # Use the stored transcript (text + segments) if the report was already
+        # transcribed, otherwise run the single ASR pass that stores it
+        transcript = load_transcript(report_id)
+        if transcript:
+            print(f"[1/3] Using existing transcript from: {get_transcript_path(report_id)}")
         else:
             print(f"[1/3] Transcribing audio from: {audio_path}")
-            transcription, _ = transcribe_audio(audio_path, report_id)
-            # Save transcription
-            os.makedirs(os.path.dirname(transcription_path), exist_ok=True)
-            with open(transcription_path, 'w', encoding='utf-8') as f:
-                f.write(transcription)
+            await asyncio.to_thread(transcribe_audio_to_text, report_id)
+            transcript = load_transcript(report_id)
         
         # Analyze voice characteristics
         print(f"[2/3] Analyzing voice characteristics...")
-        _, segments = transcribe_audio(audio_path, report_id)
-        analysis_results = analyze_speech(segments, transcription)
+        analysis_results = analyze_speech(transcript["segments"], transcript["text"])
         
         # Create report directory if it doesn't exist
         report_dir = f"tmp/{report_id}/reports"
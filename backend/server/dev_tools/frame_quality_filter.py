@@ -5,6 +5,8 @@ import os
 import argparse
 import math
 
+from services.frame_source import FrameSource
+
 def assess_frame_quality(frame, min_brightness=40, min_contrast=30, blur_threshold=100):
     """
     Assess the quality of a frame based on brightness, contrast, and blur.
@@ -85,46 +87,29 @@ def detect_motion_blur(frame, prev_frame, motion_threshold=25):
     # If there's significant motion AND the frame is blurry, it's likely motion blur
     return mean_diff > motion_threshold and blur_score < 100
 
-def filter_video_frames(video_path, output_folder, quality_threshold=0.6, sample_rate=1):
+class FrameQualityFilter:
     """
-    Filter video frames based on quality metrics and save good frames.
-    
-    Args:
-        video_path: Path to input video
-        output_folder: Folder to save filtered frames
-        quality_threshold: Fraction of quality checks that must pass (0.0-1.0)
-        sample_rate: Process every Nth frame (1 = all frames)
-        
-    Returns:
-        Dict with filtering statistics
+    Frame analyzer for a FrameSource that saves frames passing the quality checks.
     """
-    if not os.path.exists(video_path):
-        raise FileNotFoundError(f"Video not found: {video_path}")
-        
-    os.makedirs(output_folder, exist_ok=True)
-    
-    # Open video
-    cap = cv2.VideoCapture(video_path)
-    frame_count = 0
-    good_frames = 0
-    prev_frame = None
-    
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        frame_count += 1
-        
-        # Skip frames according to sample rate
-        if frame_count % sample_rate != 0:
-            continue
+    
+    def __init__(self, output_folder, quality_threshold=0.6):
+        os.makedirs(output_folder, exist_ok=True)
+        self.output_folder = output_folder
+        self.quality_threshold = quality_threshold
+        self.processed_frames = 0
+        self.good_frames = 0
+        self.prev_gray = None
+    
+    def process_frame(self, frame):
+        self.processed_frames += 1
+        frame_count = frame.frame_number
+        output_folder = self.output_folder
         
-        # Assess frame quality
-        quality = assess_frame_quality(frame)
+        # Assess frame quality on the shared grayscale image
+        quality = assess_frame_quality(frame.gray)
         
         # Check for motion blur
-        has_motion_blur = detect_motion_blur(frame, prev_frame)
+        has_motion_blur = detect_motion_blur(frame.gray, self.prev_gray)
         
         # Calculate overall quality score
         quality_checks = [
@@ -132,20 +117,20 @@ def filter_video_frames(video_path, output_folder, quality_threshold=0.6, sample
             quality["passes_contrast"],
             quality["passes_blur"]
         ]
-        if prev_frame is not None:
+        if self.prev_gray is not None:
             quality_checks.append(not has_motion_blur)
             
         quality_score = sum(1 for check in quality_checks if check) / len(quality_checks)
-        frame_passes = quality_score >= quality_threshold
+        frame_passes = quality_score >= self.quality_threshold
         
         # Save frame if it passes quality threshold
         if frame_passes:
-            good_frames += 1
+            self.good_frames += 1
             frame_filename = f"{output_folder}/frame_{frame_count:04d}.jpg"
-            cv2.imwrite(frame_filename, frame)
+            cv2.imwrite(frame_filename, frame.bgr)
             
             # Add quality info to frame
-            annotated_frame = frame.copy()
+            annotated_frame = frame.bgr.copy()
             cv2.putText(
                 annotated_frame,
                 f"Quality: {quality_score:.2f}",
@@ -176,33 +161,54 @@ def filter_video_frames(video_path, output_folder, quality_threshold=0.6, sample
             cv2.imwrite(f"{output_folder}/annotated_frame_{frame_count:04d}.jpg", metrics_frame)
         
         # Store current frame for next iteration
-        prev_frame = frame
+        self.prev_gray = frame.gray
     
-    # Release video
-    cap.release()
+    def write_stats(self, video_path):
+        """Write filter_stats.txt and return the filtering statistics"""
+        good_frame_rate = self.good_frames / self.processed_frames if self.processed_frames > 0 else 0
+        
+        stats = {
+            "total_frames_processed": self.processed_frames,
+            "good_frames": self.good_frames,
+            "good_frame_rate": good_frame_rate,
+            "quality_threshold": self.quality_threshold
+        }
+        
+        # Save statistics
+        with open(f"{self.output_folder}/filter_stats.txt", "w") as f:
+            f.write("Frame Filtering Statistics\n")
+            f.write("=======================\n\n")
+            f.write(f"Video: {video_path}\n")
+            f.write(f"Total frames processed: {stats['total_frames_processed']}\n")
+            f.write(f"Good frames: {stats['good_frames']}\n")
+            f.write(f"Good frame rate: {stats['good_frame_rate']:.2f}\n")
+            f.write(f"Quality threshold: {stats['quality_threshold']}\n")
+        
+        print(f"Frame filtering complete. {self.good_frames} good frames saved to {self.output_folder}/")
+        return stats
+
+def filter_video_frames(video_path, output_folder, quality_threshold=0.6, sample_rate=1):
+    """
+    Filter video frames based on quality metrics and save good frames.
     
-    # Calculate statistics
-    good_frame_rate = good_frames / (frame_count / sample_rate) if frame_count > 0 else 0
+    Args:
+        video_path: Path to input video
+        output_folder: Folder to save filtered frames
+        quality_threshold: Fraction of quality checks that must pass (0.0-1.0)
+        sample_rate: Process every Nth frame (1 = all frames)
+        
+    Returns:
+        Dict with filtering statistics
+    """
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video not found: {video_path}")
     
-    stats = {
-        "total_frames_processed": frame_count // sample_rate,
-        "good_frames": good_frames,
-        "good_frame_rate": good_frame_rate,
-        "quality_threshold": quality_threshold
-    }
+    # Keep full resolution when filtering on its own so saved frames are not downscaled
+    source = FrameSource(video_path, max_width=None)
+    quality_filter = source.register(FrameQualityFilter(output_folder, quality_threshold), every=sample_rate)
+    source.run()
     
-    # Save statistics
-    with open(f"{output_folder}/filter_stats.txt", "w") as f:
-        f.write("Frame Filtering Statistics\n")
-        f.write("=======================\n\n")
-        f.write(f"Video: {video_path}\n")
-        f.write(f"Total frames processed: {stats['total_frames_processed']}\n")
-        f.write(f"Good frames: {stats['good_frames']}\n")
-        f.write(f"Good frame rate: {stats['good_frame_rate']:.2f}\n")
-        f.write(f"Quality threshold: {stats['quality_threshold']}\n")
-    
-    print(f"Frame filtering complete. {good_frames} good frames saved to {output_folder}/")
-    return stats
+    return quality_filter.write_stats(video_path)
 
 def main():
     parser = argparse.ArgumentParser(description="Filter video frames based on quality")
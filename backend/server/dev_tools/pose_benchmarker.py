@@ -12,8 +12,15 @@ from concurrent.futures import ProcessPoolExecutor
 
 from utils.pose_validation import validate_pose_detection
 from utils.pose_model_validator import validate_model_accuracy
-from utils.frame_quality_filter import filter_video_frames
-from services.pose_analysis_service import analyze_posture
+from utils.frame_quality_filter import FrameQualityFilter
+from services.frame_source import FrameSource
+from services.pose_analysis_service import (
+    PoseFrameAnalyzer, summarize_posture, create_pose_graph, create_holistic_graph, SAMPLE_INTERVAL_MS
+)
+from services.facial_analysis_service import (
+    FacialAnalyzer, HeadFaceAnalyzer, create_face_mesh_graph, summarize_facial_engagement
+)
+from services.posture_rules import VISIBILITY
 
 class PoseBenchmarker:
     """
@@ -42,11 +49,18 @@ class PoseBenchmarker:
         
         benchmark_results = {}
         
-        # Step 1: Validate frame quality
-        print("\n1. Validating frame quality...")
+        # Step 1: Frame quality, pose and facial analysis share a single decode pass
+        print("\n1. Running frame quality, pose and facial analysis...")
         quality_dir = os.path.join(test_dir, "frame_quality")
-        quality_results = self._benchmark_frame_quality(video_path, quality_dir)
-        benchmark_results["frame_quality"] = quality_results
+        source = FrameSource(video_path)
+        quality_filter = source.register(FrameQualityFilter(quality_dir, quality_threshold=0.5), every=10)
+        pose_analyzer = source.register(PoseFrameAnalyzer(), every=max(1, int(source.fps)))
+        facial_analyzer = source.register(FacialAnalyzer(), every=5)
+        try:
+            source_stats = source.run()
+        finally:
+            pose_analyzer.close()
+        benchmark_results["frame_quality"] = self._benchmark_frame_quality(quality_filter, video_path)
         
         # Step 2: Find optimal model settings
         print("\n2. Finding optimal pose model settings...")
@@ -60,17 +74,16 @@ class PoseBenchmarker:
         pose_results = self._benchmark_pose_detection(video_path, pose_dir)
         benchmark_results["pose_detection"] = pose_results
         
-        # Step 4: Run full pose analysis
-        print("\n4. Running full pose analysis...")
+        # Step 4: Summarize full pose analysis
+        print("\n4. Summarizing full pose analysis...")
         analysis_dir = os.path.join(test_dir, "pose_analysis")
         os.makedirs(analysis_dir, exist_ok=True)
-        analysis_results = analyze_posture(video_path)
+        analysis_results = summarize_posture(pose_analyzer)
         
-        # Step 5: Run facial expression analysis
-        print("\n5. Running facial expression & eye contact analysis...")
+        # Step 5: Summarize facial expression analysis
+        print("\n5. Summarizing facial expression & eye contact analysis...")
         try:
-            from services.facial_analysis_service import analyze_facial_engagement
-            facial_results = analyze_facial_engagement(video_path)
+            facial_results = summarize_facial_engagement(facial_analyzer.metrics, source_stats["frame_count"])
             analysis_results["facial_analysis"] = facial_results
             
             benchmark_results["facial_analysis"] = {
@@ -101,6 +114,10 @@ class PoseBenchmarker:
             "main_issues_count": len(analysis_results.get("main_issues", []))
         }
         
+        # Step 6: Compare the Pose + FaceMesh path with holistic mode
+        print("\n6. Comparing two-model and holistic landmark paths...")
+        benchmark_results["holistic"] = self._benchmark_holistic(video_path)
+        
         # Generate summary report
         self._generate_summary_report(benchmark_results, test_dir, video_path)
         
@@ -110,11 +127,11 @@ class PoseBenchmarker:
         print(f"\nBenchmark completed. Results saved to {test_dir}")
         return benchmark_results, test_dir
         
-    def _benchmark_frame_quality(self, video_path, output_dir):
+    def _benchmark_frame_quality(self, quality_filter, video_path):
         """Benchmark frame quality."""
         try:
-            # Use the frame quality filter with a higher sample rate for efficiency
-            stats = filter_video_frames(video_path, output_dir, quality_threshold=0.5, sample_rate=10)
+            # The filter ran on every 10th frame of the shared decode pass
+            stats = quality_filter.write_stats(video_path)
             return {
                 "total_frames": stats["total_frames_processed"] * 10,  # Account for sampling rate
                 "good_frames": stats["good_frames"],
@@ -149,6 +166,14 @@ class PoseBenchmarker:
             print(f"Error during pose detection validation: {str(e)}")
             return {"error": str(e)}
     
+    def _benchmark_holistic(self, video_path):
+        """Benchmark holistic mode against the two-model path."""
+        try:
+            return compare_holistic(video_path)
+        except Exception as e:
+            print(f"Error during holistic comparison: {str(e)}")
+            return {"error": str(e)}
+    
     def _generate_summary_report(self, results, output_dir, video_path):
         """Generate a summary report of all benchmarks."""
         summary_file = os.path.join(output_dir, "benchmark_summary.txt")
@@ -231,6 +256,15 @@ class PoseBenchmarker:
                 f.write(f"Dominant expression: {facial.get('dominant_expression', 'N/A')}\n")
             f.write("\n")
             
+            # Holistic comparison summary
+            f.write("Holistic Mode vs Pose + FaceMesh\n")
+            f.write("--------------------------------\n")
+            if "error" in results.get("holistic", {}):
+                f.write(f"Error: {results['holistic']['error']}\n")
+            elif "holistic" in results:
+                f.write(format_holistic_comparison(results["holistic"]))
+            f.write("\n")
+            
             # Overall assessment
             f.write("Overall Assessment\n")
             f.write("-----------------\n")
@@ -270,15 +304,100 @@ class PoseBenchmarker:
         
         print(f"Summary report saved to {summary_file}")
 
+def _run_landmark_path(video_path, holistic):
+    """One pass over the video at the production sample interval with either landmark path"""
+    pose = create_holistic_graph() if holistic else create_pose_graph()
+    face_mesh = None if holistic else create_face_mesh_graph()
+    # The motion gate is off so both paths run inference on exactly the same frames
+    face_stage = HeadFaceAnalyzer(pose if holistic else face_mesh)
+    pose_analyzer = PoseFrameAnalyzer(pose=pose, use_motion_gate=False, face_stage=face_stage, holistic=holistic)
+    source = FrameSource(video_path)
+    source.register(pose_analyzer, interval_ms=SAMPLE_INTERVAL_MS)
+    start = time.perf_counter()
+    try:
+        source.run()
+    finally:
+        seconds = time.perf_counter() - start
+        pose.close()
+        if face_mesh:
+            face_mesh.close()
+    landmarks, _ = pose_analyzer.get_landmarks()
+    return landmarks, face_stage.metrics, seconds
+
+def compare_holistic(video_path):
+    """
+    Throughput and agreement of holistic mode against Pose + FaceMesh head crops.
+    
+    Both paths analyze the same frames. Pose agreement is the mean distance
+    between matching visible landmarks (in normalized image units) on frames
+    where both found a person; facial agreement is the share of frames with a
+    face in both paths that got the same expression and eye contact label.
+    """
+    results = {}
+    outputs = {}
+    for name, holistic in (("two_model", False), ("holistic", True)):
+        landmarks, metrics, seconds = _run_landmark_path(video_path, holistic)
+        summary = summarize_facial_engagement(metrics, len(landmarks))
+        outputs[name] = (landmarks, metrics)
+        results[name] = {
+            "frames": len(landmarks),
+            "seconds": seconds,
+            "frames_per_second": len(landmarks) / seconds if seconds else 0.0,
+            "pose_detection_rate": float(np.mean(~np.isnan(landmarks[:, 0, 0])) * 100) if len(landmarks) else 0.0,
+            "face_detected_frames": summary.get("face_detected_frames", 0),
+            "eye_contact_ratio": summary.get("eye_contact_ratio", 0),
+            "dominant_expression": summary.get("dominant_expression", "unknown")
+        }
+    
+    (pose_a, faces_a), (pose_b, faces_b) = outputs["two_model"], outputs["holistic"]
+    visible = (pose_a[..., VISIBILITY] >= 0.5) & (pose_b[..., VISIBILITY] >= 0.5)
+    distances = np.hypot(*(pose_a[..., :2] - pose_b[..., :2]).transpose(2, 0, 1))[visible]
+    results["pose_landmark_distance"] = float(distances.mean()) if distances.size else None
+    
+    frames_a = dict(zip(faces_a.column("frame").tolist(), range(len(faces_a))))
+    both = [(frames_a[frame], row) for row, frame in enumerate(faces_b.column("frame").tolist())
+            if frame in frames_a and faces_b.column("face_detected")[row] and faces_a.column("face_detected")[frames_a[frame]]]
+    if both:
+        rows_a, rows_b = map(np.array, zip(*both))
+        results["expression_agreement"] = float(np.mean(
+            faces_a.column("expression_type")[rows_a] == faces_b.column("expression_type")[rows_b]) * 100)
+        results["eye_contact_agreement"] = float(np.mean(
+            faces_a.column("looking_at_audience")[rows_a] == faces_b.column("looking_at_audience")[rows_b]) * 100)
+    results["speedup"] = results["two_model"]["seconds"] / results["holistic"]["seconds"] if results["holistic"]["seconds"] else None
+    return results
+
+def format_holistic_comparison(results):
+    """Text table of a compare_holistic result"""
+    rows = [[name, stats["frames"], f"{stats['seconds']:.2f}", f"{stats['frames_per_second']:.1f}",
+             f"{stats['pose_detection_rate']:.1f}%", stats["face_detected_frames"],
+             f"{stats['eye_contact_ratio']:.1f}%", stats["dominant_expression"]]
+            for name, stats in ((name, results[name]) for name in ("two_model", "holistic"))]
+    text = tabulate(rows, headers=["Path", "Frames", "Seconds", "FPS", "Pose detected", "Faces", "Eye contact", "Expression"])
+    text += "\n"
+    if results.get("speedup"):
+        text += f"Holistic speedup: {results['speedup']:.2f}x\n"
+    if results.get("pose_landmark_distance") is not None:
+        text += f"Mean pose landmark distance: {results['pose_landmark_distance']:.4f}\n"
+    if "expression_agreement" in results:
+        text += f"Expression agreement: {results['expression_agreement']:.1f}%\n"
+        text += f"Eye contact agreement: {results['eye_contact_agreement']:.1f}%\n"
+    return text
+
 def main():
     """Main function to run the benchmarker."""
     parser = argparse.ArgumentParser(description="Comprehensive pose analysis benchmarking tool")
     parser.add_argument("--video", required=True, help="Path to input video")
     parser.add_argument("--ground-truth", help="Path to ground truth data (optional)")
     parser.add_argument("--output", default="benchmark_results", help="Output directory")
+    parser.add_argument("--holistic", action="store_true",
+                        help="Only compare holistic mode with the Pose + FaceMesh path")
     
     args = parser.parse_args()
     
+    if args.holistic:
+        print(format_holistic_comparison(compare_holistic(args.video)))
+        return
+    
     benchmarker = PoseBenchmarker(args.output)
     benchmarker.run_comprehensive_benchmark(args.video, args.ground_truth)
 
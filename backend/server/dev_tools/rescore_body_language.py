@@ -0,0 +1,53 @@
+import argparse
+import json
+import time
+
+from services.pose_analysis_service import rescore_reports, ISSUE_THRESHOLD_PERCENT
+from services.posture_rules import POSTURE_RULES
+
+def parse_thresholds(values):
+    """Parse repeated name=value arguments into {rule name: threshold}"""
+    thresholds = {}
+    for value in values or []:
+        name, _, threshold = value.partition("=")
+        if name not in POSTURE_RULES:
+            raise argparse.ArgumentTypeError(f"Unknown posture rule: {name} (choose from {', '.join(POSTURE_RULES)})")
+        thresholds[name] = float(threshold)
+    return thresholds
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score body language reports from stored landmarks")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--reports", nargs="+", help="Report IDs to re-score")
+    group.add_argument("--all", action="store_true", help="Re-score every report with stored landmarks")
+    parser.add_argument("--threshold", action="append", metavar="RULE=VALUE",
+                        help="Override a posture rule threshold, e.g. head_tilt_frames=0.03 (repeatable)")
+    parser.add_argument("--issue-threshold", type=float, default=ISSUE_THRESHOLD_PERCENT,
+                        help="Percentage of frames above which an issue is reported")
+    parser.add_argument("--update-db", action="store_true", help="Write the new scores to the database")
+    parser.add_argument("--output", help="Save the full results as JSON")
+    args = parser.parse_args()
+
+    start = time.time()
+    results = rescore_reports(
+        None if args.all else args.reports,
+        parse_thresholds(args.threshold),
+        args.issue_threshold,
+        args.update_db
+    )
+    elapsed = time.time() - start
+
+    for report_id, result in results.items():
+        if 'score' in result:
+            topics = ", ".join(issue['topic'] for issue in result['issues'])
+            print(f"{report_id}: {result['score']}/10 ({topics})")
+        else:
+            print(f"{report_id}: failed - {result['error']}")
+    print(f"Re-scored {len(results)} reports in {elapsed:.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+
+if __name__ == "__main__":
+    main()
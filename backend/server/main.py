@@ -31,6 +31,7 @@ from controllers.audio_process_controller import router as audio_process_router
 from controllers.main_process_controller import router as main_controller
 from controllers.report_controller import router as report_router
 from routers import auth, upload
+from services import job_queue_service, worker_pool
 
 # Configure logging with standard settings
 logging.basicConfig(
@@ -65,6 +66,17 @@ app.include_router(audio_process_router, prefix="/api/process/audio", tags=["Aud
 app.include_router(main_controller, prefix="/api/process", tags=["Process Controller"])
 app.include_router(report_router, prefix="/api/report", tags=["Report"])
 
+@app.on_event("startup")
+async def start_analysis_workers():
+    # Start the analysis process pool so models are loaded before the first job
+    worker_pool.start()
+
+@app.on_event("shutdown")
+async def shutdown_job_workers():
+    # Stop the background video processing workers and the analysis processes
+    await job_queue_service.stop_workers()
+    worker_pool.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8080))  # Default to 8080 for Cloud Run
@@ -17,5 +17,7 @@ class UserReport(BaseReport):
     scoreBodyLanguage: Optional[float] = None
     scoreEmotions: Optional[float] = None
     scoreVoice: Optional[float] = None
+    scoreFacial: Optional[float] = None
+    weaknessTopicsFacial: Optional[List[Dict[str, Any]]] = None
     resources: Optional[Dict[str, Any]] = None
     feedback: Optional[Dict[str, Any]] = None
@@ -0,0 +1,97 @@
+import math
+import cv2
+import numpy as np
+
+# Sampling interval limits in seconds of video
+MIN_INTERVAL_SECONDS = 0.25
+BASE_INTERVAL_SECONDS = 1.0
+MAX_INTERVAL_SECONDS = 2.0
+
+# Motion scores (see AdaptiveSampler.update) at or above HIGH_MOTION sample at
+# the minimum interval; at or below LOW_MOTION the interval grows by
+# INTERVAL_GROWTH per sample up to the maximum; anything between uses the base
+HIGH_MOTION = 1.0
+LOW_MOTION = 0.25
+INTERVAL_GROWTH = 1.5
+
+# Frame difference thumbnails: a pixel has changed when it differs by more
+# than MOTION_PIXEL_DELTA gray levels
+MOTION_THUMBNAIL_WIDTH = 64
+MOTION_PIXEL_DELTA = 12
+
+
+def motion_thumbnail(gray):
+    """Downscale a grayscale frame to MOTION_THUMBNAIL_WIDTH for cheap frame differencing"""
+    h, w = gray.shape[:2]
+    size = (MOTION_THUMBNAIL_WIDTH, max(1, round(h * MOTION_THUMBNAIL_WIDTH / w)))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def changed_pixel_ratio(reference, thumbnail):
+    """Share of thumbnail pixels that differ by more than MOTION_PIXEL_DELTA gray levels"""
+    if reference.shape != thumbnail.shape:
+        return 1.0
+    return float(np.count_nonzero(cv2.absdiff(reference, thumbnail) > MOTION_PIXEL_DELTA)) / reference.size
+
+
+class AdaptiveSampler:
+    """
+    Chooses the frames an analyzer receives from how much the video is changing.
+
+    Register it with FrameSource.register(analyzer, sampler=sampler). After
+    each frame the analyzer calls update() with a motion score, where 1.0
+    means clearly moving, and the sampler schedules the next frame. It waits
+    longer (up to max_interval) while the video is stable and samples at
+    min_interval as soon as motion spikes.
+
+    Intervals are measured on the frames' presentation timestamps, so
+    variable frame rate videos and wrong FPS metadata do not change how
+    often frames are sampled.
+
+    With a budget, the interval never drops below what is needed to spread
+    the remaining budget over the remaining duration_ms. At most budget
+    frames are sampled per video, however much it moves.
+    """
+
+    def __init__(self, duration_ms, budget=None, start_ms=0,
+                 min_interval=MIN_INTERVAL_SECONDS, base_interval=BASE_INTERVAL_SECONDS,
+                 max_interval=MAX_INTERVAL_SECONDS):
+        self.min_ms = min_interval * 1000
+        self.base_ms = max(self.min_ms, base_interval * 1000)
+        self.max_ms = max(self.base_ms, max_interval * 1000)
+        self.end_ms = start_ms + max(0, duration_ms)
+        self.budget = budget
+        self.sampled = 0
+        self.interval = self.base_ms
+        self.next_ms = start_ms + self.interval
+
+    def wants(self, frame_number, timestamp_ms):
+        """Whether the analyzer should receive this frame"""
+        return timestamp_ms >= self.next_ms
+
+    def update(self, timestamp_ms, motion):
+        """
+        Schedule the next frame after the frame at timestamp_ms was analyzed.
+
+        Args:
+            timestamp_ms: Presentation timestamp of the frame that was just analyzed
+            motion: Motion score of that frame (0 = static, >= 1 = clearly moving)
+        """
+        self.sampled += 1
+        if motion >= HIGH_MOTION:
+            interval = self.min_ms
+        elif motion <= LOW_MOTION:
+            interval = min(self.max_ms, self.interval * INTERVAL_GROWTH)
+        else:
+            interval = self.base_ms
+
+        if self.budget is not None:
+            remaining_budget = self.budget - self.sampled
+            if remaining_budget <= 0:
+                self.next_ms = math.inf
+                return
+            remaining_ms = self.end_ms - timestamp_ms
+            interval = max(interval, remaining_ms / remaining_budget)
+
+        self.interval = interval
+        self.next_ms = timestamp_ms + interval
@@ -1,18 +1,102 @@
 import subprocess
 import os
+import json
 import logging
 import shutil
 from fastapi import HTTPException
-from services.whisper_service import transcribe_audio
+from services.whisper_service import transcribe_audio, build_transcript
+from services import worker_pool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _resolve_video_path(report_id, video_path=None):
+    """Return the video to extract audio from: video_path if it exists, else the report's video"""
+    video_dir = f"tmp/{report_id}/video"
+    
+    # If video_path is provided, use it directly
+    if video_path and os.path.exists(video_path):
+        input_video_path = video_path
+        logging.info(f"Using provided video path: {video_path}")
+    else:
+        # Use standard video path
+        input_video_path = f"{video_dir}/video.mp4"
+        logging.info(f"Using standard video path: {input_video_path}")
+        
+        if not os.path.exists(input_video_path):
+            # Try to find any video file in the directory
+            if os.path.exists(video_dir):
+                video_files = [f for f in os.listdir(video_dir) if f.endswith(('.mp4', '.mov', '.avi', '.mkv'))]
+                if video_files:
+                    input_video_path = f"{video_dir}/{video_files[0]}"
+                    logging.info(f"Found alternative video file: {input_video_path}")
+                else:
+                    raise FileNotFoundError(f"No video files found in {video_dir}")
+            else:
+                raise FileNotFoundError(f"Video directory not found: {video_dir}")
+    
+    return input_video_path
+
+def get_audio_path(report_id):
+    """
+    Return the report's audio file, preferring the 16 kHz WAV used for analysis.
+    Falls back to the MP3 from convert_video_to_mp3 when no WAV was extracted.
+    """
+    wav_path = f"tmp/{report_id}/audio/audio.wav"
+    if os.path.exists(wav_path):
+        return wav_path
+    return f"tmp/{report_id}/audio/audio.mp3"
+
+def extract_audio(report_id, video_path=None):
+    """
+    Extract the audio track as 16 kHz mono 16-bit PCM WAV, the format Whisper works on.
+    
+    Whisper reads this file directly, so there is no lossy MP3 encode and no
+    second ffmpeg decode/resample before transcription.
+    
+    Args:
+        report_id: The report ID to use for generating output paths
+        video_path: Optional explicit path to the video file
+    
+    Returns:
+        Path to the WAV file
+    """
+    logging.info(f"Extracting 16 kHz audio for report {report_id}")
+    
+    audio_dir = f"tmp/{report_id}/audio"
+    os.makedirs(audio_dir, exist_ok=True)
+    output_audio_path = f"{audio_dir}/audio.wav"
+    
+    input_video_path = _resolve_video_path(report_id, video_path)
+    
+    ffmpeg_cmd = [
+        "ffmpeg", "-nostdin", "-y", "-i", input_video_path,
+        "-vn",  # No video
+        "-ac", "1",  # Mono
+        "-ar", "16000",  # Whisper's sampling rate
+        "-c:a", "pcm_s16le",  # Uncompressed 16-bit PCM
+        "-f", "wav",
+        output_audio_path
+    ]
+    
+    logging.info(f"Running FFMPEG command: {' '.join(ffmpeg_cmd)}")
+    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+    
+    if result.returncode != 0:
+        logging.error(f"FFMPEG error (code {result.returncode}): {result.stderr}")
+        raise Exception(f"Failed to extract audio: {result.stderr}")
+    
+    logging.info(f"Audio extraction successful, output at: {output_audio_path}")
+    return output_audio_path
+
 def convert_video_to_mp3(report_id, video_path=None):
     """
     Convert video to MP3 format.
     
+    The analysis pipeline uses extract_audio instead; this is kept for the
+    /convert_to_mp3 endpoint and anything that needs a compressed copy.
+    
     Args:
         report_id: The report ID to use for generating output paths
         video_path: Optional explicit path to the video file. If not provided,
@@ -25,7 +109,6 @@ def convert_video_to_mp3(report_id, video_path=None):
     logging.info(f"Converting video to MP3 for report {report_id}")
     
     # Standardized directory structure
-    video_dir = f"tmp/{report_id}/video"
     audio_dir = f"tmp/{report_id}/audio"
     
     # Create audio directory
@@ -34,26 +117,7 @@ def convert_video_to_mp3(report_id, video_path=None):
     # Standard output path
     output_audio_path = f"{audio_dir}/audio.mp3"
     
-    # If video_path is provided, use it directly
-    if video_path and os.path.exists(video_path):
-        input_video_path = video_path
-        logging.info(f"Using provided video path: {video_path}")
-    else:
-        # Use standard video path
-        input_video_path = f"{video_dir}/video.mp4"
-        logging.info(f"Using standard video path: {input_video_path}")
-        
-        if not os.path.exists(input_video_path):
-            # Try to find any video file in the directory
-            if os.path.exists(video_dir):
-                video_files = [f for f in os.listdir(video_dir) if f.endswith(('.mp4', '.mov', '.avi', '.mkv'))]
-                if video_files:
-                    input_video_path = f"{video_dir}/{video_files[0]}"
-                    logging.info(f"Found alternative video file: {input_video_path}")
-                else:
-                    raise FileNotFoundError(f"No video files found in {video_dir}")
-            else:
-                raise FileNotFoundError(f"Video directory not found: {video_dir}")
+    input_video_path = _resolve_video_path(report_id, video_path)
     
     # Execute ffmpeg command to convert video to MP3
     try:
@@ -89,21 +153,44 @@ def convert_video_to_mp3(report_id, video_path=None):
         logging.error(f"Error converting video to MP3: {str(e)}")
         raise
 
+def get_transcript_path(report_id: str):
+    """Path of the structured transcript (text, segments, word timestamps) for a report"""
+    return f"tmp/{report_id}/transcription/transcript.json"
+
+def load_transcript(report_id: str):
+    """
+    Load the structured transcript written by transcribe_audio_to_text.
+    
+    Returns:
+        Dict with text, segments, words and model, or None if the report has not been transcribed
+    """
+    transcript_path = get_transcript_path(report_id)
+    if not os.path.exists(transcript_path):
+        return None
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 def transcribe_audio_to_text(report_id: str):
+    """
+    Run the single ASR pass for a report and store its results.
+    
+    Writes the plain text to transcription.txt and the structured transcript
+    (text, segments, word timestamps, model key) to transcript.json so that
+    downstream analyses never need to transcribe again.
+    
+    Returns:
+        The transcription text
+    """
     try:
-        # Use standardized path
-        audio_dir = f"tmp/{report_id}/audio"
-        audio_file_path = f"{audio_dir}/audio.mp3"
+        # Use standardized path (16 kHz WAV if extracted, otherwise MP3)
+        audio_file_path = get_audio_path(report_id)
         
         # Check if audio file exists
         if not os.path.exists(audio_file_path):
             raise FileNotFoundError(f"Audio file not found at {audio_file_path}")
         
-        # Transcribe the audio - now passing the report_id
-        transcription, _ = transcribe_audio(audio_file_path, report_id)
-        
-        if not transcription:
-            raise HTTPException(status_code=404, detail="Transcription failed or returned empty.")
+        # Transcribe the audio in the analysis process pool - now passing the report_id
+        transcription, segments = worker_pool.call_in_worker(transcribe_audio, audio_file_path, report_id)
         
         # Save transcription to standard location
         transcription_dir = f"tmp/{report_id}/transcription"
@@ -113,6 +200,14 @@ def transcribe_audio_to_text(report_id: str):
         with open(output_file, "w", encoding="utf-8") as f:
             f.write(transcription)
         
+        # Save structured transcript for voice, grammar and context analysis
+        with open(get_transcript_path(report_id), "w", encoding="utf-8") as f:
+            json.dump(build_transcript(transcription, segments), f, default=float)
+        
+        # Checked after saving so an empty result is not transcribed again downstream
+        if not transcription:
+            raise HTTPException(status_code=404, detail="Transcription failed or returned empty.")
+        
         logger.info(f"Transcription saved to '{output_file}'.")
         
         return transcription
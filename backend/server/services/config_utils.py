@@ -0,0 +1,39 @@
+import os
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def env_int(name, default, minimum=None):
+    """
+    Integer setting from the environment.
+
+    Settings are read when modules are imported, so a malformed value falls
+    back to the default with a warning instead of breaking the import.
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset, empty or not an integer
+        minimum: Optional lower bound applied to the result
+    """
+    value = os.getenv(name)
+    result = default
+    if value is not None and value.strip():
+        try:
+            result = int(value)
+        except ValueError:
+            logger.warning(f"Invalid integer {name}={value!r}, using {default}")
+    return result if minimum is None else max(minimum, result)
+
+
+def env_float(name, default):
+    """Float setting from the environment, falling back to the default like env_int"""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Invalid number {name}={value!r}, using {default}")
+        return default
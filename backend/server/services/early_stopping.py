@@ -0,0 +1,67 @@
+import math
+import numpy as np
+
+# Boundaries (as proportions) where the reported result changes: an issue is
+# reported above 15% and graded mild/moderate/severe at 30% and 50%
+BUCKET_BOUNDARIES = (0.15, 0.30, 0.50)
+
+# Below this detection rate the video is reported as poor quality
+DETECTION_BOUNDARY = 0.20
+
+# z for the confidence intervals. The intervals are checked after every round,
+# so a stricter value than the usual 1.96 keeps the overall error rate low.
+CONFIDENCE_Z = 2.576
+
+
+def stratified_order(candidates, strata, rng=None):
+    """
+    Randomized stratified order of candidate frames.
+
+    The candidates are split into `strata` equal blocks in video order. Each
+    round takes one random, not yet used frame from every block, so any
+    prefix of the order covers the whole video evenly.
+
+    Returns:
+        List of rounds, each a sorted list of frame numbers
+    """
+    rng = rng or np.random.default_rng()
+    blocks = [list(rng.permutation(block)) for block in np.array_split(np.asarray(candidates), strata) if len(block)]
+    rounds = []
+    while any(blocks):
+        rounds.append(sorted(int(block.pop()) for block in blocks if block))
+    return rounds
+
+
+def wilson_interval(hits, n, z=CONFIDENCE_Z):
+    """Wilson score interval (low, high) for a proportion of hits out of n"""
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return center - margin, center + margin
+
+
+def interval_is_settled(hits, n, boundaries, z=CONFIDENCE_Z):
+    """Whether the confidence interval of hits/n lies between two boundaries"""
+    low, high = wilson_interval(hits, n, z)
+    return not any(low <= boundary <= high for boundary in boundaries)
+
+
+def buckets_settled(rule_hits, detected, processed, z=CONFIDENCE_Z):
+    """
+    Whether more frames could still change the reported result.
+
+    Args:
+        rule_hits: Hit count per posture rule over the detected frames
+        detected: Frames with a detected pose
+        processed: Frames analyzed
+
+    Returns:
+        True when the detection rate is clear of the poor-quality boundary
+        and every rule's percentage is clear of the bucket boundaries
+    """
+    if not interval_is_settled(detected, processed, (DETECTION_BOUNDARY,), z):
+        return False
+    return all(interval_is_settled(int(hits), detected, BUCKET_BOUNDARIES, z) for hits in rule_hits)
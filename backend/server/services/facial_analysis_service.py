@@ -2,7 +2,13 @@ import os
 import warnings
 
 # Import our custom logging utilities
-from services.logging_utils import suppress_stdout_stderr, init_mediapipe
+from services.config_utils import env_int
+from services.logging_utils import init_mediapipe
+from services.frame_source import FrameSource
+from services.graph_pool import GraphPool
+from services.adaptive_sampler import AdaptiveSampler, motion_thumbnail, changed_pixel_ratio
+from services.facial_metrics import FacialMetrics, EXPRESSION_TYPES
+from services.posture_rules import NOSE, LEFT_EYE as POSE_LEFT_EYE, RIGHT_EYE as POSE_RIGHT_EYE, LEFT_EAR, RIGHT_EAR, X, Y, VISIBILITY
 
 # Basic warning suppression
 warnings.filterwarnings("ignore")
@@ -24,76 +30,205 @@ import logging
 
 # Configure standard logging
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Face mesh graphs kept warm per process; concurrent analyses beyond this wait for one
+MAX_FACE_MESH_GRAPHS = env_int("FACE_MESH_GRAPH_INSTANCES", 1, minimum=1)
+
+def create_face_mesh_graph():
+    """Build the MediaPipe Face Mesh graph used for facial engagement analysis"""
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=False,
+        max_num_faces=1,
+        refine_landmarks=True,  # Iris landmarks, needed for gaze and eye contact
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+face_mesh_graphs = GraphPool("face_mesh", create_face_mesh_graph, MAX_FACE_MESH_GRAPHS)
+
+def preload():
+    """Build a face mesh graph ahead of the first analysis (used by analysis workers)"""
+    face_mesh_graphs.preload()
+
+# Adaptive sampling: share of changed thumbnail pixels between analyzed frames
+# that counts as clearly moving (see AdaptiveSampler)
+MOTION_CHANGED_PIXELS_HIGH = 0.05
+
+# Face mesh landmark indices
+LEFT_EYE = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
+RIGHT_EYE = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
+LEFT_IRIS = [474, 475, 476, 477]  # Only present with refined (478) landmarks
+RIGHT_IRIS = [469, 470, 471, 472]
+MOUTH_OUTLINE = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 409, 270, 269, 267, 0, 37, 39, 40, 185]
+LEFT_EYEBROW = [70, 63, 105, 66, 107, 55, 65, 52, 53, 46]
+RIGHT_EYEBROW = [300, 293, 334, 296, 336, 285, 295, 282, 283, 276]
+
+# Every point group concatenated into one index array, so a frame's features
+# take one gather and one reduceat per statistic. The iris groups come last
+# and are skipped for meshes without refined landmarks.
+FEATURE_GROUPS = [MOUTH_OUTLINE, LEFT_EYE, RIGHT_EYE, LEFT_EYEBROW, RIGHT_EYEBROW, LEFT_IRIS, RIGHT_IRIS]
+GROUP_INDICES = np.concatenate(FEATURE_GROUPS)
+GROUP_SIZES = np.array([len(group) for group in FEATURE_GROUPS])
+GROUP_STARTS = np.concatenate([[0], np.cumsum(GROUP_SIZES)[:-1]])
+NUM_BASE_GROUPS = 5
+NUM_REFINED_LANDMARKS = 478
+
+# Landmarks compute_face_features reads, with and without the refined iris points
+FEATURE_LANDMARKS = np.unique(GROUP_INDICES[:GROUP_STARTS[NUM_BASE_GROUPS]])
+REFINED_FEATURE_LANDMARKS = np.unique(GROUP_INDICES)
+
+def face_landmarks_to_array(landmarks, indices=None):
+    """
+    Convert MediaPipe face landmarks to an (N, 3) array of normalized x, y, z.
+    
+    Reading each landmark from MediaPipe is the slow part, so with indices
+    only those rows are filled and the others are NaN.
+    """
+    if indices is None:
+        return np.array([(point.x, point.y, point.z) for point in landmarks], dtype=np.float64).reshape(-1, 3)
+    points = np.full((len(landmarks), 3), np.nan)
+    points[indices] = [(landmarks[i].x, landmarks[i].y, landmarks[i].z) for i in indices]
+    return points
+
+def _clamp01(value):
+    return min(1.0, max(0.0, value))
+
+def compute_face_features(points, width, height):
+    """
+    Smile, eyebrow, eye openness and gaze features of one face in a single pass.
+    
+    Args:
+        points: (468, 3) or (478, 3) landmark array from face_landmarks_to_array
+                (at least the FEATURE_LANDMARKS rows filled)
+        width, height: Image size the normalized coordinates are scaled to
+    
+    Returns:
+        Tuple of (smile_intensity, eyebrow_movement, eye_openness, gaze_data)
+        with the scores in 0-1 and gaze_data as returned by
+        FacialAnalyzer._calculate_gaze_direction
+    """
+    groups = len(FEATURE_GROUPS) if len(points) >= NUM_REFINED_LANDMARKS else NUM_BASE_GROUPS
+    count = GROUP_STARTS[groups - 1] + GROUP_SIZES[groups - 1]
+    xy = points[GROUP_INDICES[:count], :2] * (width, height)
+    
+    # Per-group bounding box sizes and centers
+    starts = GROUP_STARTS[:groups]
+    sizes = (np.maximum.reduceat(xy, starts) - np.minimum.reduceat(xy, starts)).tolist()
+    centers = (np.add.reduceat(xy, starts) / GROUP_SIZES[:groups, None]).tolist()
+    (mouth_w, mouth_h), (left_w, left_h), (right_w, right_h) = sizes[:3]
+    (left_cx, left_cy), (right_cx, right_cy), (_, left_brow_y), (_, right_brow_y) = centers[1:5]
+    
+    # Smile: the mouth's width-to-height ratio increases when smiling
+    smile = _clamp01((mouth_w / max(mouth_h, 1) - 1.5) / 2)
+    
+    # Eyebrows: distance above the eyes (negative because y increases downward)
+    brow_distance = ((left_brow_y - left_cy) + (right_brow_y - right_cy)) / 2
+    eyebrows = _clamp01((-brow_distance + 15) / 30)
+    
+    # Eye openness: height/width ratio of each eye
+    left_ratio = left_h / left_w if left_w > 0 else 0
+    right_ratio = right_h / right_w if right_w > 0 else 0
+    openness = _clamp01(((left_ratio + right_ratio) / 2 - 0.2) / 0.3)
+    
+    # Gaze: iris position relative to the eye center; without refined
+    # landmarks there is no iris and the gaze counts as centered
+    if groups > NUM_BASE_GROUPS:
+        (left_ix, _), (right_ix, _) = centers[5:7]
+    else:
+        left_ix, right_ix = left_cx, right_cx
+    left_rel_x = (left_ix - left_cx) / left_w if left_w > 0 else 0
+    right_rel_x = (right_ix - right_cx) / right_w if right_w > 0 else 0
+    avg_rel_x = (left_rel_x + right_rel_x) / 2
+    if avg_rel_x < -0.15:
+        direction = "looking-left"
+    elif avg_rel_x > 0.15:
+        direction = "looking-right"
+    else:
+        direction = "center"
+    gaze = {
+        "direction": direction,
+        "is_center": direction == "center",
+        "angle": avg_rel_x * 45  # Approximate gaze angle
+    }
+    
+    return smile, eyebrows, openness, gaze
 
 class FacialAnalyzer:
-    def __init__(self):
-        # Initialize MediaPipe Face Mesh silently
-        with suppress_stdout_stderr():
-            self.mp_face_mesh = mp.solutions.face_mesh
-            self.face_mesh = self.mp_face_mesh.FaceMesh(
-                static_image_mode=False,
-                max_num_faces=1,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-        
-        # Key facial landmarks indices
-        # Eyes
-        self.LEFT_EYE = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
-        self.RIGHT_EYE = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
-        
-        # For gaze direction
-        self.LEFT_IRIS = [474, 475, 476, 477]
-        self.RIGHT_IRIS = [469, 470, 471, 472]
-        
-        # For smile detection
-        self.MOUTH_OUTLINE = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 409, 270, 269, 267, 0, 37, 39, 40, 185]
-        
-        # For eyebrows
-        self.LEFT_EYEBROW = [70, 63, 105, 66, 107, 55, 65, 52, 53, 46]
-        self.RIGHT_EYEBROW = [300, 293, 334, 296, 336, 285, 295, 282, 283, 276]
+    def __init__(self, face_mesh=None, sampler=None, expected_frames=256):
+        # Reuse a face mesh checked out from face_mesh_graphs when given
+        self.mp_face_mesh = mp.solutions.face_mesh
+        self.face_mesh = create_face_mesh_graph() if face_mesh is None else face_mesh
+        
+        # Key facial landmarks indices (see the module-level index arrays)
+        self.LEFT_EYE = LEFT_EYE
+        self.RIGHT_EYE = RIGHT_EYE
+        self.LEFT_IRIS = LEFT_IRIS
+        self.RIGHT_IRIS = RIGHT_IRIS
+        self.MOUTH_OUTLINE = MOUTH_OUTLINE
+        self.LEFT_EYEBROW = LEFT_EYEBROW
+        self.RIGHT_EYEBROW = RIGHT_EYEBROW
         
         # History for temporal smoothing
         self.expression_history = deque(maxlen=30)  # Store recent expression scores
+        self._expression_sum = 0.0  # Running sum of expression_history
         self.gaze_history = deque(maxlen=30)  # Store recent gaze direction data
         
+        # Per-frame results collected as columns when used as a FrameSource analyzer
+        self.metrics = FacialMetrics(expected_frames)
+        
+        # Adaptive sampler registered for this analyzer, fed with frame differences
+        self.sampler = sampler
+        self._previous_thumbnail = None
+        
+    def process_frame(self, frame):
+        """Analyze a sampled frame from a FrameSource and keep the result"""
+        # Landmarks are normalized, so scale them to the original resolution
+        # to keep pixel-based thresholds independent of the resize
+        width, height = frame.original_size
+        face_data = self._analyze_rgb(frame.rgb, frame.frame_number, width, height)
+        self.metrics.append(face_data)
+        
+        if self.sampler:
+            thumbnail = motion_thumbnail(frame.gray)
+            motion = 0.0
+            if self._previous_thumbnail is not None:
+                motion = changed_pixel_ratio(self._previous_thumbnail, thumbnail) / MOTION_CHANGED_PIXELS_HIGH
+            self._previous_thumbnail = thumbnail
+            self.sampler.update(frame.timestamp_ms, motion)
+        return face_data
+        
     def analyze_face(self, image, frame_count):
         """Analyze facial expressions and eye contact in an image"""
         # Convert to RGB for MediaPipe
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Process image with MediaPipe Face Mesh (with output suppression)
-        with suppress_stdout_stderr():
-            results = self.face_mesh.process(image_rgb)
-        
+        h, w = image.shape[:2]
+        return self._analyze_rgb(image_rgb, frame_count, w, h)
+    
+    def _analyze_rgb(self, image_rgb, frame_count, w, h):
+        # Process image with MediaPipe Face Mesh (native logs are silenced by init_mediapipe)
+        results = self.face_mesh.process(image_rgb)
+        face_landmarks = results.multi_face_landmarks[0].landmark if results.multi_face_landmarks else None
+        return self._analyze_landmarks(face_landmarks, frame_count, w, h)
+    
+    def _analyze_landmarks(self, face_landmarks, frame_count, w, h):
         # Default return if no face detected
         face_data = {
             "face_detected": False,
             "frame": frame_count
         }
         
-        if results.multi_face_landmarks:
-            face_landmarks = results.multi_face_landmarks[0].landmark
-            
-            # Get image dimensions
-            h, w = image.shape[:2]
-            
-            # Calculate facial expression metrics
-            smile_score = self._calculate_smile_intensity(face_landmarks, w, h)
-            eyebrows_score = self._calculate_eyebrow_movement(face_landmarks, w, h)
-            eye_openness = self._calculate_eye_openness(face_landmarks, w, h)
-            
-            # Calculate gaze direction
-            gaze_data = self._calculate_gaze_direction(face_landmarks, w, h)
+        if face_landmarks:
+            # Convert the landmarks once and compute every feature from the array
+            indices = REFINED_FEATURE_LANDMARKS if len(face_landmarks) >= NUM_REFINED_LANDMARKS else FEATURE_LANDMARKS
+            points = face_landmarks_to_array(face_landmarks, indices)
+            smile_score, eyebrows_score, eye_openness, gaze_data = compute_face_features(points, w, h)
             
             # Store in history for smoothing
             expression_score = (smile_score + eyebrows_score + eye_openness) / 3
-            self.expression_history.append(expression_score)
+            smoothed_expression = self._add_expression(expression_score)
             self.gaze_history.append(gaze_data)
             
-            # Calculate smoothed metrics
-            smoothed_expression = np.mean(self.expression_history) if self.expression_history else expression_score
-            
             # Determine engagement level (0-100)
             engagement_level = min(100, smoothed_expression * 100)
             
@@ -112,193 +247,44 @@ class FacialAnalyzer:
                 "eyebrow_movement": eyebrows_score,
                 "eye_openness": eye_openness,
                 "gaze_direction": gaze_data["direction"],
+                "gaze_angle": gaze_data["angle"],
                 "eye_contact_quality": eye_contact,
                 "looking_at_audience": gaze_data["is_center"]
             }
         
         return face_data
     
+    def _add_expression(self, expression_score):
+        """Add a score to expression_history and return the mean of the history"""
+        if len(self.expression_history) == self.expression_history.maxlen:
+            self._expression_sum -= self.expression_history[0]
+        self.expression_history.append(expression_score)
+        self._expression_sum += expression_score
+        return self._expression_sum / len(self.expression_history)
+    
     def _calculate_smile_intensity(self, landmarks, width, height):
         """Calculate smile intensity based on mouth shape"""
-        if not landmarks:
+        if not len(landmarks):
             return 0
-        
-        # Extract mouth points
-        mouth_points = []
-        for idx in self.MOUTH_OUTLINE:
-            point = landmarks[idx]
-            mouth_points.append([point.x * width, point.y * height])
-        
-        mouth_points = np.array(mouth_points)
-        
-        # Calculate mouth width and height
-        x_min = np.min(mouth_points[:, 0])
-        x_max = np.max(mouth_points[:, 0])
-        y_min = np.min(mouth_points[:, 1])
-        y_max = np.max(mouth_points[:, 1])
-        
-        mouth_width = x_max - x_min
-        mouth_height = y_max - y_min
-        
-        # Width-to-height ratio increases when smiling
-        aspect_ratio = mouth_width / max(mouth_height, 1)
-        
-        # Normalize to 0-1 range (empirically determined thresholds)
-        smile_intensity = max(0, min(1, (aspect_ratio - 1.5) / 2))
-        
-        return smile_intensity
+        return compute_face_features(face_landmarks_to_array(landmarks), width, height)[0]
     
     def _calculate_eyebrow_movement(self, landmarks, width, height):
         """Calculate eyebrow movement/expressiveness"""
-        if not landmarks:
+        if not len(landmarks):
             return 0
-        
-        # Extract eyebrow and eye points
-        left_eyebrow = []
-        right_eyebrow = []
-        left_eye = []
-        right_eye = []
-        
-        for idx in self.LEFT_EYEBROW:
-            point = landmarks[idx]
-            left_eyebrow.append([point.x * width, point.y * height])
-        
-        for idx in self.RIGHT_EYEBROW:
-            point = landmarks[idx]
-            right_eyebrow.append([point.x * width, point.y * height])
-        
-        for idx in self.LEFT_EYE:
-            point = landmarks[idx]
-            left_eye.append([point.x * width, point.y * height])
-        
-        for idx in self.RIGHT_EYE:
-            point = landmarks[idx]
-            right_eye.append([point.x * width, point.y * height])
-        
-        # Convert to numpy arrays
-        left_eyebrow = np.array(left_eyebrow)
-        right_eyebrow = np.array(right_eyebrow)
-        left_eye = np.array(left_eye)
-        right_eye = np.array(right_eye)
-        
-        # Calculate eye centers
-        left_eye_center = np.mean(left_eye, axis=0)
-        right_eye_center = np.mean(right_eye, axis=0)
-        
-        # Calculate eyebrow centers
-        left_eyebrow_center = np.mean(left_eyebrow, axis=0)
-        right_eyebrow_center = np.mean(right_eyebrow, axis=0)
-        
-        # Calculate distance between eyebrow and eye
-        left_distance = left_eyebrow_center[1] - left_eye_center[1]
-        right_distance = right_eyebrow_center[1] - right_eye_center[1]
-        
-        # Average distance - higher means more expression
-        avg_distance = (left_distance + right_distance) / 2
-        
-        # Normalize to 0-1 range (negative because y increases downward)
-        eyebrow_score = max(0, min(1, (-avg_distance + 15) / 30))
-        
-        return eyebrow_score
+        return compute_face_features(face_landmarks_to_array(landmarks), width, height)[1]
     
     def _calculate_eye_openness(self, landmarks, width, height):
         """Calculate how open the eyes are"""
-        if not landmarks:
+        if not len(landmarks):
             return 0
-        
-        # For each eye, compute vertical/horizontal ratio
-        def eye_aspect_ratio(eye_indices):
-            points = []
-            for idx in eye_indices:
-                point = landmarks[idx]
-                points.append([point.x * width, point.y * height])
-                
-            points = np.array(points)
-            
-            # Compute width and height
-            x_min, x_max = np.min(points[:, 0]), np.max(points[:, 0])
-            y_min, y_max = np.min(points[:, 1]), np.max(points[:, 1])
-            
-            width = x_max - x_min
-            height = y_max - y_min
-            
-            return height / width if width > 0 else 0
-        
-        left_ratio = eye_aspect_ratio(self.LEFT_EYE)
-        right_ratio = eye_aspect_ratio(self.RIGHT_EYE)
-        
-        # Average aspect ratio - higher means more open
-        avg_ratio = (left_ratio + right_ratio) / 2
-        
-        # Normalize to 0-1 range
-        openness_score = max(0, min(1, (avg_ratio - 0.2) / 0.3))
-        
-        return openness_score
+        return compute_face_features(face_landmarks_to_array(landmarks), width, height)[2]
     
     def _calculate_gaze_direction(self, landmarks, width, height):
         """Calculate gaze direction to determine eye contact"""
-        if not landmarks:
+        if not len(landmarks):
             return {"direction": "unknown", "is_center": False, "angle": 0}
-        
-        # Extract eye and iris landmarks
-        left_eye_points = []
-        right_eye_points = []
-        left_iris_points = []
-        right_iris_points = []
-        
-        for idx in self.LEFT_EYE:
-            point = landmarks[idx]
-            left_eye_points.append([point.x * width, point.y * height])
-        
-        for idx in self.RIGHT_EYE:
-            point = landmarks[idx]
-            right_eye_points.append([point.x * width, point.y * height])
-        
-        for idx in self.LEFT_IRIS:
-            point = landmarks[idx]
-            left_iris_points.append([point.x * width, point.y * height])
-        
-        for idx in self.RIGHT_IRIS:
-            point = landmarks[idx]
-            right_iris_points.append([point.x * width, point.y * height])
-        
-        # Convert to numpy arrays
-        left_eye = np.array(left_eye_points)
-        right_eye = np.array(right_eye_points)
-        left_iris = np.array(left_iris_points) if left_iris_points else np.array(left_eye).mean(axis=0, keepdims=True)
-        right_iris = np.array(right_iris_points) if right_iris_points else np.array(right_eye).mean(axis=0, keepdims=True)
-        
-        # Calculate eye centers
-        left_eye_center = np.mean(left_eye, axis=0)
-        right_eye_center = np.mean(right_eye, axis=0)
-        
-        # Calculate iris centers
-        left_iris_center = np.mean(left_iris, axis=0)
-        right_iris_center = np.mean(right_iris, axis=0)
-        
-        # Calculate relative position of iris within eye
-        left_rel_x = (left_iris_center[0] - left_eye_center[0]) / (np.max(left_eye[:, 0]) - np.min(left_eye[:, 0])) if left_eye.size > 0 else 0
-        right_rel_x = (right_iris_center[0] - right_eye_center[0]) / (np.max(right_eye[:, 0]) - np.min(right_eye[:, 0])) if right_eye.size > 0 else 0
-        
-        # Average relative x position
-        avg_rel_x = (left_rel_x + right_rel_x) / 2
-        
-        # Determine gaze direction
-        if avg_rel_x < -0.15:
-            direction = "looking-left"
-            is_center = False
-        elif avg_rel_x > 0.15:
-            direction = "looking-right"
-            is_center = False
-        else:
-            direction = "center"
-            is_center = True
-        
-        return {
-            "direction": direction,
-            "is_center": is_center,
-            "angle": avg_rel_x * 45  # Approximate gaze angle
-        }
+        return compute_face_features(face_landmarks_to_array(landmarks), width, height)[3]
     
     def _determine_expression_type(self, smile, eyebrows, eye_openness):
         """Determine the type of facial expression based on measurements"""
@@ -340,80 +326,159 @@ class FacialAnalyzer:
         else:
             return "poor"
 
-def analyze_facial_engagement(video_path, sample_rate=5):
+# Head crops for the face stage of the pose pass: a square around the pose's
+# face landmarks, HEAD_CROP_SCALE times their spread, resized to at most
+# HEAD_CROP_SIZE pixels (FaceMesh itself runs at 192x192)
+HEAD_CROP_SCALE = 2.5
+HEAD_CROP_SIZE = 256
+HEAD_MIN_VISIBILITY = 0.5
+POSE_FACE_LANDMARKS = [NOSE, POSE_LEFT_EYE, POSE_RIGHT_EYE, LEFT_EAR, RIGHT_EAR]
+
+def head_box_from_pose(landmarks, width, height):
+    """
+    Square pixel box around the head of a pose.
+    
+    Args:
+        landmarks: (33, 4) pose landmark array in normalized coordinates
+        width, height: Size of the image the box is for
+    
+    Returns:
+        (left, top, right, bottom) clamped to the image, or None when the
+        nose and both eyes are not clearly visible
+    """
+    face = landmarks[POSE_FACE_LANDMARKS]
+    if (face[:3, VISIBILITY] < HEAD_MIN_VISIBILITY).any():
+        return None
+    visible = face[face[:, VISIBILITY] >= HEAD_MIN_VISIBILITY]
+    xs, ys = visible[:, X] * width, visible[:, Y] * height
+    center_x, center_y = (xs.min() + xs.max()) / 2, (ys.min() + ys.max()) / 2
+    half = max(xs.max() - xs.min(), ys.max() - ys.min()) * HEAD_CROP_SCALE / 2
+    box = (max(0, int(center_x - half)), max(0, int(center_y - half)),
+           min(width, int(math.ceil(center_x + half))), min(height, int(math.ceil(center_y + half))))
+    if box[2] - box[0] < 16 or box[3] - box[1] < 16:
+        return None
+    return box
+
+class HeadFaceAnalyzer:
+    """
+    Face stage of the pose pass: runs FaceMesh on a small crop around the
+    head that pose already located, instead of on the whole frame.
+    
+    PoseFrameAnalyzer calls process_head for every frame where it ran pose
+    and found a person. Frames where the head is not clearly visible are
+    skipped, so FaceMesh only runs where a face can be expected. Results
+    accumulate in the same FacialMetrics columns as FacialAnalyzer and are
+    summarized with summarize_facial_engagement.
+    
+    In holistic mode the pose graph is a Holistic graph that already returns
+    the face landmarks; it is passed as face_mesh and PoseFrameAnalyzer calls
+    process_face_landmarks instead, so no second model runs.
+    """
+    
+    def __init__(self, face_mesh=None, expected_frames=256):
+        self.facial_analyzer = FacialAnalyzer(face_mesh, expected_frames=expected_frames)
+        self.metrics = self.facial_analyzer.metrics
+        self.stats = {"head_frames": 0, "no_head_frames": 0, "crop_pixels": 0}
+    
+    def process_head(self, frame, pose_landmarks):
+        """Analyze the face in the head region of a frame with a detected pose"""
+        image = frame.full_bgr
+        h, w = image.shape[:2]
+        box = head_box_from_pose(pose_landmarks, w, h)
+        if box is None:
+            self.stats["no_head_frames"] += 1
+            return None
+        
+        left, top, right, bottom = box
+        crop = image[top:bottom, left:right]
+        crop_w, crop_h = right - left, bottom - top
+        scale = min(1.0, HEAD_CROP_SIZE / max(crop_w, crop_h))
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, int(crop_w * scale)), max(1, int(crop_h * scale))))
+        crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        self.stats["head_frames"] += 1
+        self.stats["crop_pixels"] += crop.shape[0] * crop.shape[1]
+        
+        # Scale landmarks to the crop's size at the original resolution, as
+        # FacialAnalyzer.process_frame does for whole frames, so the pixel
+        # thresholds of the features mean the same thing
+        crop_w = crop_w * frame.original_size[0] / w
+        crop_h = crop_h * frame.original_size[1] / h
+        face_data = self.facial_analyzer._analyze_rgb(crop, frame.frame_number, crop_w, crop_h)
+        self.metrics.append(face_data)
+        return face_data
+    
+    def process_face_landmarks(self, frame, face_landmarks):
+        """Analyze face landmarks already found on the whole frame (None when there was no face)"""
+        self.stats["head_frames" if face_landmarks else "no_head_frames"] += 1
+        width, height = frame.original_size
+        landmarks = face_landmarks.landmark if face_landmarks else None
+        face_data = self.facial_analyzer._analyze_landmarks(landmarks, frame.frame_number, width, height)
+        self.metrics.append(face_data)
+        return face_data
+
+def analyze_facial_engagement(video_path, sample_rate=5, frame_budget=None):
     """
     Analyze facial engagement in a video.
     
     Args:
         video_path: Path to the video file
         sample_rate: Process every Nth frame
+        frame_budget: Optional maximum number of frames to analyze; sampling
+                      then adapts to motion around every sample_rate frames
     
     Returns:
         Dict with facial engagement analysis results
     """
-    cap = cv2.VideoCapture(video_path)
-    facial_analyzer = FacialAnalyzer()
-    
-    frame_count = 0
-    processed_frames = 0
-    face_detected_frames = 0
-    expression_data = []
-    frame_metrics = []
-    
-    # Aggregate metrics
-    engagement_scores = []
-    smile_intensities = []
-    eye_contact_frames = 0
-    expression_counts = {
-        "neutral": 0,
-        "smiling": 0,
-        "enthusiastic": 0,
-        "serious": 0,
-        "surprised": 0
-    }
+    source = FrameSource(video_path)
+    sampler = None
+    if frame_budget:
+        base_interval = sample_rate / (source.fps or 30)
+        sampler = AdaptiveSampler(source.duration_ms, frame_budget,
+                                  min_interval=base_interval / 2, base_interval=base_interval,
+                                  max_interval=base_interval * 4)
+    expected_frames = source.total_frames // sample_rate + 1
+    with face_mesh_graphs.checkout() as face_mesh:
+        facial_analyzer = source.register(FacialAnalyzer(face_mesh, sampler, expected_frames),
+                                          every=sample_rate, sampler=sampler)
+        stats = source.run()
     
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        frame_count += 1
-        
-        # Process at specified sample rate
-        if frame_count % sample_rate != 0:
-            continue
-        
-        processed_frames += 1
-        
-        # Analyze face in current frame
-        face_data = facial_analyzer.analyze_face(frame, frame_count)
-        
-        if face_data["face_detected"]:
-            face_detected_frames += 1
-            
-            # Collect metrics
-            engagement_scores.append(face_data["engagement_level"])
-            smile_intensities.append(face_data["smile_intensity"])
-            
-            if face_data["looking_at_audience"]:
-                eye_contact_frames += 1
-            
-            # Count expression types
-            if face_data["expression_type"] in expression_counts:
-                expression_counts[face_data["expression_type"]] += 1
-            
-            # Add to frame metrics
-            frame_metrics.append(face_data)
+    return summarize_facial_engagement(facial_analyzer.metrics, stats["frame_count"])
+
+def summarize_facial_engagement(face_results, total_frames):
+    """
+    Aggregate per-frame FacialAnalyzer results into the facial engagement report.
+    
+    Args:
+        face_results: FacialMetrics columns (or a list of face_data dicts),
+                      one row per processed frame
+        total_frames: Number of frames in the video
+    
+    Returns:
+        Dict with facial engagement analysis results; frame_metrics holds the
+        detected frames as columns (see FacialMetrics.to_dict)
+    """
+    if not isinstance(face_results, FacialMetrics):
+        face_results = FacialMetrics.from_frames(face_results)
+    
+    processed_frames = len(face_results)
+    detected = face_results.column("face_detected")
+    face_detected_frames = int(detected.sum())
     
-    cap.release()
+    # Aggregate metrics over the detected frames
+    engagement_scores = face_results.column("engagement_level")[detected]
+    eye_contact_frames = int(face_results.column("looking_at_audience")[detected].sum())
+    expression_codes = face_results.column("expression_type")[detected]
+    counts = np.bincount(expression_codes[expression_codes >= 0], minlength=len(EXPRESSION_TYPES))
+    expression_counts = dict(zip(EXPRESSION_TYPES, counts.tolist()))
     
     # Calculate overall metrics
     detection_rate = face_detected_frames / processed_frames * 100 if processed_frames > 0 else 0
     
     # Calculate engagement statistics
-    avg_engagement = np.mean(engagement_scores) if engagement_scores else 0
-    max_engagement = np.max(engagement_scores) if engagement_scores else 0
-    min_engagement = np.min(engagement_scores) if engagement_scores else 0
+    avg_engagement = float(engagement_scores.mean()) if len(engagement_scores) else 0
+    max_engagement = float(engagement_scores.max()) if len(engagement_scores) else 0
+    min_engagement = float(engagement_scores.min()) if len(engagement_scores) else 0
     
     # Calculate eye contact ratio
     eye_contact_ratio = eye_contact_frames / face_detected_frames * 100 if face_detected_frames > 0 else 0
@@ -453,7 +518,7 @@ def analyze_facial_engagement(video_path, sample_rate=5):
     # Compile final results
     results = {
         "detection_rate": detection_rate,
-        "total_frames": frame_count,
+        "total_frames": total_frames,
         "processed_frames": processed_frames,
         "face_detected_frames": face_detected_frames,
         "engagement_metrics": {
@@ -465,7 +530,97 @@ def analyze_facial_engagement(video_path, sample_rate=5):
         "dominant_expression": dominant_expression,
         "expression_distribution": expression_distribution,
         "facial_issues": facial_issues,
-        "frame_metrics": frame_metrics
+        "frame_metrics": face_results.to_dict(detected_only=True)
     }
     
     return results
+
+# Facial feedback needs at least this many frames with a detected face
+FACIAL_MIN_FACE_FRAMES = 5
+
+# Score deduction weight per facial issue (see score_facial_engagement)
+FACIAL_ISSUE_WEIGHTS = {
+    "Low facial engagement": 1.0,
+    "Insufficient eye contact": 1.5,
+    "Overly serious expression": 0.8
+}
+
+def score_facial_engagement(summary):
+    """
+    Turn a summarize_facial_engagement summary into a report dimension.
+    
+    Returns:
+        Dict with score (3-10) and issues in the report's topic format, or
+        with an error and no score when too few frames had a face
+    """
+    if summary["face_detected_frames"] < FACIAL_MIN_FACE_FRAMES:
+        return {
+            "score": None,
+            "issues": [],
+            "error": "Too few frames with a clearly visible face for facial feedback.",
+            "face_detected_frames": summary["face_detected_frames"]
+        }
+    
+    score = 9.0
+    issues = []
+    for issue in summary["facial_issues"]:
+        frequency = issue["frequency"]
+        weight = FACIAL_ISSUE_WEIGHTS.get(issue["issue"], 1.0)
+        if frequency > 50:
+            score -= weight * 1.5
+        elif frequency > 30:
+            score -= weight * 1.0
+        else:
+            score -= weight * 0.5
+        issues.append({
+            "topic": issue["issue"].capitalize(),
+            "examples": [f"Observed in {frequency:.1f}% of your presentation"],
+            "suggestions": issue["suggestions"]
+        })
+    
+    if not issues:
+        issues = [{
+            "topic": "Engaging facial expressions",
+            "examples": [f"You kept eye contact {summary['eye_contact_ratio']:.1f}% of the time."],
+            "suggestions": ["Keep looking at your audience and letting your expressions support your message."]
+        }]
+    
+    return {
+        "score": max(3, min(10, round(score))),
+        "issues": issues,
+        "eye_contact_ratio": summary["eye_contact_ratio"],
+        "dominant_expression": summary["dominant_expression"],
+        "face_detected_frames": summary["face_detected_frames"]
+    }
+
+def update_facial_scores(report_id, facial_results):
+    """
+    Write the facial score and issues of a report to the UserReport table.
+    
+    Failures are logged, not raised, so they never affect the body language results.
+    
+    Returns:
+        True if the update succeeded
+    """
+    if facial_results.get("score") is None:
+        logger.info(f"No facial score for report {report_id}: {facial_results.get('error')}")
+        return False
+    try:
+        from services import storage_service
+        
+        update_data = {
+            "scoreFacial": facial_results["score"],
+            "weaknessTopicsFacial": facial_results["issues"]
+        }
+        response = storage_service.supabase.table("UserReport").update(update_data).eq("reportId", report_id).execute()
+        if not response.data:
+            logger.error(f"Facial score update failed for report {report_id}")
+            return False
+        logger.info(f"Database updated with facial score: {facial_results['score']}")
+        return True
+    except Exception as e:
+        if "scoreFacial" in str(e) or "weaknessTopicsFacial" in str(e):
+            logger.warning(f"UserReport has no facial columns yet, facial scores not saved: {e}")
+        else:
+            logger.error(f"Failed to update facial scores: {e}")
+        return False
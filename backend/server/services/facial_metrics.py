@@ -0,0 +1,139 @@
+import json
+import numpy as np
+
+# Categorical per-frame values are stored as int8 codes into these tables
+EXPRESSION_TYPES = ("neutral", "smiling", "enthusiastic", "serious", "surprised")
+GAZE_DIRECTIONS = ("unknown", "center", "looking-left", "looking-right")
+EYE_CONTACT_QUALITIES = ("insufficient-data", "excellent", "good", "fair", "poor")
+
+# Column name -> dtype. Float metrics are NaN for frames without a face.
+COLUMNS = {
+    "frame": np.int32,
+    "face_detected": np.bool_,
+    "engagement_level": np.float32,
+    "smile_intensity": np.float32,
+    "eyebrow_movement": np.float32,
+    "eye_openness": np.float32,
+    "gaze_angle": np.float32,
+    "expression_type": np.int8,
+    "gaze_direction": np.int8,
+    "eye_contact_quality": np.int8,
+    "looking_at_audience": np.bool_
+}
+
+CATEGORIES = {
+    "expression_type": EXPRESSION_TYPES,
+    "gaze_direction": GAZE_DIRECTIONS,
+    "eye_contact_quality": EYE_CONTACT_QUALITIES
+}
+
+# Codes stored for frames without a face
+_MISSING = {"frame": 0, "face_detected": False, "looking_at_audience": False,
+            "expression_type": -1, "gaze_direction": 0, "eye_contact_quality": 0}
+
+
+class FacialMetrics:
+    """
+    Per-frame facial analysis results stored as NumPy columns.
+
+    One row per analyzed frame, about 30 bytes each instead of a Python dict
+    with string keys and values. Columns are preallocated for the expected
+    number of frames and grow by doubling. Categorical values (expression,
+    gaze direction, eye contact) are int8 codes into the tables above.
+
+    Example:
+        metrics = FacialMetrics(expected_frames)
+        metrics.append(face_data)
+        summary = summarize_facial_engagement(metrics, total_frames)
+        metrics.save(path)
+    """
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self._columns = {name: np.empty(max(1, int(capacity)), dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.empty(len(column) * 2, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            self._columns[name] = grown
+
+    def append(self, face_data):
+        """Add one frame from a FacialAnalyzer face_data dict"""
+        if self.count == len(self._columns["frame"]):
+            self._grow()
+        row = self.count
+        for name, column in self._columns.items():
+            if name in CATEGORIES:
+                value = face_data.get(name)
+                column[row] = CATEGORIES[name].index(value) if value in CATEGORIES[name] else _MISSING[name]
+            else:
+                column[row] = face_data.get(name, _MISSING.get(name, np.nan))
+        self.count += 1
+
+    def column(self, name):
+        """View of a column over the recorded frames"""
+        return self._columns[name][:self.count]
+
+    def labels(self, name):
+        """Categorical column decoded to strings (None for frames without a face)"""
+        table = CATEGORIES[name]
+        return [table[code] if code >= 0 else None for code in self.column(name)]
+
+    def take(self, rows):
+        """New FacialMetrics with the given rows (boolean mask or index array)"""
+        columns = {name: self.column(name)[rows] for name in COLUMNS}
+        metrics = FacialMetrics(len(columns["frame"]))
+        for name, column in columns.items():
+            metrics._columns[name][:len(column)] = column
+        metrics.count = len(columns["frame"])
+        return metrics
+
+    @classmethod
+    def concatenate(cls, parts):
+        """Join several FacialMetrics in order (e.g. the shards of a video)"""
+        total = sum(len(part) for part in parts)
+        metrics = cls(total)
+        for name in COLUMNS:
+            if total:
+                metrics._columns[name][:total] = np.concatenate([part.column(name) for part in parts])
+        metrics.count = total
+        return metrics
+
+    @classmethod
+    def from_frames(cls, face_results):
+        """Build from a list of face_data dicts"""
+        metrics = cls(len(face_results))
+        for face_data in face_results:
+            metrics.append(face_data)
+        return metrics
+
+    def to_dict(self, detected_only=False):
+        """
+        Columns as JSON-serializable lists plus the category tables.
+
+        Args:
+            detected_only: Keep only the frames with a detected face
+        """
+        keep = self.column("face_detected") if detected_only else slice(None)
+        data = {name: self.column(name)[keep].tolist() for name in COLUMNS}
+        data["categories"] = {name: list(table) for name, table in CATEGORIES.items()}
+        return data
+
+    def save(self, path):
+        """Write the columns to a compressed .npz file"""
+        np.savez_compressed(path, categories=np.array(json.dumps(CATEGORIES)),
+                            **{name: self.column(name) for name in COLUMNS})
+
+    @classmethod
+    def load(cls, path):
+        """Read columns written by save()"""
+        with np.load(path) as stored:
+            metrics = cls(len(stored["frame"]))
+            for name in COLUMNS:
+                metrics._columns[name][:len(stored[name])] = stored[name]
+            metrics.count = len(stored["frame"])
+        return metrics
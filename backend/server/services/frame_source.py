@@ -0,0 +1,219 @@
+import logging
+import cv2
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Frames wider than this are downscaled once before any analyzer sees them
+MAX_FRAME_WIDTH = 640
+
+
+class Frame:
+    """
+    A sampled video frame shared by every analyzer that asked for it.
+
+    The BGR image is already resized; the RGB and grayscale versions are
+    converted on first access and then reused by the other analyzers.
+    full_bgr is the decoded image before resizing, for analyzers that crop a
+    region at full resolution.
+    """
+
+    def __init__(self, frame_number, timestamp_ms, bgr, original_size, full_bgr=None):
+        self.frame_number = frame_number  # 1-based position in the video
+        self.timestamp_ms = timestamp_ms
+        self.bgr = bgr
+        self.original_size = original_size  # (width, height) before resizing
+        self.full_bgr = bgr if full_bgr is None else full_bgr
+        self._rgb = None
+        self._gray = None
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+
+class FrameSource:
+    """
+    Decode a video once and dispatch sampled frames to registered analyzers.
+
+    An analyzer is any object with a process_frame(frame) method. Each one is
+    registered with its own sampling interval; a frame is decoded, resized and
+    color-converted once no matter how many analyzers receive it. Frames no
+    analyzer wants are skipped with grab(), which advances the stream without
+    converting the frame to BGR or copying it out of the decoder.
+
+    Analyzers can also be sampled by time: with interval_ms an analyzer
+    receives the first frame at or after every multiple of interval_ms on
+    the frames' presentation timestamps. This stays correct for variable
+    frame rate recordings and videos with wrong or missing FPS metadata, and
+    the number of analyzed frames depends only on the video's duration.
+
+    A source can cover just part of the video: decoding then starts after
+    start_frame and stops at end_frame. Frame numbers stay absolute, so every
+    Nth frame is the same frame whichever range it is read in.
+
+    Example:
+        source = FrameSource(video_path)
+        source.register(pose_analyzer, every=max(1, int(source.fps)))
+        source.register(facial_analyzer, every=5)
+        source.register(quality_filter, interval_ms=500)
+        stats = source.run()
+    """
+
+    def __init__(self, video_path, max_width=MAX_FRAME_WIDTH, start_frame=0, end_frame=None):
+        self.video_path = video_path
+        self.max_width = max_width
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise ValueError("Could not open video file")
+
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        if start_frame:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        self._analyzers = []
+
+    @property
+    def duration_ms(self):
+        """Video duration estimated from the container metadata (0 when unknown)"""
+        return self.total_frames / self.fps * 1000 if self.fps and self.total_frames > 0 else 0
+
+    def register(self, analyzer, every=1, sampler=None, interval_ms=None):
+        """
+        Register an analyzer to receive every Nth frame.
+
+        With interval_ms the analyzer instead receives one frame per
+        interval_ms of presentation time. With a sampler (e.g. AdaptiveSampler)
+        it receives the frames for which sampler.wants(frame_number,
+        timestamp_ms) is true.
+
+        Returns:
+            The analyzer, so it can be created and registered in one line
+        """
+        self._analyzers.append({
+            "analyzer": analyzer,
+            "every": max(1, int(every)),
+            "sampler": sampler,
+            "interval_ms": interval_ms,
+            "next_ms": None
+        })
+        return analyzer
+
+    def close(self):
+        """Release the video without running (e.g. after only reading fps and total_frames)."""
+        self.cap.release()
+
+    def read_frame(self, frame_number):
+        """
+        Seek to and decode a single frame, for analyzers that visit frames out of order.
+
+        Returns:
+            The Frame, or None if it could not be read
+        """
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+        ret, image = self.cap.read()
+        if not ret:
+            return None
+        h, w = image.shape[:2]
+        return Frame(frame_number, self.cap.get(cv2.CAP_PROP_POS_MSEC), self._resize(image), (w, h), image)
+
+    def _resize(self, frame):
+        h, w = frame.shape[:2]
+        if self.max_width and w > self.max_width:
+            resize_factor = self.max_width / w
+            frame = cv2.resize(frame, (self.max_width, int(h * resize_factor)))
+        return frame
+
+    def _wants(self, registration, frame_number, timestamp_ms):
+        if registration["sampler"]:
+            return registration["sampler"].wants(frame_number, timestamp_ms)
+        if registration["interval_ms"]:
+            return registration["next_ms"] is None or timestamp_ms >= registration["next_ms"]
+        return frame_number % registration["every"] == 0
+
+    def run(self):
+        """
+        Decode the video and feed each sampled frame to its analyzers.
+
+        Returns:
+            Dict with frame_count (number of the last frame reached), decoded_frames (frames
+            fully read and converted), skipped_frames (frames only grabbed),
+            analyzed_frames (frames given to each analyzer, by class name), fps
+            and total_frames
+        """
+        frame_count = self.start_frame
+        decoded_frames = 0
+        skipped_frames = 0
+        analyzed_frames = {}
+
+        # Time-based sampling needs each frame's timestamp before deciding to
+        # decode it: grab() every frame and retrieve() only the sampled ones
+        timed = any(r["sampler"] or r["interval_ms"] for r in self._analyzers)
+
+        try:
+            while self.cap.isOpened():
+                if self.end_frame is not None and frame_count >= self.end_frame:
+                    break
+                next_frame = frame_count + 1
+                timestamp_ms = None
+                if timed:
+                    if not self.cap.grab():
+                        break
+                    timestamp_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+                targets = [r for r in self._analyzers if self._wants(r, next_frame, timestamp_ms)]
+
+                if not targets:
+                    # Nobody needs this frame: advance without retrieving it
+                    if not timed and not self.cap.grab():
+                        break
+                    frame_count = next_frame
+                    skipped_frames += 1
+                    continue
+
+                ret, image = self.cap.retrieve() if timed else self.cap.read()
+                if not ret:
+                    break
+
+                frame_count = next_frame
+                decoded_frames += 1
+                h, w = image.shape[:2]
+                frame = Frame(
+                    frame_count,
+                    timestamp_ms if timed else self.cap.get(cv2.CAP_PROP_POS_MSEC),
+                    self._resize(image),
+                    (w, h),
+                    image
+                )
+                for registration in targets:
+                    if registration["interval_ms"]:
+                        # Next multiple of the interval, so late frames do not shift the grid
+                        interval = registration["interval_ms"]
+                        registration["next_ms"] = (frame.timestamp_ms // interval + 1) * interval
+                    analyzer = registration["analyzer"]
+                    analyzer.process_frame(frame)
+                    name = type(analyzer).__name__
+                    analyzed_frames[name] = analyzed_frames.get(name, 0) + 1
+        finally:
+            self.cap.release()
+
+        logger.info(f"Decoded {decoded_frames} of {frame_count} frames from {self.video_path} "
+                    f"({skipped_frames} skipped), analyzed: {analyzed_frames}")
+
+        return {
+            "frame_count": frame_count,
+            "decoded_frames": decoded_frames,
+            "skipped_frames": skipped_frames,
+            "analyzed_frames": analyzed_frames,
+            "fps": self.fps,
+            "total_frames": self.total_frames
+        }
@@ -1,8 +1,11 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 import math
 from collections import deque
+from services.logging_utils import init_mediapipe
+from services.posture_rules import LEFT_WRIST, RIGHT_WRIST, LEFT_SHOULDER, RIGHT_SHOULDER
+
+mp = init_mediapipe()
 
 def analyze_hand_gestures(landmarks, frame_count):
     """Analyze hand gestures and their effectiveness."""
@@ -46,3 +49,44 @@ def analyze_hand_gestures(landmarks, frame_count):
     }
     
     return gesture_data
+
+def analyze_hand_gestures_batch(landmarks):
+    """
+    Vectorized analyze_hand_gestures over a whole video.
+    
+    Args:
+        landmarks: (N, 33, 4) array of pose landmarks (x, y, z, visibility)
+    
+    Returns:
+        Dict with the per-video averages of the analyze_hand_gestures metrics,
+        or None when there are no frames
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    if len(landmarks) == 0:
+        return None
+    
+    left_wrist = landmarks[:, LEFT_WRIST, :2]
+    right_wrist = landmarks[:, RIGHT_WRIST, :2]
+    left_shoulder = landmarks[:, LEFT_SHOULDER, :2]
+    right_shoulder = landmarks[:, RIGHT_SHOULDER, :2]
+    
+    # Gesture space (distance from body)
+    left_extension = np.linalg.norm(left_wrist - left_shoulder, axis=1)
+    right_extension = np.linalg.norm(right_wrist - right_shoulder, axis=1)
+    
+    # Gesture height (positive when hands above shoulders)
+    left_height = left_shoulder[:, 1] - left_wrist[:, 1]
+    right_height = right_shoulder[:, 1] - right_wrist[:, 1]
+    
+    # Hand separation (distance between hands)
+    hand_separation = np.linalg.norm(left_wrist - right_wrist, axis=1)
+    
+    return {
+        'left_extension': float(left_extension.mean()),
+        'right_extension': float(right_extension.mean()),
+        'avg_extension': float(((left_extension + right_extension) / 2).mean()),
+        'left_height': float(left_height.mean()),
+        'right_height': float(right_height.mean()),
+        'hand_separation': float(hand_separation.mean()),
+        'frames': len(landmarks)
+    }
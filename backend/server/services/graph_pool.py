@@ -0,0 +1,130 @@
+import os
+import time
+import logging
+import threading
+import contextlib
+from collections import deque
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Every pool created in this process, by name, for get_pool_metrics
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class GraphPool:
+    """
+    Bounded pool of pre-initialized MediaPipe solution graphs (Pose, FaceMesh, ...).
+
+    Building a graph loads its TFLite models and allocates buffers, so graphs
+    are created on first demand, up to max_instances, and then reused across
+    videos. A graph is reset when it is returned, which clears the tracking and
+    smoothing state left over from the previous video. Callers beyond
+    max_instances wait until a graph is released, or until a graph is
+    discarded and they can build its replacement; the wait is recorded in the
+    pool metrics.
+
+    Example:
+        with pose_graphs.checkout() as pose:
+            results = pose.process(image_rgb)
+    """
+
+    def __init__(self, name, factory, max_instances=1):
+        self.name = name
+        self.factory = factory
+        self.max_instances = max(1, int(max_instances))
+        self._idle = deque()
+        self._instances = 0
+        self._lock = threading.Lock()
+        # Notified whenever a graph is returned or an instance slot frees up
+        self._available = threading.Condition(self._lock)
+        self.metrics = {
+            "creates": 0,
+            "create_seconds_total": 0.0,
+            "checkouts": 0,
+            "reuses": 0,
+            "wait_seconds_total": 0.0,
+            "max_wait_seconds": 0.0
+        }
+        with _pools_lock:
+            _pools[name] = self
+
+    def acquire(self):
+        """Check out a graph, creating one if the pool is below max_instances."""
+        start = time.perf_counter()
+        with self._available:
+            waited = False
+            while not self._idle and self._instances >= self.max_instances:
+                waited = True
+                self._available.wait()
+            wait = time.perf_counter() - start
+            if waited or self._idle:
+                self.metrics["wait_seconds_total"] += wait
+                self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], wait)
+            self.metrics["checkouts"] += 1
+            if self._idle:
+                self.metrics["reuses"] += 1
+                return self._idle.popleft()
+            self._instances += 1
+
+        start = time.perf_counter()
+        try:
+            graph = self.factory()
+        except Exception:
+            self._discard_instance()
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.metrics["creates"] += 1
+            self.metrics["create_seconds_total"] += elapsed
+        logger.info(f"Created {self.name} graph in {elapsed:.2f}s (pid {os.getpid()})")
+        return graph
+
+    def release(self, graph):
+        """Reset a graph obtained from acquire and return it to the pool."""
+        try:
+            graph.reset()
+        except Exception as e:
+            # A graph that cannot be reset is dropped; the next acquire builds a new one
+            logger.warning(f"Discarding {self.name} graph that failed to reset: {e}")
+            self._discard_instance()
+            try:
+                graph.close()
+            except Exception:
+                pass
+            return
+        with self._available:
+            self._idle.append(graph)
+            self._available.notify()
+
+    def _discard_instance(self):
+        # Free the slot of a graph that was not built or was dropped, and wake
+        # a waiter so it builds the replacement instead of waiting forever
+        with self._available:
+            self._instances -= 1
+            self._available.notify()
+
+    @contextlib.contextmanager
+    def checkout(self):
+        """Context manager that acquires a graph and releases it afterwards."""
+        graph = self.acquire()
+        try:
+            yield graph
+        finally:
+            self.release(graph)
+
+    def preload(self):
+        """Create the first graph ahead of the first job."""
+        self.release(self.acquire())
+
+    def get_metrics(self):
+        with self._lock:
+            return dict(self.metrics, instances=self._instances, idle=len(self._idle))
+
+
+def get_pool_metrics():
+    """Return creation and checkout/wait metrics for every graph pool in this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.get_metrics() for pool in pools}
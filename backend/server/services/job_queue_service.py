@@ -0,0 +1,212 @@
+import asyncio
+import os
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from datetime import datetime
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Number of jobs that may run the pipeline at the same time
+DEFAULT_JOB_WORKERS = 2
+
+# Finished jobs kept in memory for status lookups before the oldest are dropped
+MAX_FINISHED_JOBS = 500
+
+# Job and stage states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_COMPLETED_WITH_ERRORS = "completed_with_errors"
+JOB_FAILED = "failed"
+
+STAGE_PENDING = "pending"
+STAGE_RUNNING = "running"
+STAGE_COMPLETED = "completed"
+STAGE_FAILED = "failed"
+STAGE_SKIPPED = "skipped"
+
+_FINISHED_STATES = {JOB_COMPLETED, JOB_COMPLETED_WITH_ERRORS, JOB_FAILED}
+
+# In-memory job registry (job_id -> job dict), insertion ordered
+_jobs = OrderedDict()
+
+# Queue and worker tasks are created lazily inside the running event loop
+_queue = None
+_queue_loop = None
+_workers = []
+
+
+def get_worker_count():
+    """Return the configured number of pipeline workers (PROCESS_JOB_WORKERS)."""
+    try:
+        return max(1, int(os.getenv("PROCESS_JOB_WORKERS", DEFAULT_JOB_WORKERS)))
+    except ValueError:
+        return DEFAULT_JOB_WORKERS
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def create_job(report_id, stage_names):
+    """
+    Register a new job with every stage in the pending state.
+
+    Args:
+        report_id: The report the job belongs to
+        stage_names: Ordered list of stage names the job will run
+
+    Returns:
+        The job dict
+    """
+    job_id = str(uuid.uuid4())
+    job = {
+        "job_id": job_id,
+        "report_id": report_id,
+        "status": JOB_QUEUED,
+        "created_at": _now(),
+        "started_at": None,
+        "finished_at": None,
+        "duration": None,
+        "stages": OrderedDict(
+            (name, {
+                "status": STAGE_PENDING,
+                "started_at": None,
+                "finished_at": None,
+                "duration": None,
+                "error": None
+            }) for name in stage_names
+        ),
+        "errors": []
+    }
+    _jobs[job_id] = job
+    _prune_finished_jobs()
+    return job
+
+
+def get_job(job_id):
+    """Return the job dict for job_id, or None if it is unknown."""
+    return _jobs.get(job_id)
+
+
+def _prune_finished_jobs():
+    finished = [job_id for job_id, job in _jobs.items() if job["status"] in _FINISHED_STATES]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job_id]
+
+
+def start_stage(job, stage_name):
+    """Mark a stage as running."""
+    stage = job["stages"][stage_name]
+    stage["status"] = STAGE_RUNNING
+    stage["started_at"] = _now()
+    stage["_t0"] = time.perf_counter()
+
+
+def _finish_stage(job, stage_name, status, error=None):
+    stage = job["stages"][stage_name]
+    stage["status"] = status
+    stage["finished_at"] = _now()
+    t0 = stage.pop("_t0", None)
+    if t0 is not None:
+        stage["duration"] = round(time.perf_counter() - t0, 3)
+    if error:
+        stage["error"] = error
+        job["errors"].append(error)
+
+
+def complete_stage(job, stage_name):
+    """Mark a stage as completed and record its duration."""
+    _finish_stage(job, stage_name, STAGE_COMPLETED)
+
+
+def fail_stage(job, stage_name, error):
+    """Mark a stage as failed and record the error on both the stage and the job."""
+    _finish_stage(job, stage_name, STAGE_FAILED, error)
+
+
+def skip_stage(job, stage_name, reason=None):
+    """Mark a stage as skipped, e.g. because an input it needs is missing."""
+    stage = job["stages"][stage_name]
+    stage["status"] = STAGE_SKIPPED
+    stage["error"] = reason
+
+
+def job_status(job):
+    """Return a JSON-serializable snapshot of the job."""
+    snapshot = {k: v for k, v in job.items() if k != "stages"}
+    snapshot["stages"] = {
+        name: {k: v for k, v in stage.items() if not k.startswith("_")}
+        for name, stage in job["stages"].items()
+    }
+    return snapshot
+
+
+async def enqueue_job(job, runner, *args):
+    """
+    Queue a job to be run by the worker pool.
+
+    Args:
+        job: Job dict returned by create_job
+        runner: Coroutine function called as runner(job, *args)
+    """
+    _ensure_workers()
+    await _queue.put((job, runner, args))
+    logger.info(f"Queued job {job['job_id']} for report {job['report_id']} "
+                f"({_queue.qsize()} waiting)")
+    return job
+
+
+def _ensure_workers():
+    global _queue, _queue_loop
+    loop = asyncio.get_running_loop()
+    if _queue is None or _queue_loop is not loop:
+        # First use, or the previous event loop is gone (e.g. app restarted in tests)
+        _queue = asyncio.Queue()
+        _queue_loop = loop
+        _workers.clear()
+    _workers[:] = [w for w in _workers if not w.done()]
+    while len(_workers) < get_worker_count():
+        _workers.append(asyncio.create_task(_worker(_queue)))
+
+
+async def _worker(queue):
+    while True:
+        job, runner, args = await queue.get()
+        try:
+            await _run_job(job, runner, args)
+        finally:
+            queue.task_done()
+
+
+async def _run_job(job, runner, args):
+    job["status"] = JOB_RUNNING
+    job["started_at"] = _now()
+    t0 = time.perf_counter()
+    try:
+        await runner(job, *args)
+        job["status"] = JOB_COMPLETED_WITH_ERRORS if job["errors"] else JOB_COMPLETED
+    except Exception as e:
+        error = str(getattr(e, "detail", e))
+        logger.error(f"Job {job['job_id']} failed: {error}")
+        if error not in job["errors"]:
+            job["errors"].append(error)
+        job["status"] = JOB_FAILED
+    finally:
+        job["finished_at"] = _now()
+        job["duration"] = round(time.perf_counter() - t0, 3)
+        _prune_finished_jobs()
+
+
+async def stop_workers():
+    """Cancel the worker tasks (called on application shutdown)."""
+    global _queue, _queue_loop
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+    _queue_loop = None
@@ -0,0 +1,172 @@
+import os
+import json
+import logging
+import numpy as np
+
+from services.posture_rules import NUM_LANDMARKS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes
+# (2: frames file gained a carried-over flag column)
+LANDMARK_FORMAT_VERSION = 2
+
+LANDMARKS_FILE = "pose_landmarks.f32"
+FRAMES_FILE = "frames.f64"
+META_FILE = "meta.json"
+
+
+def get_landmark_dir(report_id):
+    """Directory holding the per-frame pose landmarks of a report"""
+    return f"tmp/{report_id}/landmarks"
+
+
+class LandmarkWriter:
+    """
+    Stream per-frame pose landmarks to disk while a video is analyzed.
+
+    Every analyzed frame appends one (33, 4) float32 row of x, y, z, visibility
+    (NaN when no pose was detected) and its frame number, timestamp and
+    whether the landmarks were carried over from an earlier frame instead of
+    inferred. The files are raw arrays so load_landmarks can memory-map them
+    without copying.
+    """
+
+    def __init__(self, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.count = 0
+        self._landmarks = open(os.path.join(output_dir, LANDMARKS_FILE), "wb")
+        self._frames = open(os.path.join(output_dir, FRAMES_FILE), "wb")
+        self._empty = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+
+    def append(self, frame_number, timestamp_ms, landmarks=None, carried_over=False):
+        row = self._empty if landmarks is None else np.asarray(landmarks, dtype=np.float32)
+        self._landmarks.write(row.tobytes())
+        self._frames.write(np.array([frame_number, timestamp_ms, carried_over], dtype=np.float64).tobytes())
+        self.count += 1
+
+    def close(self, **meta):
+        """Flush the arrays and write meta.json (extra keyword arguments are stored in it)."""
+        if self._landmarks.closed:
+            return
+        self._landmarks.close()
+        self._frames.close()
+        meta.update({
+            "version": LANDMARK_FORMAT_VERSION,
+            "count": self.count,
+            "shape": [self.count, NUM_LANDMARKS, 4],
+            "dtype": "float32"
+        })
+        with open(os.path.join(self.output_dir, META_FILE), "w") as f:
+            json.dump(meta, f)
+        logger.info(f"Stored {self.count} landmark frames in {self.output_dir}")
+
+
+def load_landmarks(output_dir):
+    """
+    Memory-map the landmarks written by LandmarkWriter.
+
+    Returns:
+        Dict with landmarks (N, 33, 4), frame_numbers (N,), timestamps_ms (N,),
+        carried_over (N,) booleans and meta
+    """
+    with open(os.path.join(output_dir, META_FILE), "r") as f:
+        meta = json.load(f)
+
+    count = meta["count"]
+    # Version 1 files have no carried-over column
+    columns = 3 if meta.get("version", 1) >= 2 else 2
+    if count == 0:
+        landmarks = np.empty((0, NUM_LANDMARKS, 4), dtype=np.float32)
+        frames = np.empty((0, columns), dtype=np.float64)
+    else:
+        landmarks = np.memmap(os.path.join(output_dir, LANDMARKS_FILE), dtype=np.float32,
+                              mode="r", shape=(count, NUM_LANDMARKS, 4))
+        frames = np.memmap(os.path.join(output_dir, FRAMES_FILE), dtype=np.float64,
+                           mode="r", shape=(count, columns))
+
+    return {
+        "landmarks": landmarks,
+        "frame_numbers": frames[:, 0].astype(np.int64),
+        "timestamps_ms": frames[:, 1],
+        "carried_over": frames[:, 2] > 0 if columns == 3 else np.zeros(count, dtype=bool),
+        "meta": meta
+    }
+
+
+# Compact per-report archive used to re-score reports without the video
+DEFAULT_ARCHIVE_DIR = "data/landmarks"
+
+
+def get_archive_dir():
+    """Directory of the compressed landmark archives (LANDMARK_ARCHIVE_DIR)."""
+    return os.getenv("LANDMARK_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR)
+
+
+def get_archive_path(report_id):
+    return os.path.join(get_archive_dir(), f"{report_id}.npz")
+
+
+def archive_landmarks(report_id, landmarks, timestamps_ms, meta=None, carried_over=None):
+    """
+    Save a report's landmarks as a single compressed .npz file.
+
+    The archive lives outside tmp/{report_id} so it survives cleanup of the
+    video and intermediate files.
+
+    Returns:
+        Path of the archive
+    """
+    archive_dir = get_archive_dir()
+    os.makedirs(archive_dir, exist_ok=True)
+    path = get_archive_path(report_id)
+
+    meta = dict(meta or {})
+    meta.update({"version": LANDMARK_FORMAT_VERSION, "report_id": report_id})
+
+    # Write to a temporary file first so a concurrent reader never sees a partial archive
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        landmarks=np.asarray(landmarks, dtype=np.float32),
+        timestamps_ms=np.asarray(timestamps_ms, dtype=np.float64),
+        carried_over=np.zeros(len(landmarks), dtype=bool) if carried_over is None else np.asarray(carried_over, dtype=bool),
+        meta=np.array(json.dumps(meta))
+    )
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_archived_landmarks(report_id):
+    """
+    Load the archived landmarks of a report.
+
+    Returns:
+        Dict with landmarks (N, 33, 4), timestamps_ms (N,), carried_over (N,) and meta
+
+    Raises:
+        FileNotFoundError: If the report has no archive
+    """
+    path = get_archive_path(report_id)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No stored landmarks for report {report_id}")
+
+    with np.load(path) as archive:
+        return {
+            "landmarks": archive["landmarks"],
+            "timestamps_ms": archive["timestamps_ms"],
+            "carried_over": (archive["carried_over"] if "carried_over" in archive.files
+                             else np.zeros(len(archive["landmarks"]), dtype=bool)),
+            "meta": json.loads(str(archive["meta"]))
+        }
+
+
+def list_archived_reports():
+    """Return the IDs of all reports with archived landmarks."""
+    archive_dir = get_archive_dir()
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(name[:-len(".npz")] for name in os.listdir(archive_dir)
+                  if name.endswith(".npz") and ".tmp." not in name)
@@ -3,6 +3,7 @@ import sys
 import io
 import logging
 import contextlib
+import threading
 import warnings
 
 # Basic warning suppression - keeping only essential ones
@@ -12,6 +13,17 @@ warnings.filterwarnings('ignore')
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 os.environ['MEDIAPIPE_DISABLE_GPU'] = '1'
 
+# Native log output (glog/absl in MediaPipe, TensorFlow Lite) is written
+# straight to file descriptor 2, below sys.stderr, so suppress_stdout_stderr
+# does not catch it. Every process that loads MediaPipe (analysis and shard
+# workers, the API process in thread mode, dev tools) silences it once with
+# silence_native_logs, from init_mediapipe or its worker initializer.
+os.environ.setdefault('GLOG_minloglevel', '2')
+SILENCE_NATIVE_LOGS = os.getenv("SILENCE_NATIVE_LOGS", "1") == "1"
+
+_native_logs_silenced = False
+_silence_lock = threading.Lock()
+
 @contextlib.contextmanager
 def suppress_stdout_stderr():
     """
@@ -36,12 +48,70 @@ def suppress_stdout_stderr():
         sys.stdout = old_stdout
         sys.stderr = old_stderr
 
+def silence_native_logs():
+    """
+    Send everything written to file descriptors 1 and 2 to /dev/null for the
+    rest of the process, keeping Python's own output.
+    
+    sys.stdout, sys.stderr and the logging handlers writing to them are first
+    moved to duplicates of the original descriptors, so print and logging
+    still reach the console while native libraries write into /dev/null.
+    Called by init_mediapipe and the worker initializers; later calls do
+    nothing. Nothing is swapped per call afterwards, so analyzers running in
+    threads never swallow each other's output. Set SILENCE_NATIVE_LOGS=0 to keep native logs (e.g. to
+    debug a crash inside MediaPipe).
+    
+    Returns:
+        True if this call redirected the descriptors
+    """
+    global _native_logs_silenced
+    if not SILENCE_NATIVE_LOGS:
+        return False
+    with _silence_lock:
+        if _native_logs_silenced:
+            return False
+        
+        # Python streams on fd 1/2 -> replacement streams on duplicated descriptors
+        replacements = {}
+        for fd, name in ((1, "stdout"), (2, "stderr")):
+            stream = getattr(sys, name)
+            try:
+                stream.flush()
+                if stream.fileno() != fd:
+                    continue
+            except (AttributeError, OSError, ValueError):
+                continue
+            replacement = os.fdopen(os.dup(fd), "w", buffering=1,
+                                    encoding=stream.encoding, errors=stream.errors)
+            replacements[id(stream)] = replacement
+            setattr(sys, name, replacement)
+        
+        loggers = [logging.getLogger()] + [
+            logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+        ]
+        for logger in loggers:
+            for handler in logger.handlers:
+                if isinstance(handler, logging.StreamHandler) and id(handler.stream) in replacements:
+                    handler.setStream(replacements[id(handler.stream)])
+        
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        try:
+            os.dup2(devnull, 1)
+            os.dup2(devnull, 2)
+        finally:
+            os.close(devnull)
+        _native_logs_silenced = True
+        return True
+
 # Initialize MediaPipe silently
 def init_mediapipe():
     """
     Import and initialize MediaPipe with minimal logging suppression.
-    Call this before any MediaPipe usage.
+    Call this before any MediaPipe usage. Native logs are silenced for the
+    process first, so MediaPipe used in-process (ANALYSIS_WORKERS=0, dev
+    tools) stays as quiet as in the analysis workers.
     """
+    silence_native_logs()
     with suppress_stdout_stderr():
         import mediapipe as mp
         
@@ -50,3 +50,57 @@ def analyze_presenter_movement(pose_history, frame_count, frame_rate):
     }
     
     return movement_data
+
+def analyze_presenter_movement_batch(hip_centers, frame_rate=1.0, timestamps_ms=None):
+    """
+    Vectorized analyze_presenter_movement over a whole video.
+    
+    Args:
+        hip_centers: (N, 2) array of the point between the hips for each frame
+        frame_rate: Analyzed frames per second, used when timestamps_ms is not given
+        timestamps_ms: Optional (N,) presentation timestamps of the frames. Movement
+                       is then measured per second of real time between frames
+                       (the same as per frame at one frame per second), so
+                       unevenly sampled videos are classified consistently
+    
+    Returns:
+        Movement data dict, or None with fewer than two frames
+    """
+    hip_centers = np.asarray(hip_centers, dtype=np.float64)
+    if len(hip_centers) < 2:
+        return None
+    
+    # Position change of the center point between consecutive frames
+    position_changes = np.linalg.norm(np.diff(hip_centers, axis=0), axis=1)
+    avg_movement = float(position_changes.mean())
+    duration_seconds = len(position_changes) / frame_rate
+    if timestamps_ms is not None:
+        seconds = np.diff(np.asarray(timestamps_ms, dtype=np.float64)) / 1000
+        if (seconds > 0).all():
+            avg_movement = float(position_changes.sum() / seconds.sum())
+            duration_seconds = seconds.sum()
+            position_changes = position_changes / seconds
+    
+    # Classify movement patterns
+    movement_intensity = "low"
+    if avg_movement > 0.01:  # Threshold depends on normalization
+        movement_intensity = "moderate"
+    if avg_movement > 0.03:
+        movement_intensity = "high"
+    
+    # Check for pacing (rhythmic movement)
+    movement_pattern = "stable"
+    if duration_seconds > 5:  # Need at least 5 seconds
+        # Detect rhythmic movement using autocorrelation
+        autocorr = np.correlate(position_changes, position_changes, mode='full')
+        autocorr = autocorr[len(autocorr)//2:]
+        
+        if np.max(autocorr[1:]) > 0.7 * autocorr[0]:
+            movement_pattern = "pacing"
+    
+    return {
+        'avg_movement': avg_movement,
+        'movement_intensity': movement_intensity,
+        'movement_pattern': movement_pattern,
+        'frame': len(hip_centers)
+    }
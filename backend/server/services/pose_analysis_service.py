@@ -4,9 +4,34 @@ import cv2
 import numpy as np
 import math
 import logging
+import contextlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from collections import deque
-from services.logging_utils import suppress_stdout_stderr, init_mediapipe
+from services import worker_pool
+from services.config_utils import env_int, env_float
+from services.logging_utils import init_mediapipe, silence_native_logs
+from services.frame_source import FrameSource
+from services.graph_pool import GraphPool
+from services.adaptive_sampler import AdaptiveSampler, motion_thumbnail, changed_pixel_ratio
+from services.early_stopping import stratified_order, buckets_settled
+from services.posture_rules import (
+    landmarks_to_array, evaluate_posture_rules, RULE_NAMES, NUM_LANDMARKS,
+    NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, RIGHT_WRIST, LEFT_HIP, RIGHT_HIP,
+    X, Y, Z, VISIBILITY
+)
+from services.landmark_store import (
+    LandmarkWriter, load_landmarks, get_landmark_dir,
+    archive_landmarks, load_archived_landmarks, list_archived_reports
+)
+from services.movement_analysis_service import analyze_presenter_movement_batch
+from services.facial_analysis_service import (
+    HeadFaceAnalyzer, face_mesh_graphs, summarize_facial_engagement, score_facial_engagement, update_facial_scores
+)
+from services.facial_metrics import FacialMetrics
+from services.gesture_analysis_service import analyze_hand_gestures_batch
 
 # Basic warning suppression
 warnings.filterwarnings("ignore")
@@ -21,12 +46,430 @@ mp_pose = mp.solutions.pose
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def analyze_posture(video_path):
+# Frames are sampled by presentation timestamp, one per this many milliseconds
+# (see FrameSource.register), so variable frame rate videos are sampled evenly
+SAMPLE_INTERVAL_MS = env_float("POSE_SAMPLE_INTERVAL_MS", 1000.0)
+
+# Pose graphs kept warm per process; concurrent analyses beyond this wait for one
+MAX_POSE_GRAPHS = env_int("POSE_GRAPH_INSTANCES", 1, minimum=1)
+
+# Sharded mode: videos at least this long are split into time ranges analyzed
+# in parallel across POSE_SHARD_WORKERS processes, each with its own Pose graph.
+# 0 (the default) uses this analysis worker's share of the cores, so analysis
+# workers times shard workers stays within the machine.
+LONG_VIDEO_SECONDS = env_float("POSE_LONG_VIDEO_SECONDS", 300.0)
+SHARD_WORKERS = env_int("POSE_SHARD_WORKERS", 0, minimum=0)
+MIN_SHARD_SECONDS = 60
+
+# Each shard starts this much earlier so pose tracking and smoothing have
+# settled by its first frame; landmarks of the overlap are discarded
+SHARD_OVERLAP_SECONDS = env_float("POSE_SHARD_OVERLAP_SECONDS", 3.0)
+
+_shard_executor = None
+_shard_executor_lock = threading.Lock()
+
+# Person-ROI cropping: once a pose is found, later frames are analyzed on a
+# padded crop around it (taken from the full-resolution frame) instead of the
+# whole downscaled frame
+ROI_CROP_ENABLED = os.getenv("POSE_ROI_CROP", "1") == "1"
+ROI_PADDING = 0.25  # Added on each side, as a share of the landmark box size
+ROI_MAX_AREA = 0.6  # Crops covering more of the frame than this are not worth it
+ROI_MIN_VISIBILITY = 0.5  # Landmarks that define the box
+# The graph tracks and smooths landmarks in the coordinates of the image it
+# is given, so a crop switch that moves the view by more than this share of
+# its size, or scales it by more than this ratio, restarts tracking
+ROI_RESET_SHIFT = 0.25
+
+# Motion gate: a sampled frame that barely differs from the last frame the
+# model ran on reuses that frame's landmarks instead of running inference.
+# Frames are compared as small grayscale thumbnails (see adaptive_sampler).
+MOTION_GATE_ENABLED = os.getenv("POSE_MOTION_GATE", "1") == "1"
+MOTION_GATE_THRESHOLD = env_float("POSE_MOTION_GATE_THRESHOLD", 0.005)  # Share of changed pixels
+MOTION_GATE_MAX_CARRY = env_int("POSE_MOTION_GATE_MAX_CARRY", 10)  # Consecutive carried frames
+
+# Adaptive sampling: instead of one frame per second, sample between 4 and
+# 0.5 frames per second depending on motion, at most POSE_FRAME_BUDGET frames
+# per video. Motion is scored from the share of changed thumbnail pixels and
+# the landmark speed; reaching either value below counts as clearly moving.
+ADAPTIVE_SAMPLING_ENABLED = os.getenv("POSE_ADAPTIVE_SAMPLING", "1") == "1"
+FRAME_BUDGET = env_int("POSE_FRAME_BUDGET", 900)
+MOTION_CHANGED_PIXELS_HIGH = 0.05
+MOTION_LANDMARK_SPEED_HIGH = 0.1  # Normalized frame widths per second
+MOTION_KEY_LANDMARKS = [NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, RIGHT_WRIST, LEFT_HIP, RIGHT_HIP]
+
+# Early stopping: visit the 1 fps frames in a randomized order stratified
+# over the video and stop once more frames can no longer move any posture
+# issue across the 15/30/50% boundaries (see early_stopping.buckets_settled)
+EARLY_STOPPING_ENABLED = os.getenv("POSE_EARLY_STOPPING", "0") == "1"
+EARLY_STOPPING_STRATA = 20  # Frames per round, one from each stretch of the video
+EARLY_STOPPING_MIN_FRAMES = 40
+# Movement needs consecutive frames, so it is measured on this many seconds of
+# consecutive 1 fps frames from the middle of the video instead of the samples
+EARLY_STOPPING_MOVEMENT_SECONDS = 30
+
+# Face stage: FaceMesh on a head crop located by pose, on the frames where
+# pose ran and found the head, for eye contact and expression feedback
+FACE_STAGE_ENABLED = os.getenv("POSE_FACE_STAGE", "1") == "1"
+
+# Holistic mode: one MediaPipe Holistic graph returns the pose and face
+# landmarks of a frame in a single call, instead of Pose plus FaceMesh on the
+# head crop. Holistic tracks its own body and face regions, so the person-ROI
+# crop is not used. Early stopping visits frames out of order and keeps the
+# Pose + FaceMesh path. Compare both with dev_tools/pose_benchmarker --holistic.
+HOLISTIC_MODE = os.getenv("POSE_HOLISTIC", "0") == "1"
+
+# An issue is reported when it is seen in more than this percentage of detected frames
+ISSUE_THRESHOLD_PERCENT = 15
+
+def create_pose_graph():
+    """Build the MediaPipe Pose graph used for body language analysis"""
+    # Process video with simplified settings
+    return mp_pose.Pose(
+        min_detection_confidence=0.5,  # Lower threshold to detect more poses
+        min_tracking_confidence=0.5,
+        model_complexity=1,  # Medium complexity for balance
+        smooth_landmarks=True
+    )
+
+def create_static_pose_graph():
+    """Pose graph for frames visited out of order: no tracking or smoothing between frames"""
+    return mp_pose.Pose(
+        static_image_mode=True,
+        min_detection_confidence=0.5,
+        model_complexity=1
+    )
+
+def create_holistic_graph():
+    """Holistic graph for holistic mode: pose and face landmarks from one call"""
+    return mp.solutions.holistic.Holistic(
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+        model_complexity=1,
+        smooth_landmarks=True,
+        refine_face_landmarks=True  # Iris landmarks for gaze, as in the FaceMesh graph
+    )
+
+pose_graphs = GraphPool("pose", create_pose_graph, MAX_POSE_GRAPHS)
+static_pose_graphs = GraphPool("pose_static", create_static_pose_graph, MAX_POSE_GRAPHS)
+holistic_graphs = GraphPool("holistic", create_holistic_graph, MAX_POSE_GRAPHS)
+
+def preload():
+    """Build a pose graph ahead of the first analysis (used by analysis workers)"""
+    if HOLISTIC_MODE:
+        holistic_graphs.preload()
+    else:
+        pose_graphs.preload()
+
+class PoseFrameAnalyzer:
+    """
+    Frame analyzer that runs MediaPipe Pose on frames from a FrameSource and
+    records the landmarks of every analyzed frame.
+    
+    With a landmark_dir the (33, 4) landmark rows and timestamps are streamed
+    to disk (see landmark_store); otherwise they are kept in memory. Scoring
+    happens afterwards on the whole (N, 33, 4) tensor in score_landmarks.
+    
+    Pass a pose graph checked out from pose_graphs to reuse it; otherwise the
+    analyzer builds its own and closes it in close().
+    
+    With use_roi, frames after a detection are analyzed on a crop around the
+    previous pose (see roi_from_landmarks) and the landmarks are mapped back to
+    full-frame coordinates, so everything downstream is unchanged. When the
+    crop has no pose the same frame is re-analyzed in full.
+    
+    With use_motion_gate, a frame that is nearly identical to the last frame
+    the model ran on gets that frame's landmarks and is flagged as carried
+    over. At most MOTION_GATE_MAX_CARRY frames in a row are carried, so slow
+    drift is still picked up.
+    
+    With a sampler (an AdaptiveSampler registered for this analyzer on the
+    FrameSource) every analyzed frame reports its motion score so the
+    sampler can choose the next frame.
+    
+    With a face_stage (a HeadFaceAnalyzer) every frame where pose ran and
+    found a person is also passed on for facial analysis of the head region.
+    
+    With holistic, pose is a Holistic graph: the face landmarks it returns
+    with the pose go to the face stage, and frames are never cropped.
+    """
+    
+    def __init__(self, landmark_dir=None, pose=None, use_roi=ROI_CROP_ENABLED,
+                 use_motion_gate=MOTION_GATE_ENABLED, sampler=None, face_stage=None, holistic=False):
+        self.writer = LandmarkWriter(landmark_dir) if landmark_dir else None
+        self.landmark_dir = landmark_dir
+        
+        # In-memory rows and (frame_number, timestamp_ms, carried_over) when not writing to disk
+        self.landmarks = []
+        self.frames = []
+        
+        self.owns_pose = pose is None
+        self.pose = create_pose_graph() if pose is None else pose
+        
+        # Current crop as normalized (x0, y0, x1, y1), None for the full frame
+        self.use_roi = use_roi and not holistic
+        self.roi = None
+        self.roi_stats = {
+            "roi_frames": 0,
+            "full_frames": 0,
+            "fallback_frames": 0,
+            "roi_pixels": 0,
+            "full_pixels": 0,
+            "tracking_resets": 0
+        }
+        
+        # Thumbnail and landmarks of the last frame the model ran on
+        self.use_motion_gate = use_motion_gate
+        self._gate_reference = None
+        self._gate_landmarks = None
+        self._carried_in_row = 0
+        self.gate_stats = {"inferred_frames": 0, "carried_frames": 0}
+        
+        # Thumbnail, landmarks and timestamp of the previous analyzed frame
+        self.sampler = sampler
+        self._previous = None
+        
+        self.face_stage = face_stage
+        self.holistic = holistic
+        self._face_landmarks = None  # From the last holistic inference
+    
+    def process_frame(self, frame):
+        """Run pose detection on a sampled frame and record its landmarks (NaN if none)"""
+        thumbnail = None
+        if self.use_motion_gate or self.sampler:
+            thumbnail = motion_thumbnail(frame.gray)
+        
+        if (self.use_motion_gate and self._gate_reference is not None
+                and self._carried_in_row < MOTION_GATE_MAX_CARRY
+                and changed_pixel_ratio(self._gate_reference, thumbnail) < MOTION_GATE_THRESHOLD):
+            self._carried_in_row += 1
+            self.gate_stats["carried_frames"] += 1
+            landmarks = self._gate_landmarks
+            self._record(frame, landmarks, carried_over=True)
+        else:
+            landmarks = self._infer(frame)
+            self.gate_stats["inferred_frames"] += 1
+            if self.use_motion_gate:
+                self._gate_reference = thumbnail
+                self._gate_landmarks = landmarks
+                self._carried_in_row = 0
+            self._record(frame, landmarks)
+            if self.face_stage and landmarks is not None:
+                if self.holistic:
+                    self.face_stage.process_face_landmarks(frame, self._face_landmarks)
+                else:
+                    self.face_stage.process_head(frame, landmarks)
+        
+        if self.sampler:
+            self.sampler.update(frame.timestamp_ms, self._motion_score(frame, thumbnail, landmarks))
+            self._previous = (thumbnail, landmarks, frame.timestamp_ms)
+    
+    def _motion_score(self, frame, thumbnail, landmarks):
+        """Motion since the previous analyzed frame, 1.0 = clearly moving"""
+        if self._previous is None:
+            return 0.0
+        previous_thumbnail, previous_landmarks, previous_ms = self._previous
+        score = changed_pixel_ratio(previous_thumbnail, thumbnail) / MOTION_CHANGED_PIXELS_HIGH
+        
+        seconds = (frame.timestamp_ms - previous_ms) / 1000
+        if landmarks is not None and previous_landmarks is not None and seconds > 0:
+            current = landmarks[MOTION_KEY_LANDMARKS]
+            before = previous_landmarks[MOTION_KEY_LANDMARKS]
+            visible = (current[:, VISIBILITY] >= 0.5) & (before[:, VISIBILITY] >= 0.5)
+            if visible.any():
+                distance = np.hypot(*(current[visible, :2] - before[visible, :2]).T).mean()
+                score = max(score, distance / seconds / MOTION_LANDMARK_SPEED_HIGH)
+        return float(score)
+    
+    def _record(self, frame, landmarks, carried_over=False):
+        if self.writer:
+            self.writer.append(frame.frame_number, frame.timestamp_ms, landmarks, carried_over)
+        else:
+            self.landmarks.append(landmarks if landmarks is not None else _EMPTY_LANDMARKS)
+            self.frames.append((frame.frame_number, frame.timestamp_ms, carried_over))
+    
+    def _infer(self, frame):
+        landmarks = None
+        if self.roi is not None:
+            landmarks = self._process_roi(frame)
+            if landmarks is None:
+                # Lost the presenter in the crop: retry on the full frame
+                self.roi_stats["fallback_frames"] += 1
+                self._set_roi(None)
+        
+        if landmarks is None:
+            landmarks = self._process_full(frame)
+        
+        if self.use_roi and landmarks is not None:
+            self._update_roi(landmarks)
+        return landmarks
+    
+    def _process_full(self, frame):
+        image = frame.rgb
+        self.roi_stats["full_frames"] += 1
+        self.roi_stats["full_pixels"] += image.shape[0] * image.shape[1]
+        results = self.pose.process(image)
+        if self.holistic:
+            self._face_landmarks = results.face_landmarks
+        if not results.pose_landmarks:
+            return None
+        return landmarks_to_array(results.pose_landmarks.landmark)
+    
+    def _process_roi(self, frame):
+        image = frame.full_bgr
+        h, w = image.shape[:2]
+        x0, y0, x1, y1 = self.roi
+        left, top = int(x0 * w), int(y0 * h)
+        right, bottom = int(math.ceil(x1 * w)), int(math.ceil(y1 * h))
+        crop = image[top:bottom, left:right]
+        
+        # Keep the crop no larger than the downscaled frame the full path would use
+        crop_w, crop_h = right - left, bottom - top
+        scale = min(1.0, frame.bgr.shape[1] / crop_w, frame.bgr.shape[0] / crop_h)
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, int(crop_w * scale)), max(1, int(crop_h * scale))))
+        crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        
+        self.roi_stats["roi_frames"] += 1
+        self.roi_stats["roi_pixels"] += crop.shape[0] * crop.shape[1]
+        results = self.pose.process(crop)
+        if not results.pose_landmarks:
+            return None
+        
+        # Map crop-normalized coordinates back to the full frame
+        landmarks = landmarks_to_array(results.pose_landmarks.landmark)
+        landmarks[:, X] = (left + landmarks[:, X] * crop_w) / w
+        landmarks[:, Y] = (top + landmarks[:, Y] * crop_h) / h
+        landmarks[:, Z] *= crop_w / w
+        return landmarks
+    
+    def _update_roi(self, landmarks):
+        roi = roi_from_landmarks(landmarks)
+        if roi is None or self.roi is None or not roi_contains(self.roi, landmarks, roi):
+            self._set_roi(roi)
+    
+    def _set_roi(self, roi):
+        # Small crop moves keep tracking, since resetting forces the slower
+        # person detector to run again. Past ROI_RESET_SHIFT the graph's
+        # tracked and smoothed landmarks no longer match the new view, so it
+        # restarts from the detector instead of smoothing towards stale ones.
+        if roi_moved(self.roi, roi):
+            self.pose.reset()
+            self.roi_stats["tracking_resets"] += 1
+        self.roi = roi
+    
+    def close(self, **meta):
+        if self.owns_pose:
+            self.pose.close()
+        if self.writer:
+            self.writer.close(**meta)
+    
+    def get_landmarks(self):
+        """
+        Return the recorded landmarks as a (N, 33, 4) array (memory-mapped when
+        stored on disk) and the matching (N,) timestamps in milliseconds.
+        """
+        if self.writer:
+            stored = load_landmarks(self.landmark_dir)
+            return stored["landmarks"], stored["timestamps_ms"]
+        if not self.landmarks:
+            return np.empty((0, NUM_LANDMARKS, 4), dtype=np.float32), np.empty(0)
+        return np.stack(self.landmarks), np.array([t for _, t, _ in self.frames], dtype=np.float64)
+    
+    def get_carried_over(self):
+        """Return a (N,) boolean array marking frames whose landmarks were carried over"""
+        if self.writer:
+            return load_landmarks(self.landmark_dir)["carried_over"]
+        return np.array([carried for _, _, carried in self.frames], dtype=bool)
+    
+    def get_gate_stats(self):
+        """Inferred and carried-over frame counts and the share of frames that skipped inference"""
+        return dict(self.gate_stats, skip_ratio=_skip_ratio(self.gate_stats))
+
+_EMPTY_LANDMARKS = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+
+def _skip_ratio(gate_stats):
+    total = gate_stats["inferred_frames"] + gate_stats["carried_frames"]
+    return gate_stats["carried_frames"] / total if total else 0.0
+
+def roi_from_landmarks(landmarks, padding=ROI_PADDING, max_area=ROI_MAX_AREA):
+    """
+    Padded box around the visible landmarks of a pose.
+    
+    Args:
+        landmarks: (33, 4) landmark array in full-frame normalized coordinates
+    
+    Returns:
+        Normalized (x0, y0, x1, y1) clamped to the frame, or None when too few
+        landmarks are visible or the box would cover more than max_area of the frame
+    """
+    visible = landmarks[landmarks[:, VISIBILITY] >= ROI_MIN_VISIBILITY]
+    if len(visible) < 4:
+        return None
+    
+    x_min, y_min = visible[:, X].min(), visible[:, Y].min()
+    x_max, y_max = visible[:, X].max(), visible[:, Y].max()
+    pad_x = (x_max - x_min) * padding
+    pad_y = (y_max - y_min) * padding
+    roi = (
+        max(0.0, float(x_min - pad_x)),
+        max(0.0, float(y_min - pad_y)),
+        min(1.0, float(x_max + pad_x)),
+        min(1.0, float(y_max + pad_y))
+    )
+    if (roi[2] - roi[0]) * (roi[3] - roi[1]) > max_area:
+        return None
+    return roi
+
+def roi_moved(previous, current, threshold=ROI_RESET_SHIFT):
+    """
+    Whether switching crops moves or scales the view by more than threshold.
+    
+    Args:
+        previous: Crop as normalized (x0, y0, x1, y1), None for the full frame
+        current: Crop switched to, None for the full frame
+    """
+    previous = previous or (0.0, 0.0, 1.0, 1.0)
+    current = current or (0.0, 0.0, 1.0, 1.0)
+    width, height = previous[2] - previous[0], previous[3] - previous[1]
+    shift = max(abs(current[0] + current[2] - previous[0] - previous[2]) / 2 / width,
+                abs(current[1] + current[3] - previous[1] - previous[3]) / 2 / height)
+    scale = max(abs((current[2] - current[0]) / width - 1), abs((current[3] - current[1]) / height - 1))
+    return shift > threshold or scale > threshold
+
+def roi_contains(current, landmarks, needed, margin=0.05, max_growth=2.0):
+    """
+    Whether the current crop still fits a pose.
+    
+    The crop is kept while every visible landmark is at least margin (a share
+    of the crop size) inside it and it is at most max_growth times the area of
+    the box the pose needs now, so small movements do not move the crop (and
+    restart tracking) on every frame.
+    
+    Args:
+        current: Current crop as normalized (x0, y0, x1, y1)
+        landmarks: (33, 4) landmark array in full-frame normalized coordinates
+        needed: roi_from_landmarks box for the same landmarks
+    """
+    visible = landmarks[landmarks[:, VISIBILITY] >= ROI_MIN_VISIBILITY]
+    margin_x = (current[2] - current[0]) * margin
+    margin_y = (current[3] - current[1]) * margin
+    inside = (visible[:, X].min() >= current[0] + margin_x and visible[:, X].max() <= current[2] - margin_x and
+              visible[:, Y].min() >= current[1] + margin_y and visible[:, Y].max() <= current[3] - margin_y)
+    area = lambda box: (box[2] - box[0]) * (box[3] - box[1])
+    return inside and area(current) <= max_growth * area(needed)
+
+def analyze_posture(video_path, report_id=None, early_stopping=None):
     """
     Simplified posture analysis focusing on core metrics only.
     
     Args:
         video_path: Path to the video file
+        report_id: Optional report ID; when given the landmarks are stored
+                   under tmp/{report_id}/landmarks and archived for re-scoring
+                   (see rescore_report)
+        early_stopping: Estimate the posture percentages from a stratified
+                        random subset of frames (see _analyze_early_stopping);
+                        defaults to POSE_EARLY_STOPPING
     """
     # Check if the video file exists
     if not os.path.exists(video_path):
@@ -34,17 +477,421 @@ def analyze_posture(video_path):
 
     logger.info(f"Starting simplified posture analysis for: {video_path}")
     
-    # Open video
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError("Could not open video file")
+    source = FrameSource(video_path)
+    
+    # Sample 1 frame per second of video for efficiency unless sampling adapts to motion.
+    # Early stopping picks its frames by number, on the same grid at the nominal frame rate.
+    skip_interval = max(1, round(SAMPLE_INTERVAL_MS / 1000 * (source.fps or 30)))
+    frame_budget = FRAME_BUDGET if ADAPTIVE_SAMPLING_ENABLED else None
+    landmark_dir = get_landmark_dir(report_id) if report_id else None
+    meta = {"video_path": video_path, "fps": source.fps, "sample_interval_ms": SAMPLE_INTERVAL_MS,
+            "adaptive_sampling": ADAPTIVE_SAMPLING_ENABLED, "frame_budget": frame_budget}
+    
+    if early_stopping is None:
+        early_stopping = EARLY_STOPPING_ENABLED
+    
+    shard_count = _get_shard_count(source.fps, source.total_frames)
+    facial_metrics = None
+    if early_stopping and source.total_frames >= skip_interval:
+        meta["early_stopping"] = True
+        with _face_stage() as face_stage:
+            landmarks, frame_numbers, timestamps_ms, carried_over, frame_stats, movement = _analyze_early_stopping(
+                source, skip_interval, face_stage=face_stage
+            )
+        meta["movement"] = movement
+        if face_stage:
+            facial_metrics = face_stage.metrics.take(np.argsort(face_stage.metrics.column("frame")))
+            frame_stats["face_stage"] = face_stage.stats
+        if landmark_dir:
+            _store_landmarks(landmark_dir, landmarks, frame_numbers, timestamps_ms, carried_over, **meta)
+    elif shard_count > 1:
+        source.close()
+        shards = plan_shards(source.total_frames, shard_count, int(SHARD_OVERLAP_SECONDS * source.fps))
+        landmarks, frame_numbers, timestamps_ms, carried_over, frame_stats, facial_metrics = _analyze_sharded(
+            video_path, shards, source.total_frames, frame_budget
+        )
+        if landmark_dir:
+            _store_landmarks(landmark_dir, landmarks, frame_numbers, timestamps_ms, carried_over,
+                             shards=shard_count, **meta)
+    else:
+        sampler = AdaptiveSampler(source.duration_ms, frame_budget) if frame_budget else None
+        with _pose_stage(frame_budget) as (pose, face_stage):
+            pose_analyzer = source.register(PoseFrameAnalyzer(landmark_dir, pose, sampler=sampler, face_stage=face_stage,
+                                                              holistic=HOLISTIC_MODE),
+                                            interval_ms=SAMPLE_INTERVAL_MS, sampler=sampler)
+            try:
+                frame_stats = source.run()
+            finally:
+                pose_analyzer.close(**meta)
+        if face_stage:
+            facial_metrics = face_stage.metrics
+            frame_stats["face_stage"] = face_stage.stats
+        frame_stats["pose_roi"] = pose_analyzer.roi_stats
+        frame_stats["pose_gate"] = pose_analyzer.get_gate_stats()
+        landmarks, timestamps_ms = pose_analyzer.get_landmarks()
+        carried_over = pose_analyzer.get_carried_over()
+    
+    if report_id:
+        archive_landmarks(report_id, landmarks, timestamps_ms, meta, carried_over)
+    
+    results = score_landmarks(landmarks, timestamps_ms, weight_by_duration=not meta.get("early_stopping"),
+                              movement=meta.get("movement"))
+    results['frame_stats'] = frame_stats
+    if facial_metrics is not None:
+        summary = summarize_facial_engagement(facial_metrics, frame_stats['frame_count'])
+        results['facial'] = score_facial_engagement(summary)
+    
+    # Log the detected issues to help with debugging
+    print(f"Detected {len(results['issues'])} posture issues:")
+    for issue in results['issues']:
+        print(f"  - {issue['topic']}")
+    
+    return results
+
+@contextlib.contextmanager
+def _face_stage(expected_frames=None):
+    """HeadFaceAnalyzer on a pooled face mesh graph, or None when the face stage is off"""
+    if not FACE_STAGE_ENABLED:
+        yield None
+        return
+    with face_mesh_graphs.checkout() as face_mesh:
+        yield HeadFaceAnalyzer(face_mesh, expected_frames or 256)
+
+@contextlib.contextmanager
+def _pose_stage(expected_frames=None):
+    """
+    Pose graph and face stage for a pass over the video in order: one pooled
+    Holistic graph for both in holistic mode, otherwise a pooled Pose graph
+    and the FaceMesh head-crop stage.
+    """
+    if not HOLISTIC_MODE:
+        with pose_graphs.checkout() as pose, _face_stage(expected_frames) as face_stage:
+            yield pose, face_stage
+        return
+    with holistic_graphs.checkout() as holistic:
+        yield holistic, HeadFaceAnalyzer(holistic, expected_frames or 256) if FACE_STAGE_ENABLED else None
+
+def _store_landmarks(landmark_dir, landmarks, frame_numbers, timestamps_ms, carried_over, **meta):
+    """Write landmarks gathered in memory to landmark_dir in the LandmarkWriter format"""
+    writer = LandmarkWriter(landmark_dir)
+    for frame_number, timestamp_ms, row, carried in zip(frame_numbers, timestamps_ms, landmarks, carried_over):
+        writer.append(frame_number, timestamp_ms, row, carried)
+    writer.close(**meta)
+
+def _analyze_early_stopping(source, skip_interval, strata=EARLY_STOPPING_STRATA,
+                            min_frames=EARLY_STOPPING_MIN_FRAMES, rng=None, face_stage=None):
+    """
+    Analyze the 1 fps frames of a video in a randomized stratified order,
+    stopping once the reported result is settled.
+    
+    Each round seeks to one random frame in each of `strata` stretches of
+    the video. After a round the posture rule hit rates so far are checked
+    with buckets_settled: once the confidence interval of every rule is clear
+    of the 15/30/50% boundaries (and the detection rate of the poor-quality
+    cutoff) the remaining frames cannot plausibly change which issues are
+    reported or how severe they are. If that never happens every frame is
+    analyzed, as in the regular path.
+    
+    Frames are not consecutive, so pose runs in static image mode without
+    ROI cropping or the motion gate. The samples stand for the video with
+    equal weight, as in the stopping rule, so score them with
+    weight_by_duration=False. Movement cannot be measured between frames
+    seconds apart; it is measured with measure_movement on a window of
+    consecutive frames from the middle of the video instead.
+    
+    Returns:
+        Tuple of (landmarks, frame_numbers, timestamps_ms, carried_over,
+        frame_stats, movement) with the samples in video order and movement
+        for score_landmarks
+    """
+    candidates = np.arange(skip_interval, source.total_frames + 1, skip_interval)
+    rounds = stratified_order(candidates, strata, rng)
+    
+    rule_hits = np.zeros(len(RULE_NAMES), dtype=np.int64)
+    detected = 0
+    rounds_run = 0
+    try:
+        with static_pose_graphs.checkout() as pose:
+            pose_analyzer = PoseFrameAnalyzer(pose=pose, use_roi=False, use_motion_gate=False, face_stage=face_stage)
+            for frame_numbers in rounds:
+                start = len(pose_analyzer.landmarks)
+                for frame_number in frame_numbers:
+                    frame = source.read_frame(frame_number)
+                    if frame is not None:
+                        pose_analyzer.process_frame(frame)
+                rounds_run += 1
+                
+                # Update the running rule counts with this round's detected poses
+                rows = pose_analyzer.landmarks[start:]
+                poses = [row for row in rows if not np.isnan(row[:, VISIBILITY]).any()]
+                if poses:
+                    detected += len(poses)
+                    rule_hits += evaluate_posture_rules(np.stack(poses)).sum(axis=0)
+                
+                processed = len(pose_analyzer.landmarks)
+                if processed >= min_frames and buckets_settled(rule_hits, detected, processed):
+                    break
+            pose_analyzer.close()
+            
+            window = _movement_window(candidates, skip_interval)
+            movement_analyzer = PoseFrameAnalyzer(pose=pose, use_roi=False, use_motion_gate=False)
+            for frame_number in window:
+                frame = source.read_frame(frame_number)
+                if frame is not None:
+                    movement_analyzer.process_frame(frame)
+            movement_analyzer.close()
+    finally:
+        source.close()
+    movement = measure_movement(*movement_analyzer.get_landmarks())
+    
+    landmarks, timestamps_ms = pose_analyzer.get_landmarks()
+    frame_numbers = np.array([frame_number for frame_number, _, _ in pose_analyzer.frames], dtype=np.int64)
+    order = np.argsort(frame_numbers)
+    analyzed = len(frame_numbers)
+    logger.info(f"Early stopping analyzed {analyzed} of {len(candidates)} frames in {rounds_run} rounds")
+    
+    frame_stats = {
+        "frame_count": source.total_frames,
+        "decoded_frames": analyzed,
+        "skipped_frames": 0,
+        "analyzed_frames": {type(pose_analyzer).__name__: analyzed},
+        "fps": source.fps,
+        "total_frames": source.total_frames,
+        "early_stopping": {
+            "candidate_frames": len(candidates),
+            "analyzed_frames": analyzed,
+            "rounds": rounds_run,
+            "stopped_early": rounds_run < len(rounds),
+            "movement_window_frames": len(window)
+        }
+    }
+    return (landmarks[order], frame_numbers[order], timestamps_ms[order],
+            pose_analyzer.get_carried_over()[order], frame_stats, movement)
+
+def _movement_window(candidates, skip_interval):
+    """Consecutive candidate frames from the middle of the video for measuring movement"""
+    size = max(1, round(EARLY_STOPPING_MOVEMENT_SECONDS * 1000 / SAMPLE_INTERVAL_MS))
+    start = max(0, (len(candidates) - size) // 2)
+    return candidates[start:start + size]
+
+def _get_shard_count(fps, total_frames):
+    """Number of time shards to split a video into (1 means the single-process path)"""
+    worker_count = get_shard_worker_count()
+    if worker_count <= 1 or not fps or total_frames <= 0:
+        return 1
+    duration = total_frames / fps
+    if duration < LONG_VIDEO_SECONDS:
+        return 1
+    return max(1, min(worker_count, int(duration // MIN_SHARD_SECONDS)))
+
+def plan_shards(total_frames, shard_count, overlap_frames):
+    """
+    Split a video into contiguous frame ranges.
+    
+    Returns:
+        List of (warmup_start, start, end) tuples: a shard analyzes frames
+        start+1..end and runs the pose graph from warmup_start to re-establish
+        tracking first. The last shard's end is None so it reads to the end of
+        the stream, whatever the container reported as its frame count.
+    """
+    bounds = [round(i * total_frames / shard_count) for i in range(shard_count + 1)]
+    shards = []
+    for i in range(shard_count):
+        start = bounds[i]
+        end = bounds[i + 1] if i < shard_count - 1 else None
+        shards.append((max(0, start - overlap_frames), start, end))
+    return shards
+
+def get_shard_worker_count():
+    """Processes in the shard pool (POSE_SHARD_WORKERS, or this worker's share of the cores)"""
+    return SHARD_WORKERS or worker_pool.nested_worker_count()
+
+def _init_shard_worker(worker_count):
+    silence_native_logs()
+    # Split this analysis worker's share of the cores between its shard workers
+    cv2.setNumThreads(max(1, worker_pool.nested_worker_count() // worker_count))
+    preload()
+
+def _get_shard_executor():
+    global _shard_executor
+    with _shard_executor_lock:
+        if _shard_executor is None:
+            worker_count = get_shard_worker_count()
+            _shard_executor = ProcessPoolExecutor(
+                max_workers=worker_count,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_shard_worker,
+                initargs=(worker_count,)
+            )
+            worker_pool.register_nested_pool(shutdown_shard_executor)
+        return _shard_executor
+
+def shutdown_shard_executor():
+    """Shut down the shard pool (runs with worker_pool.shutdown)"""
+    global _shard_executor
+    with _shard_executor_lock:
+        executor, _shard_executor = _shard_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def analyze_shard(video_path, warmup_start, start, end, frame_budget=None):
+    """
+    Run pose detection on one time range of a video.
+    
+    Frames are sampled every SAMPLE_INTERVAL_MS on the same timestamp grid
+    as an unsharded run, or adaptively (see AdaptiveSampler) with a frame_budget.
+    
+    Returns:
+        Dict with landmarks (N, 33, 4), frame_numbers and timestamps_ms of the
+        frames after start (the warm-up overlap is dropped) and the FrameSource stats
+    """
+    source = FrameSource(video_path, start_frame=warmup_start, end_frame=end)
+    sampler = None
+    if frame_budget:
+        last_frame = end if end is not None else source.total_frames
+        frame_ms = 1000 / (source.fps or 30)
+        sampler = AdaptiveSampler((last_frame - warmup_start) * frame_ms, frame_budget, start_ms=warmup_start * frame_ms)
+    with _pose_stage(frame_budget) as (pose, face_stage):
+        pose_analyzer = source.register(PoseFrameAnalyzer(pose=pose, sampler=sampler, face_stage=face_stage,
+                                                          holistic=HOLISTIC_MODE),
+                                        interval_ms=SAMPLE_INTERVAL_MS, sampler=sampler)
+        try:
+            stats = source.run()
+        finally:
+            pose_analyzer.close()
+    stats["pose_roi"] = pose_analyzer.roi_stats
+    stats["pose_gate"] = pose_analyzer.gate_stats
+    
+    landmarks, timestamps_ms = pose_analyzer.get_landmarks()
+    frame_numbers = np.array([frame_number for frame_number, _, _ in pose_analyzer.frames], dtype=np.int64)
+    keep = frame_numbers > start
+    facial_metrics = None
+    if face_stage:
+        stats["face_stage"] = face_stage.stats
+        facial_metrics = face_stage.metrics.take(face_stage.metrics.column("frame") > start)
+    return {
+        "landmarks": landmarks[keep],
+        "frame_numbers": frame_numbers[keep],
+        "timestamps_ms": timestamps_ms[keep],
+        "carried_over": pose_analyzer.get_carried_over()[keep],
+        "facial_metrics": facial_metrics,
+        "stats": stats
+    }
+
+def merge_shard_results(shard_results):
+    """
+    Concatenate per-shard results (in video order) into one landmark tensor.
+    
+    Returns:
+        Tuple of (landmarks, frame_numbers, timestamps_ms, carried_over,
+        frame_stats), with frame_stats in the FrameSource.run format plus the
+        number of shards
+    """
+    landmarks = np.concatenate([shard["landmarks"] for shard in shard_results])
+    frame_numbers = np.concatenate([shard["frame_numbers"] for shard in shard_results])
+    timestamps_ms = np.concatenate([shard["timestamps_ms"] for shard in shard_results])
+    carried_over = np.concatenate([shard["carried_over"] for shard in shard_results])
+    
+    shard_stats = [shard["stats"] for shard in shard_results]
+    analyzed_frames = {}
+    pose_roi = {}
+    pose_gate = {"inferred_frames": 0, "carried_frames": 0}
+    face_stage = {}
+    for stats in shard_stats:
+        for name, count in stats["analyzed_frames"].items():
+            analyzed_frames[name] = analyzed_frames.get(name, 0) + count
+        for name, count in stats.get("pose_roi", {}).items():
+            pose_roi[name] = pose_roi.get(name, 0) + count
+        for name, count in stats.get("pose_gate", {}).items():
+            pose_gate[name] = pose_gate.get(name, 0) + count
+        for name, count in stats.get("face_stage", {}).items():
+            face_stage[name] = face_stage.get(name, 0) + count
+    pose_gate["skip_ratio"] = _skip_ratio(pose_gate)
+    
+    # Decoded and skipped counts include the warm-up overlap of each shard
+    frame_stats = {
+        "frame_count": shard_stats[-1]["frame_count"],
+        "decoded_frames": sum(stats["decoded_frames"] for stats in shard_stats),
+        "skipped_frames": sum(stats["skipped_frames"] for stats in shard_stats),
+        "analyzed_frames": analyzed_frames,
+        "fps": shard_stats[0]["fps"],
+        "total_frames": shard_stats[0]["total_frames"],
+        "pose_roi": pose_roi,
+        "pose_gate": pose_gate,
+        "shards": len(shard_results)
+    }
+    if face_stage:
+        frame_stats["face_stage"] = face_stage
+    return landmarks, frame_numbers, timestamps_ms, carried_over, frame_stats
+
+def _analyze_sharded(video_path, shards, total_frames, frame_budget=None):
+    """
+    Analyze the shards in parallel and merge them in order.
+    
+    Returns:
+        The merge_shard_results tuple plus the shards' FacialMetrics joined
+        in order (None when the face stage is off)
+    """
+    executor = _get_shard_executor()
+    futures = []
+    for warmup_start, start, end in shards:
+        # Each shard gets the share of the frame budget matching its length
+        shard_budget = None
+        if frame_budget:
+            shard_frames = (end if end is not None else total_frames) - warmup_start
+            shard_budget = max(1, math.ceil(frame_budget * shard_frames / total_frames))
+        futures.append(executor.submit(
+            analyze_shard, video_path, warmup_start, start, end, shard_budget
+        ))
+    shard_results = [future.result() for future in futures]
+    results = merge_shard_results(shard_results)
+    logger.info(f"Analyzed {len(shards)} shards of {video_path} across {get_shard_worker_count()} workers")
+    
+    facial_parts = [shard["facial_metrics"] for shard in shard_results if shard.get("facial_metrics") is not None]
+    facial_metrics = FacialMetrics.concatenate(facial_parts) if facial_parts else None
+    return results + (facial_metrics,)
+
+def summarize_posture(pose_analyzer):
+    """
+    Score the landmarks recorded by a finished PoseFrameAnalyzer.
+    
+    Args:
+        pose_analyzer: PoseFrameAnalyzer that has processed the video
+    """
+    landmarks, timestamps_ms = pose_analyzer.get_landmarks()
+    return score_landmarks(landmarks, timestamps_ms)
+
+def score_landmarks(landmarks, timestamps_ms=None, thresholds=None, issue_threshold=ISSUE_THRESHOLD_PERCENT,
+                    weight_by_duration=True, movement=None):
+    """
+    Compute every body-language metric in one batched pass over a landmark tensor.
+    
+    Args:
+        landmarks: (N, 33, 4) array of x, y, z, visibility per analyzed frame,
+                   NaN rows for frames without a detected pose
+        timestamps_ms: Optional (N,) frame presentation timestamps. Each frame is
+                       then weighted by the time until the next one, so adaptively
+                       sampled stretches count for their duration rather than
+                       their frame count, and movement is measured per second
+                       of real time
+        thresholds: Optional {rule name: threshold} overrides for POSTURE_RULES
+        issue_threshold: Percentage of detected frames above which an issue is reported
+        weight_by_duration: Weight frames by the time until the next one; off
+                            for random samples that each stand for the video
+                            equally (early stopping)
+        movement: Optional measure_movement result to use instead of measuring
+                  movement between the given frames (for sparse samples)
     
-    frame_rate = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    Returns:
+        Dict with score, detected_frames, detection_rate and issues, plus
+        movement_metrics and gesture_metrics
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    detected = ~np.isnan(landmarks[:, :, VISIBILITY]).any(axis=1)
+    poses = landmarks[detected]
     
-    # Analysis tracking variables
-    processed_frames = 0
-    detected_frames = 0
+    processed_frames = len(landmarks)
+    detected_frames = int(detected.sum())
     
     # Core posture metrics - expanded to include more metrics
     # In the pose_analysis_service.py, we now handle multiple aspects of body language analysis:
@@ -59,88 +906,23 @@ def analyze_posture(video_path):
         'hand_position_frames': 0,  # Gesture element
     }
     
-    # Track frame sequences for movement analysis
-    position_history = []
-    
-    # Skip interval (process 1 frame per second for efficiency)
-    skip_interval = max(1, int(frame_rate))
+    # Evaluate the posture rule table over all detected frames at once
+    if detected_frames:
+        hits = evaluate_posture_rules(poses, thresholds)
+        if timestamps_ms is None or not weight_by_duration:
+            rule_counts = hits.sum(axis=0)
+        else:
+            # Frame counts weighted by duration (equal to plain counts for uniform sampling)
+            weights = frame_weights(timestamps_ms)[detected]
+            rule_counts = (hits * (weights / weights.mean())[:, None]).sum(axis=0)
+        posture_data.update((name, count.item()) for name, count in zip(RULE_NAMES, rule_counts))
     
-    # Process video with simplified settings
-    with mp_pose.Pose(
-        min_detection_confidence=0.5,  # Lower threshold to detect more poses
-        min_tracking_confidence=0.5,
-        model_complexity=1,  # Medium complexity for balance
-        smooth_landmarks=True
-    ) as pose:
-        frame_count = 0
-        
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            frame_count += 1
-            
-            # Skip frames for efficiency
-            if frame_count % skip_interval != 0:
-                continue
-                
-            processed_frames += 1
-            
-            # Resize large frames for better performance
-            h, w = frame.shape[:2]
-            if w > 640:
-                resize_factor = 640 / w
-                frame = cv2.resize(frame, (640, int(h * resize_factor)))
-            
-            # Convert to RGB and process
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = pose.process(image)
-            
-            if results.pose_landmarks:
-                detected_frames += 1
-                landmarks = results.pose_landmarks.landmark
-                
-                # Store position for movement analysis
-                position = extract_position(landmarks)
-                if position:
-                    position_history.append(position)
-                
-                # Simple posture checks
-                # 1. Head tilt check
-                if is_head_tilted(landmarks):
-                    posture_data['head_tilt_frames'] += 1
-                
-                # 2. Forward lean check
-                if is_leaning_forward(landmarks):
-                    posture_data['forward_lean_frames'] += 1
-                
-                # 3. Shoulder imbalance check
-                if has_shoulder_imbalance(landmarks):
-                    posture_data['shoulder_imbalance_frames'] += 1
-                
-                # 4. Slouching check
-                if is_slouching(landmarks):
-                    posture_data['slouching_frames'] += 1
-                    
-                # 5. Eye contact check (based on face orientation)
-                if not has_good_eye_contact(landmarks):
-                    posture_data['eye_contact_frames'] += 1
-                    
-                # 6. Rigid posture check
-                if has_rigid_posture(landmarks):
-                    posture_data['rigid_posture_frames'] += 1
-                    
-                # 7. Hand position check
-                if has_poor_hand_position(landmarks):
-                    posture_data['hand_position_frames'] += 1
-    
-    cap.release()
-    
-    # Process movement data
-    if len(position_history) > 10:
-        excessive_movement = analyze_movement(position_history)
-        posture_data['excessive_movement_frames'] = int(excessive_movement * detected_frames)
+    # Movement between consecutive frames, unless measured separately
+    if movement is None:
+        movement = measure_movement(landmarks, timestamps_ms)
+    posture_data['excessive_movement_frames'] = int(movement['excessive_movement'] * detected_frames)
+    movement_metrics = movement['movement_metrics']
+    gesture_metrics = analyze_hand_gestures_batch(poses)
     
     # Calculate detection quality
     detection_rate = (detected_frames / processed_frames) * 100 if processed_frames > 0 else 0
@@ -171,7 +953,7 @@ def analyze_posture(video_path):
         for issue_name, frames in posture_data.items():
             percentage = (frames / detected_frames) * 100
             # Lower threshold to 15% to catch more issues
-            if percentage > 15:
+            if percentage > issue_threshold:
                 issues.append({
                     'issue': issue_name.replace('_frames', '').replace('_', ' ').title(),
                     'percentage': percentage
@@ -206,213 +988,85 @@ def analyze_posture(video_path):
     # Base score is 9, subtract points based on severity and percentage
     score = calculate_score(issues)
     
-    # Log the detected issues to help with debugging
-    print(f"Detected {len(main_issues)} posture issues:")
-    for issue in main_issues:
-        print(f"  - {issue['topic']}")
-    
     return {
         'score': score,
         'detected_frames': detected_frames,
         'detection_rate': detection_rate,
-        'issues': main_issues
+        'issues': main_issues,
+        'movement_metrics': movement_metrics,
+        'gesture_metrics': gesture_metrics
     }
 
-def extract_position(landmarks):
-    """Extract key position data for movement analysis"""
-    try:
-        # Use nose as the central tracking point
-        nose = landmarks[mp_pose.PoseLandmark.NOSE]
-        if nose.visibility < 0.5:
-            return None
-        return {
-            'x': nose.x,
-            'y': nose.y,
-            'visibility': nose.visibility
-        }
-    except:
-        return None
-
-def analyze_movement(position_history):
-    """Analyze movement patterns and return excessive movement ratio (0-1)"""
-    try:
-        # Calculate frame-to-frame movement
-        movements = []
-        for i in range(1, len(position_history)):
-            prev = position_history[i-1]
-            curr = position_history[i]
-            
-            # Calculate Euclidean distance
-            distance = math.sqrt(
-                (curr['x'] - prev['x'])**2 + 
-                (curr['y'] - prev['y'])**2
-            )
-            movements.append(distance)
-        
-        # Calculate statistics
-        avg_movement = np.mean(movements)
-        
-        # Threshold for excessive movement (calibrated for webcam)
-        if avg_movement > 0.03:  # Significant movements
-            return 0.8  # 80% of frames have excessive movement
-        elif avg_movement > 0.015:  # Moderate movements
-            return 0.5  # 50% of frames have excessive movement
-        elif avg_movement > 0.01:  # Slight movements
-            return 0.2  # 20% of frames have excessive movement
-        else:
-            return 0  # No excessive movement
-    except:
-        return 0
-
-def is_head_tilted(landmarks):
-    """Simple check for head tilt."""
-    try:
-        left_ear = landmarks[mp_pose.PoseLandmark.LEFT_EAR]
-        right_ear = landmarks[mp_pose.PoseLandmark.RIGHT_EAR]
-        
-        if left_ear.visibility < 0.5 or right_ear.visibility < 0.5:
-            return False
-            
-        y_diff = abs(left_ear.y - right_ear.y)
-        # Lower threshold to catch more issues
-        return y_diff > 0.02
-    except:
-        return False
-
-def is_leaning_forward(landmarks):
-    """Simple check for forward leaning."""
-    try:
-        nose = landmarks[mp_pose.PoseLandmark.NOSE]
-        left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        
-        if nose.visibility < 0.5 or left_shoulder.visibility < 0.5 or right_shoulder.visibility < 0.5:
-            return False
-            
-        shoulder_x = (left_shoulder.x + right_shoulder.x) / 2
-        horizontal_diff = abs(nose.x - shoulder_x)
-        # Lower threshold to catch more issues
-        return horizontal_diff > 0.08
-    except:
-        return False
-
-def has_shoulder_imbalance(landmarks):
-    """Simple check for uneven shoulders."""
-    try:
-        left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        
-        if left_shoulder.visibility < 0.5 or right_shoulder.visibility < 0.5:
-            return False
-            
-        y_diff = abs(left_shoulder.y - right_shoulder.y)
-        # Lower threshold to catch more issues
-        return y_diff > 0.025
-    except:
-        return False
-
-def is_slouching(landmarks):
-    """Simple check for slouching posture."""
-    try:
-        left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        left_hip = landmarks[mp_pose.PoseLandmark.LEFT_HIP]
-        right_hip = landmarks[mp_pose.PoseLandmark.RIGHT_HIP]
-        
-        # Require good visibility of all landmarks
-        if (left_shoulder.visibility < 0.5 or right_shoulder.visibility < 0.5 or
-            left_hip.visibility < 0.5 or right_hip.visibility < 0.5):
-            return False
-            
-        # Calculate back angle from vertical
-        shoulder_midpoint = [(left_shoulder.x + right_shoulder.x) / 2, (left_shoulder.y + right_shoulder.y) / 2]
-        hip_midpoint = [(left_hip.x + right_hip.x) / 2, (left_hip.y + right_hip.y) / 2]
-        
-        # A straight back should have the shoulders directly above hips
-        # If shoulders are significantly forward of hips, that's slouching
-        x_diff = shoulder_midpoint[0] - hip_midpoint[0]
-        # Lower threshold to catch more issues
-        return x_diff > 0.04
-    except:
-        return False
+def measure_movement(landmarks, timestamps_ms=None):
+    """
+    Movement of the presenter across consecutive analyzed frames.
+    
+    Returns:
+        Dict with excessive_movement (the analyze_movement ratio of the nose
+        track) and movement_metrics (analyze_presenter_movement_batch of the
+        hip track)
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    detected = ~np.isnan(landmarks[:, :, VISIBILITY]).any(axis=1)
+    poses = landmarks[detected]
+    timestamps = np.asarray(timestamps_ms, dtype=np.float64)[detected] if timestamps_ms is not None else None
+    
+    # Nose track of frames where the nose is clearly visible
+    excessive_movement = 0
+    nose_visible = poses[:, NOSE, VISIBILITY] >= 0.5
+    position_history = poses[nose_visible][:, NOSE, :2]
+    if len(position_history) > 10:
+        nose_timestamps = timestamps[nose_visible] if timestamps is not None else None
+        excessive_movement = analyze_movement(position_history, nose_timestamps)
+    
+    hip_centers = (poses[:, LEFT_HIP, :2] + poses[:, RIGHT_HIP, :2]) / 2
+    return {
+        "excessive_movement": excessive_movement,
+        "movement_metrics": analyze_presenter_movement_batch(hip_centers, timestamps_ms=timestamps)
+    }
 
-def has_good_eye_contact(landmarks):
-    """Check if the person is looking at the camera (approximation)"""
-    try:
-        # We use nose and eyes to estimate gaze direction
-        nose = landmarks[mp_pose.PoseLandmark.NOSE]
-        left_eye = landmarks[mp_pose.PoseLandmark.LEFT_EYE]
-        right_eye = landmarks[mp_pose.PoseLandmark.RIGHT_EYE]
-        
-        if (nose.visibility < 0.7 or left_eye.visibility < 0.7 or 
-            right_eye.visibility < 0.7):
-            return True  # Default to true if we can't detect well
-        
-        # Calculate eye midpoint
-        eye_midpoint = [(left_eye.x + right_eye.x) / 2, (left_eye.y + right_eye.y) / 2]
-        
-        # If nose is significantly to the side of eye midpoint, probably not looking at camera
-        x_diff = abs(nose.x - eye_midpoint[0])
-        return x_diff < 0.02  # Small threshold for "looking at camera"
-    except:
-        return True  # Default to true in case of error
-
-def has_rigid_posture(landmarks):
-    """Check for overly stiff/rigid posture"""
-    try:
-        # Calculate overall body alignment - perfectly straight might indicate rigidity
-        left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        left_hip = landmarks[mp_pose.PoseLandmark.LEFT_HIP]
-        right_hip = landmarks[mp_pose.PoseLandmark.RIGHT_HIP]
-        
-        if (left_shoulder.visibility < 0.5 or right_shoulder.visibility < 0.5 or
-            left_hip.visibility < 0.5 or right_hip.visibility < 0.5):
-            return False
-        
-        # Calculate how perfectly aligned the body is
-        shoulder_midpoint = [(left_shoulder.x + right_shoulder.x) / 2, (left_shoulder.y + right_shoulder.y) / 2]
-        hip_midpoint = [(left_hip.x + right_hip.x) / 2, (left_hip.y + right_hip.y) / 2]
-        
-        # Check vertical alignment - extremely straight posture might be rigid
-        x_diff = abs(shoulder_midpoint[0] - hip_midpoint[0])
-        return x_diff < 0.01  # Very small threshold indicates rigid posture
-    except:
-        return False
+def frame_weights(timestamps_ms):
+    """
+    Time each analyzed frame stands for: the gap to the next frame (the last
+    frame gets the median gap). Uniform sampling gives equal weights.
+    """
+    timestamps = np.asarray(timestamps_ms, dtype=np.float64)
+    if len(timestamps) < 2:
+        return np.ones(len(timestamps))
+    gaps = np.diff(timestamps)
+    weights = np.append(gaps, np.median(gaps))
+    if not (weights > 0).all():
+        return np.ones(len(timestamps))
+    return weights
 
-def has_poor_hand_position(landmarks):
-    """Check for inappropriate hand positions"""
-    try:
-        # Get wrist and hip landmarks
-        left_wrist = landmarks[mp_pose.PoseLandmark.LEFT_WRIST]
-        right_wrist = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST]
-        left_hip = landmarks[mp_pose.PoseLandmark.LEFT_HIP]
-        right_hip = landmarks[mp_pose.PoseLandmark.RIGHT_HIP]
-        
-        if (left_wrist.visibility < 0.5 or right_wrist.visibility < 0.5):
-            return False
-            
-        # Check if hands are behind back or in pockets (close to hips)
-        left_hand_near_hip = False
-        right_hand_near_hip = False
-        
-        if left_hip.visibility > 0.5:
-            left_distance = math.sqrt(
-                (left_wrist.x - left_hip.x)**2 + 
-                (left_wrist.y - left_hip.y)**2
-            )
-            left_hand_near_hip = left_distance < 0.15
-            
-        if right_hip.visibility > 0.5:
-            right_distance = math.sqrt(
-                (right_wrist.x - right_hip.x)**2 + 
-                (right_wrist.y - right_hip.y)**2
-            )
-            right_hand_near_hip = right_distance < 0.15
-        
-        return left_hand_near_hip or right_hand_near_hip
-    except:
-        return False
+def analyze_movement(position_history, timestamps_ms=None):
+    """
+    Analyze movement patterns and return excessive movement ratio (0-1)
+    
+    Args:
+        position_history: (N, 2) array of tracked x, y positions
+        timestamps_ms: Optional (N,) timestamps; movement is then measured per
+                       second of video instead of per analyzed frame
+    """
+    positions = np.asarray(position_history, dtype=np.float64)
+    if len(positions) < 2:
+        return 0
+    
+    # Average frame-to-frame Euclidean distance (per second when timestamps are known,
+    # which is the same thing at the original one frame per second)
+    steps = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+    seconds = np.diff(np.asarray(timestamps_ms, dtype=np.float64)).sum() / 1000 if timestamps_ms is not None else 0
+    avg_movement = steps.sum() / seconds if seconds > 0 else steps.mean()
+    
+    # Threshold for excessive movement (calibrated for webcam)
+    if avg_movement > 0.03:  # Significant movements
+        return 0.8  # 80% of frames have excessive movement
+    elif avg_movement > 0.015:  # Moderate movements
+        return 0.5  # 50% of frames have excessive movement
+    elif avg_movement > 0.01:  # Slight movements
+        return 0.2  # 20% of frames have excessive movement
+    else:
+        return 0  # No excessive movement
 
 def get_detailed_feedback(issue_name, percentage):
     """Return detailed feedback for each issue type, including severity and impact."""
@@ -607,7 +1261,7 @@ def generate_posture_report(video_path, report_id):
         os.makedirs(report_dir, exist_ok=True)
         
         # Run simplified analysis
-        analysis_results = analyze_posture(video_path)
+        analysis_results = analyze_posture(video_path, report_id)
         
         # Save text report
         report_filename = f"{report_dir}/body_analysis.txt"
@@ -616,6 +1270,9 @@ def generate_posture_report(video_path, report_id):
             f.write("===========================\n\n")
             f.write(f"Video: {video_path}\n")
             f.write(f"Detection rate: {analysis_results['detection_rate']:.1f}%\n")
+            frame_stats = analysis_results.get('frame_stats')
+            if frame_stats:
+                f.write(f"Frames decoded: {frame_stats['decoded_frames']} of {frame_stats['frame_count']}\n")
             f.write(f"Overall score: {analysis_results['score']}/10\n\n")
             
             if 'error' in analysis_results:
@@ -629,34 +1286,24 @@ def generate_posture_report(video_path, report_id):
                     f.write(f"   Suggestion: {issue['suggestions'][0]}\n\n")
             else:
                 f.write("No significant posture issues detected.\n")
+            
+            facial = analysis_results.get('facial')
+            if facial:
+                f.write("\nFacial engagement:\n")
+                if facial['score'] is None:
+                    f.write(f"Note: {facial['error']}\n")
+                else:
+                    f.write(f"Facial score: {facial['score']}/10 "
+                            f"(eye contact {facial['eye_contact_ratio']:.1f}%, mostly {facial['dominant_expression']})\n")
+                    for idx, issue in enumerate(facial['issues'], 1):
+                        f.write(f"{idx}. {issue['topic']}\n")
+                        f.write(f"   Example: {issue['examples'][0]}\n")
+                        f.write(f"   Suggestion: {issue['suggestions'][0]}\n\n")
         
         # Update database with simplified results
-        try:
-            from services import storage_service
-            
-            update_data = {
-                "scoreBodyLanguage": analysis_results['score'],
-                "weaknessTopicsBodylan": analysis_results['issues']
-            }
-            
-            # Debug logging to verify what's being sent to Supabase
-            print(f"Updating Supabase with:")
-            print(f"  Score: {update_data['scoreBodyLanguage']}")
-            print(f"  Issues: {len(update_data['weaknessTopicsBodylan'])} items")
-            
-            # Execute the update
-            response = storage_service.supabase.table("UserReport").update(update_data).eq("reportId", report_id).execute()
-            
-            # Log the response
-            if response.data:
-                print(f"Database update successful, updated {len(response.data)} records")
-            else:
-                print(f"Database update failed: {response.error}")
-                
-            logger.info(f"Database updated with body language score: {analysis_results['score']}")
-        except Exception as e:
-            logger.error(f"Failed to update database: {e}")
-            print(f"Failed to update database: {e}")
+        update_body_language_scores(report_id, analysis_results)
+        if analysis_results.get('facial'):
+            update_facial_scores(report_id, analysis_results['facial'])
         
         logger.info(f"Body language analysis completed for report {report_id}")
         return report_filename
@@ -664,3 +1311,100 @@ def generate_posture_report(video_path, report_id):
     except Exception as e:
         logger.error(f"Error generating posture report: {e}")
         raise
+
+def update_body_language_scores(report_id, analysis_results):
+    """
+    Write the body language score and issues of a report to the UserReport table.
+    
+    Failures are logged, not raised, so a database problem never loses the analysis.
+    
+    Returns:
+        True if the update succeeded
+    """
+    try:
+        from services import storage_service
+        
+        update_data = {
+            "scoreBodyLanguage": analysis_results['score'],
+            "weaknessTopicsBodylan": analysis_results['issues']
+        }
+        
+        # Debug logging to verify what's being sent to Supabase
+        print(f"Updating Supabase with:")
+        print(f"  Score: {update_data['scoreBodyLanguage']}")
+        print(f"  Issues: {len(update_data['weaknessTopicsBodylan'])} items")
+        
+        # Execute the update
+        response = storage_service.supabase.table("UserReport").update(update_data).eq("reportId", report_id).execute()
+        
+        # Log the response
+        if response.data:
+            print(f"Database update successful, updated {len(response.data)} records")
+        else:
+            print(f"Database update failed: {response.error}")
+            return False
+            
+        logger.info(f"Database updated with body language score: {analysis_results['score']}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to update database: {e}")
+        print(f"Failed to update database: {e}")
+        return False
+
+def rescore_report(report_id, thresholds=None, issue_threshold=ISSUE_THRESHOLD_PERCENT, update_database=False):
+    """
+    Recompute the body language results of a report from its archived landmarks.
+    
+    No video is decoded and no pose inference runs, so this takes milliseconds
+    and can be repeated with different rule thresholds.
+    
+    Args:
+        report_id: ID of a report analyzed with analyze_posture(video_path, report_id)
+        thresholds: Optional {rule name: threshold} overrides for POSTURE_RULES
+        issue_threshold: Percentage of detected frames above which an issue is reported
+        update_database: Write the new score and issues to the UserReport table
+    
+    Raises:
+        FileNotFoundError: If the report has no archived landmarks
+    """
+    stored = load_archived_landmarks(report_id)
+    meta = stored["meta"]
+    results = score_landmarks(stored["landmarks"], stored["timestamps_ms"],
+                              thresholds=thresholds, issue_threshold=issue_threshold,
+                              weight_by_duration=not meta.get("early_stopping"), movement=meta.get("movement"))
+    if update_database:
+        results['database_updated'] = update_body_language_scores(report_id, results)
+    return results
+
+def rescore_reports(report_ids=None, thresholds=None, issue_threshold=ISSUE_THRESHOLD_PERCENT, update_database=False):
+    """
+    Re-score many reports from their archived landmarks.
+    
+    Args:
+        report_ids: Reports to re-score (defaults to every archived report)
+        thresholds, issue_threshold, update_database: See rescore_report
+    
+    Returns:
+        Dict mapping each report ID to its results, or to {'error': message}
+        when it could not be re-scored
+    
+    Raises:
+        ValueError: If thresholds names an unknown posture rule
+    """
+    unknown = set(thresholds or {}) - set(RULE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown posture rules: {', '.join(sorted(unknown))}")
+    
+    if report_ids is None:
+        report_ids = list_archived_reports()
+    
+    results = {}
+    for report_id in report_ids:
+        try:
+            results[report_id] = rescore_report(report_id, thresholds, issue_threshold, update_database)
+        except Exception as e:
+            logger.error(f"Failed to re-score report {report_id}: {e}")
+            results[report_id] = {'error': str(e)}
+    
+    logger.info(f"Re-scored {len(results)} reports from stored landmarks")
+    return results
@@ -0,0 +1,203 @@
+import numpy as np
+
+# MediaPipe Pose landmark indices (mp.solutions.pose.PoseLandmark), kept here so
+# the rules can be evaluated on stored landmarks without importing MediaPipe
+NOSE = 0
+LEFT_EYE = 2
+RIGHT_EYE = 5
+LEFT_EAR = 7
+RIGHT_EAR = 8
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+LEFT_HIP = 23
+RIGHT_HIP = 24
+
+NUM_LANDMARKS = 33
+
+# Columns of a landmark array
+X, Y, Z, VISIBILITY = 0, 1, 2, 3
+
+
+def landmarks_to_array(landmarks):
+    """
+    Convert MediaPipe pose landmarks into a (33, 4) float32 array of x, y, z, visibility.
+    """
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks],
+        dtype=np.float32
+    )
+
+
+def _hand_to_hip_distance(lm):
+    # Distance from each wrist to its hip, ignoring sides whose hip is not clearly visible
+    left = np.hypot(lm[..., LEFT_WRIST, X] - lm[..., LEFT_HIP, X], lm[..., LEFT_WRIST, Y] - lm[..., LEFT_HIP, Y])
+    right = np.hypot(lm[..., RIGHT_WRIST, X] - lm[..., RIGHT_HIP, X], lm[..., RIGHT_WRIST, Y] - lm[..., RIGHT_HIP, Y])
+    left = np.where(lm[..., LEFT_HIP, VISIBILITY] > 0.5, left, np.inf)
+    right = np.where(lm[..., RIGHT_HIP, VISIBILITY] > 0.5, right, np.inf)
+    return np.minimum(left, right)
+
+
+# Declarative posture rules, keyed by the counter they increment.
+#
+# A frame has the issue when every landmark in "requires" has at least
+# "min_visibility" and "metric op threshold" holds. Most metrics are a weighted
+# sum of landmark x or y coordinates ("terms", optionally "abs"), which lets all
+# of them be computed with a single matrix product. Anything non-linear can
+# provide a "metric" function of the (..., 33, 4) array instead.
+POSTURE_RULES = {
+    # Ears at different heights
+    'head_tilt_frames': {
+        'requires': [LEFT_EAR, RIGHT_EAR],
+        'min_visibility': 0.5,
+        'terms': {(LEFT_EAR, Y): 1, (RIGHT_EAR, Y): -1},
+        'abs': True,
+        'op': '>',
+        'threshold': 0.02,
+    },
+    # Nose horizontally away from the shoulder midpoint
+    'forward_lean_frames': {
+        'requires': [NOSE, LEFT_SHOULDER, RIGHT_SHOULDER],
+        'min_visibility': 0.5,
+        'terms': {(NOSE, X): 1, (LEFT_SHOULDER, X): -0.5, (RIGHT_SHOULDER, X): -0.5},
+        'abs': True,
+        'op': '>',
+        'threshold': 0.08,
+    },
+    # Shoulders at different heights
+    'shoulder_imbalance_frames': {
+        'requires': [LEFT_SHOULDER, RIGHT_SHOULDER],
+        'min_visibility': 0.5,
+        'terms': {(LEFT_SHOULDER, Y): 1, (RIGHT_SHOULDER, Y): -1},
+        'abs': True,
+        'op': '>',
+        'threshold': 0.025,
+    },
+    # Shoulders forward of the hips
+    'slouching_frames': {
+        'requires': [LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP],
+        'min_visibility': 0.5,
+        'terms': {(LEFT_SHOULDER, X): 0.5, (RIGHT_SHOULDER, X): 0.5, (LEFT_HIP, X): -0.5, (RIGHT_HIP, X): -0.5},
+        'abs': False,
+        'op': '>',
+        'threshold': 0.04,
+    },
+    # Nose to the side of the eye midpoint (not looking at the camera)
+    'eye_contact_frames': {
+        'requires': [NOSE, LEFT_EYE, RIGHT_EYE],
+        'min_visibility': 0.7,
+        'terms': {(NOSE, X): 1, (LEFT_EYE, X): -0.5, (RIGHT_EYE, X): -0.5},
+        'abs': True,
+        'op': '>',
+        'threshold': 0.02,
+    },
+    # Shoulders almost perfectly above the hips
+    'rigid_posture_frames': {
+        'requires': [LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP],
+        'min_visibility': 0.5,
+        'terms': {(LEFT_SHOULDER, X): 0.5, (RIGHT_SHOULDER, X): 0.5, (LEFT_HIP, X): -0.5, (RIGHT_HIP, X): -0.5},
+        'abs': True,
+        'op': '<',
+        'threshold': 0.01,
+    },
+    # A wrist resting near its hip (hands in pockets or behind the back)
+    'hand_position_frames': {
+        'requires': [LEFT_WRIST, RIGHT_WRIST],
+        'min_visibility': 0.5,
+        'metric': _hand_to_hip_distance,
+        'op': '<',
+        'threshold': 0.15,
+    },
+}
+
+
+def compile_rules(rules):
+    """
+    Turn a rule table into the arrays used by evaluate_posture_rules.
+
+    Returns:
+        Dict with names, visibility mask and minimums, the (33*2, R) weight
+        matrix for linear metrics, abs/sign vectors, thresholds and custom metrics
+    """
+    names = list(rules)
+    count = len(names)
+    required = np.zeros((NUM_LANDMARKS, count), dtype=bool)
+    min_visibility = np.zeros(count, dtype=np.float32)
+    weights = np.zeros((NUM_LANDMARKS, 2, count), dtype=np.float32)
+    use_abs = np.zeros(count, dtype=bool)
+    # +1 for "metric > threshold", -1 for "metric < threshold"
+    sign = np.ones(count, dtype=np.float32)
+    thresholds = np.zeros(count, dtype=np.float32)
+    custom_metrics = []
+
+    for i, name in enumerate(names):
+        rule = rules[name]
+        required[rule['requires'], i] = True
+        min_visibility[i] = rule['min_visibility']
+        for (landmark, axis), weight in rule.get('terms', {}).items():
+            weights[landmark, axis, i] = weight
+        use_abs[i] = rule.get('abs', False)
+        sign[i] = 1 if rule['op'] == '>' else -1
+        thresholds[i] = rule['threshold']
+        if 'metric' in rule:
+            custom_metrics.append((i, rule['metric']))
+
+    return {
+        'names': names,
+        'required': required,
+        'min_visibility': min_visibility,
+        'weights': weights.reshape(NUM_LANDMARKS * 2, count),
+        'abs': use_abs,
+        'sign': sign,
+        'thresholds': thresholds,
+        'custom_metrics': custom_metrics,
+    }
+
+
+_COMPILED_RULES = compile_rules(POSTURE_RULES)
+
+# Rule names in the column order of evaluate_posture_rules results
+RULE_NAMES = _COMPILED_RULES['names']
+
+
+def evaluate_posture_rules(landmarks, thresholds=None, compiled=None):
+    """
+    Evaluate every posture rule against a landmark array.
+
+    Args:
+        landmarks: (33, 4) array for one frame or (N, 33, 4) for N frames
+        thresholds: Optional {rule name: threshold} overrides
+        compiled: Rules from compile_rules (defaults to POSTURE_RULES)
+
+    Returns:
+        Boolean array of shape (R,) or (N, R), columns in RULE_NAMES order
+    """
+    compiled = compiled or _COMPILED_RULES
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    lead = landmarks.shape[:-2]
+
+    # Landmarks each rule needs must be visible enough
+    visibility = landmarks[..., VISIBILITY]
+    below = visibility[..., :, None] < compiled['min_visibility']
+    visible = ~(below & compiled['required']).any(axis=-2)
+
+    # All linear metrics in one product
+    coords = landmarks[..., :2].reshape(lead + (NUM_LANDMARKS * 2,))
+    metrics = coords @ compiled['weights']
+    metrics = np.where(compiled['abs'], np.abs(metrics), metrics)
+    for i, metric in compiled['custom_metrics']:
+        metrics[..., i] = metric(landmarks)
+
+    limits = compiled['thresholds']
+    if thresholds:
+        limits = limits.copy()
+        for name, value in thresholds.items():
+            limits[compiled['names'].index(name)] = value
+
+    return visible & (compiled['sign'] * (metrics - limits) > 0)
+
+
+def rule_results_to_dict(results):
+    """Map a result row (or columns of an (N, R) result) to {rule name: value}."""
+    return {name: results[..., i] for i, name in enumerate(RULE_NAMES)}
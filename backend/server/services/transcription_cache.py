@@ -0,0 +1,151 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump when the cached payload format changes so old entries are not reused
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = "tmp/cache/transcriptions"
+DEFAULT_CACHE_MAX_MB = 512
+
+# Hit/miss counters for this process
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache_dir():
+    """Directory of the on-disk cache (TRANSCRIPTION_CACHE_DIR)."""
+    return os.getenv("TRANSCRIPTION_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def get_max_bytes():
+    """Size limit of the cache in bytes (TRANSCRIPTION_CACHE_MAX_MB, 0 disables the cache)."""
+    try:
+        max_mb = float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+    except ValueError:
+        max_mb = DEFAULT_CACHE_MAX_MB
+    return int(max(0, max_mb) * 1024 * 1024)
+
+
+def is_enabled():
+    return get_max_bytes() > 0
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def get_cache_stats():
+    """Return hit/miss/write/eviction counters for this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def make_key(audio, model_name, options):
+    """
+    Build the cache key for a transcription.
+
+    Args:
+        audio: Decoded audio samples (NumPy array, as passed to Whisper)
+        model_name: Whisper model size
+        options: Decode options passed to model.transcribe
+
+    Returns:
+        Hex digest identifying the audio content plus model settings
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}|{model_name}|".encode("utf-8"))
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(str(audio.dtype).encode("utf-8"))
+    digest.update(audio.tobytes())
+    return digest.hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(get_cache_dir(), f"{key}.json")
+
+
+def get(key):
+    """
+    Look up a cached transcription.
+
+    Returns:
+        The cached dict, or None on a miss
+    """
+    if not is_enabled():
+        return None
+
+    path = _entry_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        _count("misses")
+        return None
+
+    # Touch the entry so eviction removes the least recently used files first
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    _count("hits")
+    return entry
+
+
+def put(key, entry):
+    """Store a transcription and evict least recently used entries over the size limit."""
+    if not is_enabled():
+        return
+
+    cache_dir = get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(key)
+
+    # Write to a temporary file first so concurrent readers never see a partial entry
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, default=float)
+    os.replace(tmp_path, path)
+    _count("writes")
+
+    evict(get_max_bytes())
+
+
+def evict(max_bytes):
+    """Remove least recently used entries until the cache fits in max_bytes."""
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return
+
+    entries = []
+    total = 0
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            _count("evictions")
+        except FileNotFoundError:
+            pass
+        total -= size
+
+    if entries:
+        logger.debug(f"Transcription cache size: {total / (1024 * 1024):.1f} MB")
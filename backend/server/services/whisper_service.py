@@ -4,8 +4,16 @@ import torch
 import whisper
 import logging
 import re
+import time
+import wave
+import queue
+import threading
+import multiprocessing
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from collections import Counter
+from services import transcription_cache, worker_pool
+from services.config_utils import env_int, env_float
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -42,6 +50,47 @@ try:
 except:
     pass
 
+# Whisper model size used when none is requested
+DEFAULT_WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+
+# Maximum loaded instances per model size in one process. Whisper decoding
+# installs hooks on the model, so an instance is only used by one call at a time.
+MAX_MODEL_INSTANCES = env_int("WHISPER_MODEL_INSTANCES", 1, minimum=1)
+
+# Process-wide model registry: model name -> pool of idle instances
+_model_pools = {}
+_model_instance_counts = {}
+_model_metrics = {}
+_registry_lock = threading.Lock()
+
+# Decoder options for model.transcribe (also part of the transcription cache key)
+TRANSCRIBE_OPTIONS = {
+    "fp16": False,  # Disable FP16 for better accuracy
+    "verbose": False,  # Reduce logging noise
+    "condition_on_previous_text": False,  # Don't try to make text consistent
+    "without_timestamps": False,  # Keep timestamps for segment analysis
+    "word_timestamps": True  # Per-word timings for the stored transcript
+}
+
+# Whisper works on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# Long-audio mode: recordings at least this long are split at silences and the
+# chunks transcribed in parallel across WHISPER_CHUNK_WORKERS processes. By
+# default (0) each analysis worker gets its share of the cores (see
+# worker_pool.nested_worker_count), since every process loads its own model.
+LONG_AUDIO_SECONDS = env_float("WHISPER_LONG_AUDIO_SECONDS", 600.0)
+CHUNK_SECONDS = env_float("WHISPER_CHUNK_SECONDS", 120.0)
+CHUNK_WORKERS = env_int("WHISPER_CHUNK_WORKERS", 0, minimum=0)
+
+# How far either side of a chunk boundary to look for the quietest point
+SILENCE_SEARCH_SECONDS = 10.0
+SILENCE_FRAME_SECONDS = 0.03
+
+# Chunk pools by model name: a pool's workers preload one model
+_chunk_executors = {}
+_chunk_executor_lock = threading.Lock()
+
 # Predefined lists for speech analysis
 FILLER_WORDS = {
     "uh", "um", "er", "ah", "like", "you know", "hmm", "so", "basically", 
@@ -61,13 +110,90 @@ HESITATION_PATTERNS = [
     r'\b(let me|how do I|wait)\b',          # Thinking phrases
 ]
 
-def transcribe_audio(audio_path, report_id=None):
+def _load_model_instance(model_name):
+    """Load one model instance from disk and record the load time"""
+    start = time.perf_counter()
+    # This uses torch.load under the hood
+    model = whisper.load_model(model_name)
+    elapsed = time.perf_counter() - start
+    
+    with _registry_lock:
+        metrics = _model_metrics[model_name]
+        metrics["loads"] += 1
+        metrics["load_seconds_total"] += elapsed
+        metrics["last_load_seconds"] = elapsed
+    logger.info(f"Loaded Whisper model '{model_name}' in {elapsed:.2f}s (pid {os.getpid()})")
+    return model
+
+def acquire_model(model_name=None):
+    """
+    Check out a warm Whisper model instance from the process-wide registry.
+    
+    The first request for a model size loads it from disk; later requests reuse
+    the loaded instance. Concurrent callers get separate instances up to
+    WHISPER_MODEL_INSTANCES and wait for one to be released beyond that.
+    Return the instance with release_model when done.
+    """
+    model_name = model_name or DEFAULT_WHISPER_MODEL
+    load_new = False
+    with _registry_lock:
+        if model_name not in _model_pools:
+            _model_pools[model_name] = queue.Queue()
+            _model_instance_counts[model_name] = 0
+            _model_metrics[model_name] = {
+                "loads": 0,
+                "load_seconds_total": 0.0,
+                "last_load_seconds": None,
+                "checkouts": 0,
+                "wait_seconds_total": 0.0
+            }
+        pool = _model_pools[model_name]
+        if pool.empty() and _model_instance_counts[model_name] < MAX_MODEL_INSTANCES:
+            _model_instance_counts[model_name] += 1
+            load_new = True
+    
+    start = time.perf_counter()
+    if load_new:
+        try:
+            model = _load_model_instance(model_name)
+        except Exception:
+            with _registry_lock:
+                _model_instance_counts[model_name] -= 1
+            raise
+    else:
+        model = pool.get()
+        wait = time.perf_counter() - start
+        with _registry_lock:
+            _model_metrics[model_name]["wait_seconds_total"] += wait
+    
+    with _registry_lock:
+        _model_metrics[model_name]["checkouts"] += 1
+    return model
+
+def release_model(model, model_name=None):
+    """Return a model instance obtained from acquire_model to the registry"""
+    _model_pools[model_name or DEFAULT_WHISPER_MODEL].put(model)
+
+def preload(model_name=None):
+    """Load the default model ahead of the first transcription (used by analysis workers)"""
+    release_model(acquire_model(model_name), model_name)
+
+def get_model_metrics():
+    """Return load/checkout metrics for every model size loaded in this process"""
+    with _registry_lock:
+        return {
+            name: dict(metrics, instances=_model_instance_counts[name])
+            for name, metrics in _model_metrics.items()
+        }
+
+def transcribe_audio(audio_path, report_id=None, model_name=None):
     """
     Transcribe audio to text using Whisper ASR model.
     
     Args:
         audio_path: Path to the audio file to transcribe
         report_id: Optional ID of the report being processed (for logging)
+        model_name: Optional Whisper model size (defaults to WHISPER_MODEL)
         
     Returns:
         A tuple of (transcription_text, segments)
@@ -80,17 +206,32 @@ def transcribe_audio(audio_path, report_id=None):
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found at {audio_path}")
             
-        # Load model (this uses torch.load under the hood)
-        model = whisper.load_model("base")
+        model_name = model_name or DEFAULT_WHISPER_MODEL
         
-        # Try to get more verbatim transcription with different decoder options
-        result = model.transcribe(
-            audio_path,
-            fp16=False,  # Disable FP16 for better accuracy
-            verbose=False,  # Reduce logging noise
-            condition_on_previous_text=False,  # Don't try to make text consistent
-            without_timestamps=False  # Keep timestamps for segment analysis
-        )
+        # Decode once; the samples feed both the cache key and the model
+        audio = load_audio(audio_path)
+        long_audio = _use_long_audio_mode(audio)
+        cache_options = dict(TRANSCRIBE_OPTIONS, chunk_seconds=CHUNK_SECONDS) if long_audio else TRANSCRIBE_OPTIONS
+        cache_key = transcription_cache.make_key(audio, model_name, cache_options)
+        
+        result = transcription_cache.get(cache_key)
+        if result is not None:
+            logger.info(f"Transcription cache hit{report_info}")
+        elif long_audio:
+            logger.info(f"Using parallel chunked transcription{report_info} "
+                        f"({len(audio) / SAMPLE_RATE / 60:.1f} min of audio)")
+            result = _transcribe_chunked(audio, model_name)
+            transcription_cache.put(cache_key, result)
+        else:
+            # Reuse a warm model from the registry instead of loading it per call
+            model = acquire_model(model_name)
+            try:
+                # Try to get more verbatim transcription with different decoder options
+                result = model.transcribe(audio, **TRANSCRIBE_OPTIONS)
+            finally:
+                release_model(model, model_name)
+            result = {"text": result["text"], "segments": result["segments"]}
+            transcription_cache.put(cache_key, result)
         
         # Extract text and segments
         transcription = result["text"]
@@ -108,6 +249,171 @@ def transcribe_audio(audio_path, report_id=None):
         logger.error(error_msg)
         raise
 
+def load_audio(audio_path):
+    """
+    Load audio as 16 kHz mono float32 samples, the input Whisper expects.
+    
+    A 16 kHz mono 16-bit WAV (as written by audio_processing.extract_audio) is
+    read directly; anything else is decoded and resampled through ffmpeg by Whisper.
+    Both paths produce identical samples for the same audio.
+    """
+    if audio_path.endswith(".wav"):
+        with wave.open(audio_path, "rb") as wav:
+            if wav.getframerate() == SAMPLE_RATE and wav.getnchannels() == 1 and wav.getsampwidth() == 2:
+                pcm = wav.readframes(wav.getnframes())
+                return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    return whisper.load_audio(audio_path)
+
+def _use_long_audio_mode(audio):
+    duration = len(audio) / SAMPLE_RATE
+    return get_chunk_worker_count() > 1 and duration >= LONG_AUDIO_SECONDS
+
+def find_chunk_boundaries(audio, sample_rate=None, chunk_seconds=None, search_seconds=SILENCE_SEARCH_SECONDS):
+    """
+    Split audio into chunks of roughly chunk_seconds, cutting at silences.
+    
+    Each cut is placed at the quietest short frame (lowest RMS energy) within
+    search_seconds of the nominal boundary, so words are not split between chunks.
+    
+    Args:
+        audio: 1-D array of audio samples
+        sample_rate: Samples per second (defaults to Whisper's 16 kHz)
+        chunk_seconds: Target chunk length
+        search_seconds: How far either side of the target to search for silence
+        
+    Returns:
+        List of (start_sample, end_sample) tuples covering the whole audio
+    """
+    sample_rate = sample_rate or SAMPLE_RATE
+    chunk_samples = int((chunk_seconds or CHUNK_SECONDS) * sample_rate)
+    frame = max(1, int(SILENCE_FRAME_SECONDS * sample_rate))
+    
+    # RMS energy per short frame
+    n_frames = len(audio) // frame
+    frames = np.asarray(audio[:n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    energy = np.sqrt(np.mean(frames ** 2, axis=1))
+    
+    search_frames = int(search_seconds * sample_rate) // frame
+    boundaries = [0]
+    # Stop when what is left fits in one chunk (with some slack to avoid a tiny tail)
+    while len(audio) - boundaries[-1] > chunk_samples * 1.5:
+        target = (boundaries[-1] + chunk_samples) // frame
+        lo = max(boundaries[-1] // frame + 1, target - search_frames)
+        hi = min(n_frames, target + search_frames + 1)
+        quietest = lo + int(np.argmin(energy[lo:hi]))
+        boundaries.append(quietest * frame + frame // 2)
+    boundaries.append(len(audio))
+    
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def _init_chunk_worker(model_name, worker_count):
+    # Split this analysis worker's share of the cores between its chunk workers
+    torch.set_num_threads(max(1, worker_pool.nested_worker_count() // worker_count))
+    preload(model_name)
+
+def get_chunk_worker_count():
+    """Processes per chunk pool (WHISPER_CHUNK_WORKERS, or this worker's share of the cores)"""
+    return CHUNK_WORKERS or worker_pool.nested_worker_count()
+
+def _get_chunk_executor(model_name):
+    with _chunk_executor_lock:
+        executor = _chunk_executors.get(model_name)
+        if executor is None:
+            worker_count = get_chunk_worker_count()
+            executor = ProcessPoolExecutor(
+                max_workers=worker_count,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(model_name, worker_count)
+            )
+            _chunk_executors[model_name] = executor
+            worker_pool.register_nested_pool(shutdown_chunk_executors)
+        return executor
+
+def shutdown_chunk_executors():
+    """Shut down the chunk pools of every model (runs with worker_pool.shutdown)"""
+    with _chunk_executor_lock:
+        executors = list(_chunk_executors.values())
+        _chunk_executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _transcribe_chunk(audio_chunk, model_name, offset_seconds):
+    """Transcribe one chunk and shift its timestamps to the position in the full recording"""
+    model = acquire_model(model_name)
+    try:
+        result = model.transcribe(audio_chunk, **TRANSCRIBE_OPTIONS)
+    finally:
+        release_model(model, model_name)
+    
+    segments = result["segments"]
+    for segment in segments:
+        segment["start"] += offset_seconds
+        segment["end"] += offset_seconds
+        for word in segment.get("words", []):
+            word["start"] += offset_seconds
+            word["end"] += offset_seconds
+    return segments
+
+def _transcribe_chunked(audio, model_name):
+    """
+    Transcribe long audio by splitting it at silences and running the chunks in parallel.
+    
+    Returns:
+        Dict with text and segments, in the same shape as a single model.transcribe call
+    """
+    sample_rate = SAMPLE_RATE
+    chunks = find_chunk_boundaries(audio)
+    executor = _get_chunk_executor(model_name)
+    
+    futures = [
+        executor.submit(_transcribe_chunk, audio[start:end], model_name, start / sample_rate)
+        for start, end in chunks
+    ]
+    
+    # Stitch the chunks back together in order
+    segments = []
+    for future in futures:
+        segments.extend(future.result())
+    for segment_id, segment in enumerate(segments):
+        segment["id"] = segment_id
+    
+    logger.info(f"Transcribed {len(chunks)} chunks across {get_chunk_worker_count()} workers")
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments
+    }
+
+def get_model_key(model_name=None):
+    """Identify the model and Whisper version that produced a transcript"""
+    version = getattr(whisper, "__version__", "unknown")
+    return f"whisper-{version}/{model_name or DEFAULT_WHISPER_MODEL}"
+
+def build_transcript(transcription, segments, model_name=None):
+    """
+    Build the structured transcript stored for a report.
+    
+    Args:
+        transcription: Full transcription text
+        segments: Segment data from Whisper transcription
+        model_name: Whisper model size used
+        
+    Returns:
+        Dict with text, segments, word timestamps and the model key
+    """
+    segments = segments or []
+    words = [
+        {"word": w["word"], "start": w["start"], "end": w["end"], "probability": w.get("probability")}
+        for segment in segments
+        for w in segment.get("words", [])
+    ]
+    return {
+        "text": transcription,
+        "segments": segments,
+        "words": words,
+        "model": get_model_key(model_name)
+    }
+
 def _enhance_transcription_with_fillers(transcription, segments):
     """
     Enhance the transcription by analyzing audio patterns in segments
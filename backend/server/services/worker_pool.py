@@ -0,0 +1,164 @@
+import os
+import atexit
+import asyncio
+import functools
+import importlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services.logging_utils import silence_native_logs
+from services.config_utils import env_int
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default number of analysis worker processes
+DEFAULT_ANALYSIS_WORKERS = 2
+
+# Modules imported once in every worker so MediaPipe, TensorFlow and Whisper
+# are loaded before the first job arrives instead of on the first request.
+# A module that defines preload() has it called as well (e.g. to load models
+# or build MediaPipe graphs).
+PRELOAD_MODULES = [
+    "services.pose_analysis_service",
+    "services.facial_analysis_service",
+    "services.whisper_service",
+]
+
+_executor = None
+
+# Shutdown callbacks of process pools the analyzers start inside this process
+# (Whisper chunks, pose shards); see register_nested_pool
+_nested_pool_shutdowns = []
+
+
+def get_worker_count():
+    """
+    Return the configured number of analysis worker processes (ANALYSIS_WORKERS).
+    0 disables the process pool and runs analyzers on a thread instead.
+    """
+    return env_int("ANALYSIS_WORKERS", DEFAULT_ANALYSIS_WORKERS, minimum=0)
+
+
+def nested_worker_count():
+    """
+    Processes a pool started inside an analysis worker may use: the cores
+    divided between the analysis workers, so that every worker running such
+    a pool at once still fits the machine.
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, get_worker_count()))
+
+
+def register_nested_pool(shutdown_pool):
+    """
+    Register the shutdown function of a process pool created in this process.
+
+    It runs on shutdown() and when the process exits, so an analysis worker
+    that is shut down takes its nested pool's processes with it.
+    """
+    if shutdown_pool not in _nested_pool_shutdowns:
+        _nested_pool_shutdowns.append(shutdown_pool)
+
+
+def _shutdown_nested_pools():
+    for shutdown_pool in list(_nested_pool_shutdowns):
+        try:
+            shutdown_pool()
+        except Exception as e:
+            logger.warning(f"Could not shut down nested pool: {e}")
+
+
+atexit.register(_shutdown_nested_pools)
+
+
+def _init_worker():
+    """Initializer run once in each worker process to preload the analyzers."""
+    silence_native_logs()
+    for module_name in PRELOAD_MODULES:
+        try:
+            module = importlib.import_module(module_name)
+            if hasattr(module, "preload"):
+                module.preload()
+        except Exception as e:
+            logger.warning(f"Worker {os.getpid()} could not preload {module_name}: {e}")
+    logger.info(f"Analysis worker {os.getpid()} ready")
+
+
+def _ping():
+    return os.getpid()
+
+
+def get_executor():
+    """Return the shared process pool, creating it on first use (None if disabled)."""
+    global _executor
+    if _executor is None:
+        worker_count = get_worker_count()
+        if worker_count == 0:
+            return None
+        # spawn rather than fork: the parent already holds TensorFlow/torch threads
+        _executor = ProcessPoolExecutor(
+            max_workers=worker_count,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        logger.info(f"Started analysis process pool with {worker_count} workers")
+    return _executor
+
+
+def start():
+    """Create the pool and start every worker so models load before the first job."""
+    executor = get_executor()
+    if executor is None:
+        return
+    for _ in range(get_worker_count()):
+        executor.submit(_ping)
+
+
+def shutdown():
+    """Shut down the process pool and any nested pools (called on application shutdown)."""
+    global _executor
+    _shutdown_nested_pools()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _reset_broken_pool(executor):
+    # A worker died (e.g. a native crash); drop the pool so the next call starts a fresh one
+    global _executor
+    if _executor is executor:
+        logger.error("Analysis process pool is broken, restarting it on next use")
+        _executor = None
+
+
+async def run_in_worker(fn, *args, **kwargs):
+    """
+    Run a CPU-bound function in the analysis process pool without blocking the event loop.
+
+    fn must be a module-level function and its arguments and result must be picklable.
+    When the pool is disabled (ANALYSIS_WORKERS=0) the call runs on a thread.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    executor = get_executor()
+    try:
+        return await loop.run_in_executor(executor, call)
+    except BrokenProcessPool:
+        _reset_broken_pool(executor)
+        raise
+
+
+def call_in_worker(fn, *args, **kwargs):
+    """
+    Blocking variant of run_in_worker for code that is already running off the event loop.
+    """
+    executor = get_executor()
+    if executor is None:
+        return fn(*args, **kwargs)
+    try:
+        return executor.submit(fn, *args, **kwargs).result()
+    except BrokenProcessPool:
+        _reset_broken_pool(executor)
+        raise
@@ -19,6 +19,8 @@ def mock_env_for_tests(monkeypatch):
     monkeypatch.setenv("JWT_SECRET_KEY", "test-secret-key")
     monkeypatch.setenv("ALGORITHM", "HS256")
     monkeypatch.setenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    # Run analyzers in-process so patched services are used
+    monkeypatch.setenv("ANALYSIS_WORKERS", "0")
 
 @pytest.fixture
 def sample_grammar_data():
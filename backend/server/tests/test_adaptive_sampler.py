@@ -0,0 +1,51 @@
+import pytest
+import numpy as np
+
+from services.adaptive_sampler import AdaptiveSampler, motion_thumbnail, changed_pixel_ratio
+
+def sampled_frames(sampler, motion, timestamps_ms):
+    """Frames the sampler picks when every analyzed frame reports motion(frame_number)"""
+    frames = []
+    for frame_number, timestamp_ms in enumerate(timestamps_ms, 1):
+        if sampler.wants(frame_number, timestamp_ms):
+            frames.append(frame_number)
+            sampler.update(timestamp_ms, motion(frame_number))
+    return frames
+
+def test_interval_grows_while_static_and_drops_on_motion():
+    sampler = AdaptiveSampler(duration_ms=20000)
+
+    frames = sampled_frames(sampler, lambda n: 2.0 if 100 <= n < 120 else 0.0, np.arange(200) * 100.0)
+
+    gaps = np.diff(frames)
+    # Stable start: 1 s, then growing up to the 2 s maximum (10 fps)
+    assert gaps[0] == 15 and gaps.max() == 20
+    # Fast motion: sampled every 0.25 s, the next frame after 2.5 frames at 10 fps
+    assert (gaps[(np.array(frames[:-1]) >= 100) & (np.array(frames[:-1]) < 118)] == 3).all()
+
+def test_frame_budget_is_never_exceeded():
+    sampler = AdaptiveSampler(duration_ms=100000, budget=50)
+
+    frames = sampled_frames(sampler, lambda n: 5.0, np.arange(3000) * 100000 / 3000)
+
+    assert len(frames) <= 50
+    # The budget is spread over the whole video rather than spent at the start
+    assert frames[-1] > 2800
+
+def test_intervals_follow_timestamps_of_variable_frame_rate_video():
+    # 60 fps for the first 10 s, then 15 fps: every 1 s is still one sample
+    timestamps_ms = np.concatenate([np.arange(600) * 1000 / 60, 10000 + np.arange(150) * 1000 / 15])
+    sampler = AdaptiveSampler(duration_ms=20000)
+
+    frames = sampled_frames(sampler, lambda n: 0.5, timestamps_ms)
+
+    np.testing.assert_allclose(np.diff(timestamps_ms[np.array(frames) - 1]), 1000, atol=70)
+    assert len(frames) == 19
+
+def test_changed_pixel_ratio():
+    still = np.full((360, 640), 100, dtype=np.uint8)
+    moved = still.copy()
+    moved[:, :320] = 200
+
+    assert changed_pixel_ratio(motion_thumbnail(still), motion_thumbnail(still)) == 0
+    assert changed_pixel_ratio(motion_thumbnail(still), motion_thumbnail(moved)) == pytest.approx(0.5)
@@ -6,7 +6,7 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.audio_processing import convert_video_to_mp3, transcribe_audio_to_text
+from services.audio_processing import convert_video_to_mp3, extract_audio, get_audio_path, transcribe_audio_to_text, load_transcript
 
 @pytest.fixture
 def setup_directories():
@@ -93,6 +93,30 @@ def test_convert_video_to_mp3_no_video_file(setup_directories):
     
     assert "No video files found" in str(excinfo.value)
 
+@patch('subprocess.run')
+def test_extract_audio_writes_16k_mono_wav(mock_subprocess, setup_directories):
+    mock_result = MagicMock()
+    mock_result.returncode = 0
+    mock_result.stderr = ""
+    mock_subprocess.return_value = mock_result
+    
+    output_path = extract_audio("test_report")
+    
+    assert output_path == "tmp/test_report/audio/audio.wav"
+    args = mock_subprocess.call_args[0][0]
+    assert args[args.index("-ar") + 1] == "16000"
+    assert args[args.index("-ac") + 1] == "1"
+    assert args[args.index("-c:a") + 1] == "pcm_s16le"
+    assert args[-1] == output_path
+
+def test_get_audio_path_prefers_wav(setup_directories):
+    assert get_audio_path("test_report") == "tmp/test_report/audio/audio.mp3"
+    
+    with open("tmp/test_report/audio/audio.wav", "wb") as f:
+        f.write(b"")
+    
+    assert get_audio_path("test_report") == "tmp/test_report/audio/audio.wav"
+
 @patch('services.audio_processing.transcribe_audio')
 def test_transcribe_audio_to_text_success(mock_transcribe, setup_directories):
     # Setup
@@ -131,3 +155,34 @@ def test_transcribe_audio_to_text_empty_result(mock_transcribe, setup_directorie
         transcribe_audio_to_text("test_report")
     
     assert "Transcription failed or returned empty" in str(excinfo.value)
+
+@patch('services.audio_processing.transcribe_audio')
+def test_transcribe_audio_to_text_stores_structured_transcript(mock_transcribe, setup_directories):
+    # Setup
+    segments = [{
+        "start": 0.0,
+        "end": 1.5,
+        "text": " Hello everyone",
+        "words": [
+            {"word": " Hello", "start": 0.0, "end": 0.6, "probability": 0.9},
+            {"word": " everyone", "start": 0.7, "end": 1.5, "probability": 0.8}
+        ]
+    }]
+    mock_transcribe.return_value = ("Hello everyone", segments)
+    
+    with open("tmp/test_report/audio/audio.mp3", "w") as f:
+        f.write("dummy audio content")
+    
+    # Test
+    transcribe_audio_to_text("test_report")
+    transcript = load_transcript("test_report")
+    
+    # Assert
+    assert transcript["text"] == "Hello everyone"
+    assert transcript["segments"] == segments
+    assert [w["word"] for w in transcript["words"]] == [" Hello", " everyone"]
+    assert transcript["model"].startswith("whisper-")
+    mock_transcribe.assert_called_once()
+
+def test_load_transcript_missing(setup_directories):
+    assert load_transcript("test_report") is None
@@ -12,7 +12,9 @@ from main import app
 from controllers.body_language_analysis_controller import (
     get_body_language_score, 
     get_body_language_weaknesses,
-    analyze_video
+    analyze_video,
+    rescore_body_language,
+    RescoreRequest
 )
 
 client = TestClient(app)
@@ -158,3 +160,46 @@ class TestBodyLanguageAnalysisController:
         
         assert exc_info.value.status_code == 500
         assert "Body language analysis failed" in exc_info.value.detail
+
+    def test_rescore_requires_authentication(self):
+        """Test that re-scoring is rejected without a bearer token."""
+        response = client.post("/api/analyser/body-language/rescore", json={"update_database": True})
+        
+        assert response.status_code in (401, 403)
+
+    @patch('controllers.body_language_analysis_controller.pose_analysis_service')
+    @patch('controllers.body_language_analysis_controller.storage_service')
+    async def test_rescore_defaults_to_the_callers_reports(self, mock_storage_service, mock_pose_service):
+        """Test that re-scoring without report IDs only covers the caller's archived reports."""
+        # Setup
+        mock_response = MagicMock()
+        mock_response.data = [{"reportId": "own-archived"}, {"reportId": "own-not-archived"}]
+        mock_storage_service.supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = mock_response
+        mock_pose_service.list_archived_reports.return_value = ["own-archived", "other-user-report"]
+        mock_pose_service.rescore_reports.return_value = {
+            "own-archived": {"score": 7, "detection_rate": 95, "issues": []}
+        }
+        
+        # Execute
+        result = await rescore_body_language(RescoreRequest(update_database=True), "test-user-id")
+        
+        # Assert
+        assert result["rescored"] == 1
+        mock_storage_service.supabase.table.return_value.select.return_value.eq.assert_called_once_with("userId", "test-user-id")
+        assert mock_pose_service.rescore_reports.call_args[0][0] == ["own-archived"]
+
+    @patch('controllers.body_language_analysis_controller.pose_analysis_service')
+    @patch('controllers.body_language_analysis_controller.storage_service')
+    async def test_rescore_rejects_other_users_reports(self, mock_storage_service, mock_pose_service):
+        """Test that re-scoring another user's report is forbidden."""
+        # Setup
+        mock_response = MagicMock()
+        mock_response.data = [{"reportId": "own-report"}]
+        mock_storage_service.supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = mock_response
+        
+        # Execute & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await rescore_body_language(RescoreRequest(report_ids=["own-report", "other-user-report"]), "test-user-id")
+        
+        assert exc_info.value.status_code == 403
+        mock_pose_service.rescore_reports.assert_not_called()
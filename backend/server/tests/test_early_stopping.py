@@ -0,0 +1,33 @@
+import pytest
+import numpy as np
+
+from services.early_stopping import stratified_order, wilson_interval, buckets_settled
+
+def test_stratified_order_covers_every_stretch_each_round():
+    candidates = list(range(30, 3001, 30))
+
+    rounds = stratified_order(candidates, 10, np.random.default_rng(0))
+
+    assert len(rounds) == 10
+    assert sorted(frame for frames in rounds for frame in frames) == candidates
+    # Every round has one frame from each tenth of the video
+    for frames in rounds:
+        assert [frame // 300 for frame in np.array(frames) - 1] == list(range(10))
+
+def test_wilson_interval_narrows_with_more_frames():
+    low_small, high_small = wilson_interval(5, 10)
+    low_large, high_large = wilson_interval(500, 1000)
+
+    assert low_small < 0.5 < high_small
+    assert high_large - low_large < high_small - low_small
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+def test_buckets_settled():
+    # 2% and 90% of 200 frames are clear of every boundary
+    assert buckets_settled([4, 180], detected=200, processed=200)
+    # 30% is right on the moderate boundary however many frames are analyzed
+    assert not buckets_settled([4, 60], detected=200, processed=200)
+    # Too few frames to tell 10% from 15%
+    assert not buckets_settled([2], detected=20, processed=20)
+    # Detection rate near the poor-quality cutoff
+    assert not buckets_settled([0], detected=40, processed=200)
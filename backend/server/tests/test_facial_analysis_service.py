@@ -6,14 +6,22 @@ import sys
 import os
 
 # Import the module to test
-from services.facial_analysis_service import FacialAnalyzer, analyze_facial_engagement
+from services.facial_analysis_service import (
+    FacialAnalyzer, analyze_facial_engagement, create_face_mesh_graph,
+    compute_face_features, face_landmarks_to_array, FEATURE_LANDMARKS,
+    HeadFaceAnalyzer, head_box_from_pose, score_facial_engagement, summarize_facial_engagement
+)
+from services.frame_source import Frame
+from services.graph_pool import GraphPool
 
 # Mock MediaPipe and OpenCV
 @pytest.fixture
 def mock_mediapipe():
     """Mock the MediaPipe face mesh solution"""
-    with patch('services.facial_analysis_service.mp') as mock_mp:
-        # Create nested mocks for face_mesh
+    with patch('services.facial_analysis_service.mp') as mock_mp, \
+         patch('services.facial_analysis_service.face_mesh_graphs',
+               GraphPool("face_mesh_test", create_face_mesh_graph)):
+        # Create nested mocks for face_mesh (built through a fresh graph pool)
         mock_face_mesh = MagicMock()
         mock_mp.solutions.face_mesh = MagicMock()
         mock_mp.solutions.face_mesh.FaceMesh.return_value = mock_face_mesh
@@ -23,7 +31,8 @@ def mock_mediapipe():
 @pytest.fixture
 def mock_cv2():
     """Mock OpenCV functionality"""
-    with patch('services.facial_analysis_service.cv2') as mock_cv2:
+    with patch('services.facial_analysis_service.cv2') as mock_cv2, \
+         patch('services.frame_source.cv2', mock_cv2):
         # Setup VideoCapture mock
         mock_video = MagicMock()
         mock_video.isOpened.return_value = True
@@ -31,7 +40,9 @@ def mock_cv2():
         # Create 10 test frames - first return True, then False to end the loop
         mock_frames = [(True, np.zeros((480, 640, 3), dtype=np.uint8)) for _ in range(10)]
         mock_frames.append((False, None))  # End of video
-        mock_video.read.side_effect = mock_frames
+        frames = iter(mock_frames)
+        mock_video.read.side_effect = lambda: next(frames)
+        mock_video.grab.side_effect = lambda: next(frames)[0]  # Skipped frames are grabbed
         
         mock_cv2.VideoCapture.return_value = mock_video
         mock_cv2.cvtColor.return_value = np.zeros((480, 640, 3), dtype=np.uint8)
@@ -109,6 +120,7 @@ class TestFacialAnalyzer:
         mock_mediapipe.solutions.face_mesh.FaceMesh.assert_called_once_with(
             static_image_mode=False,
             max_num_faces=1,
+            refine_landmarks=True,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
@@ -253,6 +265,38 @@ class TestFacialAnalyzer:
         analyzer.gaze_history.extend([{"is_center": False} for _ in range(7)])
         assert analyzer._determine_eye_contact_quality({"is_center": True}) == "poor"
 
+    def test_compute_face_features_matches_analyzer_methods(self, mock_mediapipe, mock_face_landmarks):
+        """All features from one landmark array equal the per-feature methods"""
+        analyzer = FacialAnalyzer()
+        points = face_landmarks_to_array(mock_face_landmarks)
+        
+        smile, eyebrows, openness, gaze = compute_face_features(points, 640, 480)
+        
+        assert points.shape == (478, 3)
+        assert smile == analyzer._calculate_smile_intensity(mock_face_landmarks, 640, 480)
+        assert eyebrows == analyzer._calculate_eyebrow_movement(mock_face_landmarks, 640, 480)
+        assert openness == analyzer._calculate_eye_openness(mock_face_landmarks, 640, 480)
+        assert gaze == analyzer._calculate_gaze_direction(mock_face_landmarks, 640, 480)
+        
+    def test_compute_face_features_without_iris_landmarks(self, mock_face_landmarks):
+        """A 468-point mesh has no iris, so the gaze counts as centered"""
+        points = face_landmarks_to_array(mock_face_landmarks[:468], FEATURE_LANDMARKS)
+        
+        smile, eyebrows, openness, gaze = compute_face_features(points, 640, 480)
+        
+        assert 0 <= smile <= 1 and 0 <= eyebrows <= 1 and 0 <= openness <= 1
+        assert gaze == {"direction": "center", "is_center": True, "angle": 0}
+        
+    def test_expression_history_running_mean(self, mock_mediapipe):
+        """The running sum stays equal to the mean of the last 30 scores"""
+        analyzer = FacialAnalyzer()
+        scores = np.random.default_rng(0).random(75)
+        
+        means = [analyzer._add_expression(score) for score in scores]
+        
+        assert means[-1] == pytest.approx(np.mean(scores[-30:]))
+        assert means[10] == pytest.approx(np.mean(scores[:11]))
+
 
 class TestFacialEngagementAnalysis:
     
@@ -341,3 +385,87 @@ class TestFacialEngagementAnalysis:
         
         # Since all frames have faces in this mock, all processed frames should have faces detected
         assert results["face_detected_frames"] == 5
+
+
+def pose_with_head(visibility=0.9):
+    """(33, 4) pose landmarks with the head around the top center of the image"""
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, 3] = 0.1
+    for index, (x, y) in {0: (0.50, 0.20), 2: (0.48, 0.18), 5: (0.52, 0.18), 7: (0.46, 0.19), 8: (0.54, 0.19)}.items():
+        landmarks[index] = (x, y, 0.0, visibility)
+    return landmarks
+
+class TestHeadFaceStage:
+    
+    def test_head_box_from_pose(self):
+        box = head_box_from_pose(pose_with_head(), 640, 480)
+        
+        left, top, right, bottom = box
+        assert left < 0.46 * 640 and right > 0.54 * 640
+        assert top < 0.18 * 480 < 0.20 * 480 < bottom
+        assert head_box_from_pose(pose_with_head(visibility=0.2), 640, 480) is None
+    
+    def test_process_head_runs_face_mesh_on_the_crop(self, mock_face_results):
+        face_mesh = MagicMock()
+        face_mesh.process.return_value = mock_face_results
+        stage = HeadFaceAnalyzer(face_mesh)
+        image = np.zeros((480, 640, 3), dtype=np.uint8)
+        frame = Frame(7, 233.0, image, (640, 480))
+        
+        face_data = stage.process_head(frame, pose_with_head())
+        stage.process_head(frame, pose_with_head(visibility=0.2))
+        
+        crop = face_mesh.process.call_args[0][0]
+        assert crop.shape[0] < 480 and crop.shape[1] < 640
+        assert face_data["face_detected"] and face_data["frame"] == 7
+        assert face_mesh.process.call_count == 1
+        assert stage.stats["head_frames"] == 1 and stage.stats["no_head_frames"] == 1
+        assert stage.metrics.column("frame").tolist() == [7]
+    
+    def test_off_center_iris_reports_insufficient_eye_contact(self, mock_face_landmarks):
+        # Both irises well left of the eye centers: looking away in every frame
+        for idx in [474, 475, 476, 477, 469, 470, 471, 472]:
+            mock_face_landmarks[idx].x = 0.41
+        face_landmarks = MagicMock()
+        face_landmarks.landmark = mock_face_landmarks
+        stage = HeadFaceAnalyzer(MagicMock())
+        frame = Frame(1, 0.0, np.zeros((480, 640, 3), dtype=np.uint8), (640, 480))
+        
+        for _ in range(10):
+            stage.process_face_landmarks(frame, face_landmarks)
+        summary = summarize_facial_engagement(stage.metrics, 10)
+        result = score_facial_engagement(summary)
+        
+        assert summary["eye_contact_ratio"] == 0
+        assert "Insufficient eye contact" in [issue["topic"] for issue in result["issues"]]
+        assert result["score"] < 9
+    
+    def test_score_facial_engagement(self):
+        summary = {
+            "face_detected_frames": 40,
+            "eye_contact_ratio": 35.0,
+            "dominant_expression": "neutral",
+            "facial_issues": [
+                {"issue": "Insufficient eye contact", "frequency": 65.0, "suggestions": ["Look at the camera"]}
+            ]
+        }
+        
+        result = score_facial_engagement(summary)
+        
+        assert 3 <= result["score"] < 9
+        assert result["issues"][0]["topic"] == "Insufficient eye contact"
+        assert result["issues"][0]["suggestions"] == ["Look at the camera"]
+        assert score_facial_engagement(dict(summary, face_detected_frames=2))["score"] is None
+    
+    def test_process_face_landmarks_uses_landmarks_from_holistic(self, mock_face_results):
+        face_mesh = MagicMock()
+        stage = HeadFaceAnalyzer(face_mesh)
+        frame = Frame(3, 100.0, np.zeros((480, 640, 3), dtype=np.uint8), (640, 480))
+        
+        face_data = stage.process_face_landmarks(frame, mock_face_results.multi_face_landmarks[0])
+        stage.process_face_landmarks(frame, None)
+        
+        face_mesh.process.assert_not_called()
+        assert face_data["face_detected"] and face_data["frame"] == 3
+        assert stage.metrics.column("face_detected").tolist() == [True, False]
+        assert stage.stats["head_frames"] == 1 and stage.stats["no_head_frames"] == 1
@@ -0,0 +1,69 @@
+import numpy as np
+
+from services.facial_metrics import FacialMetrics, COLUMNS
+from services.facial_analysis_service import summarize_facial_engagement
+
+def face_frame(frame, expression="smiling", centered=True):
+    return {
+        "face_detected": True,
+        "frame": frame,
+        "engagement_level": 40.0 + frame,
+        "expression_type": expression,
+        "smile_intensity": 0.6,
+        "eyebrow_movement": 0.3,
+        "eye_openness": 0.5,
+        "gaze_direction": "center" if centered else "looking-left",
+        "gaze_angle": 0.0 if centered else -9.0,
+        "eye_contact_quality": "good",
+        "looking_at_audience": centered
+    }
+
+def sample_frames():
+    frames = [face_frame(i, "serious" if i % 3 == 0 else "smiling", centered=i % 4 != 0) for i in range(1, 301)]
+    frames[10] = {"face_detected": False, "frame": 11}
+    return frames
+
+def test_columns_grow_past_the_preallocated_capacity():
+    metrics = FacialMetrics(capacity=4)
+
+    for face_data in sample_frames():
+        metrics.append(face_data)
+
+    assert len(metrics) == 300
+    assert metrics.column("frame").tolist() == list(range(1, 301))
+    assert np.isnan(metrics.column("engagement_level")[10])
+    assert metrics.labels("expression_type")[:4] == ["smiling", "smiling", "serious", "smiling"]
+    assert metrics.labels("expression_type")[10] is None
+
+def test_summary_from_columns_matches_frame_dicts():
+    frames = sample_frames()
+
+    from_columns = summarize_facial_engagement(FacialMetrics.from_frames(frames), 1500)
+    from_dicts = summarize_facial_engagement(frames, 1500)
+
+    assert from_columns == from_dicts
+    assert from_columns["face_detected_frames"] == 299
+    assert from_columns["dominant_expression"] == "smiling"
+    assert len(from_columns["frame_metrics"]["frame"]) == 299
+    assert from_columns["frame_metrics"]["categories"]["expression_type"][0] == "neutral"
+
+def test_save_and_load_round_trip(tmp_path):
+    metrics = FacialMetrics.from_frames(sample_frames())
+    path = tmp_path / "facial.npz"
+
+    metrics.save(path)
+    loaded = FacialMetrics.load(path)
+
+    assert len(loaded) == 300
+    assert loaded.to_dict(detected_only=True) == metrics.to_dict(detected_only=True)
+
+def test_take_and_concatenate_keep_rows_in_order():
+    metrics = FacialMetrics.from_frames(sample_frames())
+    first = metrics.take(metrics.column("frame") <= 150)
+    second = metrics.take(metrics.column("frame") > 150)
+    joined = FacialMetrics.concatenate([first, second])
+    
+    assert len(first) == 150 and len(second) == 150
+    for name in COLUMNS:
+        np.testing.assert_array_equal(joined.column(name), metrics.column(name))
+    assert len(FacialMetrics.concatenate([])) == 0
@@ -0,0 +1,122 @@
+import pytest
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+from services.frame_source import FrameSource
+
+class RecordingAnalyzer:
+    """Analyzer that records the frames it receives and reads their RGB image"""
+    def __init__(self):
+        self.frames = []
+
+    def process_frame(self, frame):
+        frame.rgb
+        self.frames.append(frame.frame_number)
+
+@pytest.fixture
+def mock_cv2():
+    with patch('services.frame_source.cv2') as mock_cv2:
+        mock_video = MagicMock()
+        mock_video.isOpened.return_value = True
+        mock_frames = [(True, np.zeros((720, 1280, 3), dtype=np.uint8)) for _ in range(6)]
+        mock_frames.append((False, None))
+        frames = iter(mock_frames)
+        mock_video.read.side_effect = lambda: next(frames)
+        mock_video.grab.side_effect = lambda: next(frames)[0]
+        mock_video.retrieve.return_value = (True, np.zeros((720, 1280, 3), dtype=np.uint8))
+        mock_video.get.return_value = 30
+
+        mock_cv2.VideoCapture.return_value = mock_video
+        mock_cv2.resize.side_effect = lambda frame, size: np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        mock_cv2.cvtColor.side_effect = lambda frame, code: frame
+
+        yield mock_cv2
+
+def test_frames_are_decoded_once_for_all_analyzers(mock_cv2):
+    source = FrameSource("test_video.mp4")
+    every_frame = source.register(RecordingAnalyzer())
+    every_third = source.register(RecordingAnalyzer(), every=3)
+
+    stats = source.run()
+
+    assert every_frame.frames == [1, 2, 3, 4, 5, 6]
+    assert every_third.frames == [3, 6]
+    assert stats["frame_count"] == 6
+    assert stats["decoded_frames"] == 6
+    assert stats["analyzed_frames"] == {"RecordingAnalyzer": 8}
+    # Each frame is read, resized and converted to RGB once even when shared
+    assert mock_cv2.VideoCapture.return_value.read.call_count == 7
+    assert mock_cv2.resize.call_count == 6
+    assert mock_cv2.cvtColor.call_count == 6
+
+def test_frames_are_resized_to_max_width(mock_cv2):
+    source = FrameSource("test_video.mp4")
+    sizes = []
+    analyzer = MagicMock()
+    analyzer.process_frame.side_effect = lambda frame: sizes.append((frame.bgr.shape[1], frame.original_size))
+    source.register(analyzer, every=2)
+
+    source.run()
+
+    assert sizes == [(640, (1280, 720))] * 3
+
+def test_skipped_frames_are_grabbed_not_decoded(mock_cv2):
+    source = FrameSource("test_video.mp4")
+    analyzer = source.register(RecordingAnalyzer(), every=3)
+
+    stats = source.run()
+
+    video = mock_cv2.VideoCapture.return_value
+    assert analyzer.frames == [3, 6]
+    assert stats["frame_count"] == 6
+    assert stats["decoded_frames"] == 2
+    assert stats["skipped_frames"] == 4
+    # 4 skipped frames plus the grab that hits the end of the video
+    assert video.grab.call_count == 5
+    assert video.read.call_count == 2
+    assert mock_cv2.resize.call_count == 2
+
+def test_unopened_video_raises(mock_cv2):
+    mock_cv2.VideoCapture.return_value.isOpened.return_value = False
+
+    with pytest.raises(ValueError):
+        FrameSource("missing.mp4")
+
+def test_frame_range_keeps_absolute_frame_numbers(mock_cv2):
+    source = FrameSource("test_video.mp4", start_frame=2, end_frame=5)
+    analyzer = source.register(RecordingAnalyzer(), every=2)
+
+    stats = source.run()
+
+    mock_cv2.VideoCapture.return_value.set.assert_called_once_with(mock_cv2.CAP_PROP_POS_FRAMES, 2)
+    assert analyzer.frames == [4]
+    assert stats["frame_count"] == 5
+    assert stats["decoded_frames"] == 1
+    assert stats["skipped_frames"] == 2
+
+def test_sampler_chooses_frames(mock_cv2):
+    source = FrameSource("test_video.mp4")
+    sampler = MagicMock()
+    sampler.wants.side_effect = lambda frame_number, timestamp_ms: frame_number in (2, 5)
+    analyzer = source.register(RecordingAnalyzer(), every=3, sampler=sampler)
+
+    stats = source.run()
+
+    assert analyzer.frames == [2, 5]
+    assert stats["decoded_frames"] == 2
+
+def test_interval_ms_samples_on_presentation_timestamps(mock_cv2):
+    # Variable frame rate: gaps of 100, 400, 100, 500 and 100 ms
+    timestamps = iter([0.0, 100.0, 500.0, 600.0, 1100.0, 1200.0])
+    mock_cv2.VideoCapture.return_value.get.side_effect = (
+        lambda prop: next(timestamps) if prop == mock_cv2.CAP_PROP_POS_MSEC else 30
+    )
+    source = FrameSource("test_video.mp4")
+    analyzer = source.register(RecordingAnalyzer(), interval_ms=500)
+
+    stats = source.run()
+
+    # First frame at or after 0, 500 and 1000 ms
+    assert analyzer.frames == [1, 3, 5]
+    assert stats["decoded_frames"] == 3
+    assert mock_cv2.VideoCapture.return_value.retrieve.call_count == 3
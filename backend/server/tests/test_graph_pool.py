@@ -0,0 +1,104 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from services.graph_pool import GraphPool, get_pool_metrics
+
+def test_graph_is_created_once_and_reset_between_checkouts():
+    factory = MagicMock(side_effect=lambda: MagicMock())
+    pool = GraphPool("test_reuse", factory)
+
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        pass
+
+    assert first is second
+    factory.assert_called_once()
+    assert first.reset.call_count == 2
+    metrics = get_pool_metrics()["test_reuse"]
+    assert metrics["creates"] == 1
+    assert metrics["checkouts"] == 2
+    assert metrics["instances"] == 1
+
+def test_callers_wait_when_pool_is_exhausted():
+    pool = GraphPool("test_wait", MagicMock, max_instances=1)
+    graph = pool.acquire()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    waiter.join(timeout=0.1)
+    assert waiter.is_alive()  # Blocked until the graph is released
+
+    pool.release(graph)
+    waiter.join(timeout=1)
+
+    assert acquired == [graph]
+    assert pool.get_metrics()["reuses"] == 1
+    assert pool.get_metrics()["wait_seconds_total"] > 0
+
+def test_graph_that_fails_to_reset_is_replaced():
+    graphs = [MagicMock(), MagicMock()]
+    graphs[0].reset.side_effect = RuntimeError("graph error")
+    pool = GraphPool("test_broken", MagicMock(side_effect=graphs))
+
+    with pool.checkout():
+        pass
+    with pool.checkout() as graph:
+        pass
+
+    assert graph is graphs[1]
+    graphs[0].close.assert_called_once()
+
+def test_waiter_builds_a_replacement_when_the_graph_is_discarded():
+    graphs = [MagicMock(), MagicMock()]
+    graphs[0].reset.side_effect = RuntimeError("graph error")
+    pool = GraphPool("test_discard_wakes", MagicMock(side_effect=graphs), max_instances=1)
+    graph = pool.acquire()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    waiter.join(timeout=0.1)
+    assert waiter.is_alive()
+
+    pool.release(graph)  # Fails to reset and is dropped
+    waiter.join(timeout=1)
+
+    assert not waiter.is_alive()
+    assert acquired == [graphs[1]]
+    assert pool.get_metrics()["instances"] == 1
+
+def test_waiter_builds_the_graph_when_another_caller_fails_to():
+    building = threading.Event()
+    finish = threading.Event()
+    replacement = MagicMock()
+    def factory():
+        if not building.is_set():
+            building.set()
+            finish.wait(timeout=1)
+            raise RuntimeError("model failed to load")
+        return replacement
+    pool = GraphPool("test_create_fails", factory, max_instances=1)
+    errors, acquired = [], []
+
+    def first_caller():
+        try:
+            pool.acquire()
+        except RuntimeError as e:
+            errors.append(e)
+    first = threading.Thread(target=first_caller)
+    first.start()
+    building.wait(timeout=1)
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    waiter.join(timeout=0.1)
+    assert waiter.is_alive()  # The only slot is taken by the failing build
+
+    finish.set()
+    first.join(timeout=1)
+    waiter.join(timeout=1)
+
+    assert len(errors) == 1
+    assert acquired == [replacement]
@@ -0,0 +1,74 @@
+import pytest
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import job_queue_service
+
+STAGES = ["download", "transcription", "voice"]
+
+def run_job(job, runner, *args):
+    """Enqueue a job and wait until the worker pool has finished it"""
+    async def _run():
+        await job_queue_service.enqueue_job(job, runner, *args)
+        while job["status"] in (job_queue_service.JOB_QUEUED, job_queue_service.JOB_RUNNING):
+            await asyncio.sleep(0.01)
+        await job_queue_service.stop_workers()
+    asyncio.run(_run())
+
+def test_create_job_registers_pending_stages():
+    job = job_queue_service.create_job("test_report", STAGES)
+    
+    assert job_queue_service.get_job(job["job_id"]) is job
+    assert job["status"] == job_queue_service.JOB_QUEUED
+    assert list(job["stages"]) == STAGES
+    assert all(stage["status"] == job_queue_service.STAGE_PENDING for stage in job["stages"].values())
+
+def test_get_job_unknown_id():
+    assert job_queue_service.get_job("does-not-exist") is None
+
+def test_job_runs_and_records_stage_timings():
+    async def runner(job, report_id):
+        job_queue_service.start_stage(job, "download")
+        job_queue_service.complete_stage(job, "download")
+        job_queue_service.skip_stage(job, "transcription", "No audio")
+        job_queue_service.start_stage(job, "voice")
+        job_queue_service.fail_stage(job, "voice", "Voice analysis failed: boom")
+    
+    job = job_queue_service.create_job("test_report", STAGES)
+    run_job(job, runner, "test_report")
+    
+    status = job_queue_service.job_status(job)
+    assert status["status"] == job_queue_service.JOB_COMPLETED_WITH_ERRORS
+    assert status["duration"] is not None
+    assert status["stages"]["download"]["status"] == job_queue_service.STAGE_COMPLETED
+    assert status["stages"]["download"]["duration"] >= 0
+    assert status["stages"]["transcription"]["status"] == job_queue_service.STAGE_SKIPPED
+    assert status["stages"]["voice"]["error"] == "Voice analysis failed: boom"
+    assert status["errors"] == ["Voice analysis failed: boom"]
+    # Internal timing fields are not exposed
+    assert "_t0" not in status["stages"]["voice"]
+
+def test_job_failure_marks_job_failed():
+    async def runner(job):
+        raise RuntimeError("download failed")
+    
+    job = job_queue_service.create_job("test_report", STAGES)
+    run_job(job, runner)
+    
+    assert job["status"] == job_queue_service.JOB_FAILED
+    assert job["errors"] == ["download failed"]
+
+def test_successful_job_completes():
+    async def runner(job):
+        for stage in STAGES:
+            job_queue_service.start_stage(job, stage)
+            job_queue_service.complete_stage(job, stage)
+    
+    job = job_queue_service.create_job("test_report", STAGES)
+    run_job(job, runner)
+    
+    assert job["status"] == job_queue_service.JOB_COMPLETED
+    assert job["errors"] == []
@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+
+from services.landmark_store import (
+    LandmarkWriter, load_landmarks, archive_landmarks, load_archived_landmarks, list_archived_reports
+)
+
+def test_landmarks_round_trip(tmp_path):
+    output_dir = str(tmp_path / "landmarks")
+    writer = LandmarkWriter(output_dir)
+    pose = np.random.default_rng(0).random((33, 4), dtype=np.float32)
+
+    writer.append(30, 1000.0, pose)
+    writer.append(60, 2000.0)  # No pose detected
+    writer.append(90, 3000.0, pose, carried_over=True)
+    writer.close(fps=30.0, sample_interval=30)
+
+    stored = load_landmarks(output_dir)
+
+    assert stored["landmarks"].shape == (3, 33, 4)
+    assert isinstance(stored["landmarks"], np.memmap)
+    np.testing.assert_array_equal(stored["landmarks"][0], pose)
+    assert np.isnan(stored["landmarks"][1]).all()
+    np.testing.assert_array_equal(stored["frame_numbers"], [30, 60, 90])
+    np.testing.assert_array_equal(stored["timestamps_ms"], [1000.0, 2000.0, 3000.0])
+    assert stored["carried_over"].tolist() == [False, False, True]
+    assert stored["meta"]["count"] == 3
+    assert stored["meta"]["sample_interval"] == 30
+
+def test_empty_landmarks(tmp_path):
+    output_dir = str(tmp_path / "landmarks")
+    LandmarkWriter(output_dir).close()
+
+    stored = load_landmarks(output_dir)
+
+    assert stored["landmarks"].shape == (0, 33, 4)
+    assert len(stored["timestamps_ms"]) == 0
+
+def test_archive_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setenv("LANDMARK_ARCHIVE_DIR", str(tmp_path / "archive"))
+    landmarks = np.random.default_rng(0).random((5, 33, 4), dtype=np.float32)
+    landmarks[2] = np.nan
+
+    archive_landmarks("report-1", landmarks, np.arange(5) * 1000.0, {"fps": 30.0})
+    stored = load_archived_landmarks("report-1")
+
+    np.testing.assert_array_equal(stored["landmarks"], landmarks)
+    np.testing.assert_array_equal(stored["timestamps_ms"], np.arange(5) * 1000.0)
+    assert stored["meta"]["fps"] == 30.0
+    assert stored["meta"]["report_id"] == "report-1"
+    assert list_archived_reports() == ["report-1"]
+
+def test_missing_archive_raises(tmp_path, monkeypatch):
+    monkeypatch.setenv("LANDMARK_ARCHIVE_DIR", str(tmp_path / "archive"))
+
+    assert list_archived_reports() == []
+    with pytest.raises(FileNotFoundError):
+        load_archived_landmarks("missing")
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a separate process: redirecting descriptors 1 and 2 here would
+# also swallow pytest's own output capture
+SCRIPT = """
+import logging, os, sys, threading
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+from services.logging_utils import silence_native_logs
+print(f"silenced {silence_native_logs()} {silence_native_logs()}")
+os.write(1, b"native stdout\\n")
+os.write(2, b"native stderr\\n")
+threads = [threading.Thread(target=print, args=(f"print {i}",)) for i in range(2)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+logging.getLogger("worker").info("logged")
+print("stderr print", file=sys.stderr)
+"""
+
+def run_script(**env):
+    return subprocess.run([sys.executable, "-c", SCRIPT], cwd=SERVER_DIR, capture_output=True, text=True,
+                          env=dict(os.environ, **env), timeout=60)
+
+def test_silence_native_logs_keeps_python_output():
+    result = run_script()
+    
+    assert result.returncode == 0, result.stderr
+    assert "silenced True False" in result.stdout
+    assert "native" not in result.stdout + result.stderr
+    assert "print 0" in result.stdout and "print 1" in result.stdout
+    assert "logged" in result.stderr and "stderr print" in result.stderr
+
+def test_silence_native_logs_can_be_disabled():
+    result = run_script(SILENCE_NATIVE_LOGS="0")
+    
+    assert "silenced False False" in result.stdout
+    assert "native stdout" in result.stdout and "native stderr" in result.stderr
+
+# Thread mode: no worker initializer runs, so MediaPipe's own initialization
+# has to silence the API process
+THREAD_MODE_SCRIPT = """
+import asyncio, logging, os
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+from services import worker_pool
+from services.logging_utils import init_mediapipe
+
+def analyze():
+    os.write(2, b"native stderr\\n")
+    logging.getLogger("analyzer").info("analyzed")
+    return os.getpid()
+
+init_mediapipe()
+assert worker_pool.get_executor() is None
+print(f"same process {asyncio.run(worker_pool.run_in_worker(analyze)) == os.getpid()}")
+"""
+
+def test_thread_mode_silences_native_logs_in_process():
+    result = subprocess.run([sys.executable, "-c", THREAD_MODE_SCRIPT], cwd=SERVER_DIR, capture_output=True,
+                            text=True, env=dict(os.environ, ANALYSIS_WORKERS="0"), timeout=120)
+    
+    assert result.returncode == 0, result.stderr
+    assert "same process True" in result.stdout
+    assert "native" not in result.stdout + result.stderr
+    assert "analyzed" in result.stderr
@@ -0,0 +1,82 @@
+import pytest
+import asyncio
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The controller creates its Supabase client at import, which fails without
+# real credentials; the stage graph helpers tested here never use it
+with patch("supabase.create_client", MagicMock(name="create_client")):
+    from controllers.main_process_controller import run_stage_graph, _validate_stage_graph
+from services import job_queue_service
+
+GRAPH = {
+    "download": {"requires": [], "after": []},
+    "audio": {"requires": ["download"], "after": []},
+    "pose": {"requires": ["download"], "after": []},
+    "grammar": {"requires": ["audio"], "after": []},
+    "tasks": {"requires": [], "after": ["pose", "grammar"]}
+}
+
+def make_stage(name, events, delay=0.0, fail=False):
+    async def stage(context):
+        events.append(("start", name))
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("boom")
+        context[name] = True
+        events.append(("end", name))
+    return stage
+
+def test_run_stage_graph_runs_independent_stages_concurrently():
+    events = []
+    functions = {
+        "download": make_stage("download", events),
+        "audio": make_stage("audio", events, delay=0.05),
+        "pose": make_stage("pose", events, delay=0.05),
+        "grammar": make_stage("grammar", events),
+        "tasks": make_stage("tasks", events)
+    }
+    job = job_queue_service.create_job("test_report", GRAPH)
+    context = {}
+    
+    results = asyncio.run(run_stage_graph(job, GRAPH, functions, context))
+    
+    assert all(results.values())
+    # Pose starts before audio has finished
+    assert events.index(("start", "pose")) < events.index(("end", "audio"))
+    # Dependencies are respected
+    assert events.index(("end", "audio")) < events.index(("start", "grammar"))
+    assert events[-1] == ("end", "tasks")
+    assert all(stage["status"] == job_queue_service.STAGE_COMPLETED for stage in job["stages"].values())
+
+def test_run_stage_graph_skips_dependents_of_failed_stage():
+    events = []
+    functions = {
+        "download": make_stage("download", events),
+        "audio": make_stage("audio", events, fail=True),
+        "pose": make_stage("pose", events),
+        "grammar": make_stage("grammar", events),
+        "tasks": make_stage("tasks", events)
+    }
+    job = job_queue_service.create_job("test_report", GRAPH)
+    
+    results = asyncio.run(run_stage_graph(job, GRAPH, functions, {}))
+    
+    assert results == {"download": True, "audio": False, "pose": True, "grammar": False, "tasks": True}
+    assert job["stages"]["audio"]["status"] == job_queue_service.STAGE_FAILED
+    assert job["stages"]["grammar"]["status"] == job_queue_service.STAGE_SKIPPED
+    # "after" dependencies only order stages, so task assignment still runs
+    assert job["stages"]["tasks"]["status"] == job_queue_service.STAGE_COMPLETED
+    assert len(job["errors"]) == 1
+
+def test_validate_stage_graph_rejects_cycles_and_unknown_stages():
+    with pytest.raises(ValueError):
+        _validate_stage_graph({
+            "a": {"requires": ["b"], "after": []},
+            "b": {"requires": ["a"], "after": []}
+        })
+    with pytest.raises(ValueError):
+        _validate_stage_graph({"a": {"requires": ["missing"], "after": []}})
@@ -0,0 +1,406 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+from services.pose_analysis_service import (
+    score_landmarks, analyze_movement, rescore_report, rescore_reports, plan_shards, merge_shard_results,
+    PoseFrameAnalyzer, roi_from_landmarks, roi_contains, roi_moved
+)
+from services.frame_source import Frame
+from services.movement_analysis_service import analyze_presenter_movement_batch
+from services import pose_analysis_service
+from services.landmark_store import archive_landmarks
+from services.posture_rules import LEFT_EAR, RIGHT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP, NOSE, X, Y, VISIBILITY
+
+def upright_video(frames=20):
+    """(frames, 33, 4) tensor of a centered, level, fully visible pose"""
+    lm = np.zeros((33, 4), dtype=np.float32)
+    lm[:, [X, Y]] = 0.5
+    lm[:, VISIBILITY] = 1.0
+    lm[LEFT_SHOULDER, [X, Y]] = (0.4, 0.35)
+    lm[RIGHT_SHOULDER, [X, Y]] = (0.6, 0.35)
+    lm[LEFT_HIP, [X, Y]] = (0.41, 0.7)
+    lm[RIGHT_HIP, [X, Y]] = (0.63, 0.7)
+    lm[15, [X, Y]] = (0.2, 0.5)
+    lm[16, [X, Y]] = (0.8, 0.5)
+    return np.repeat(lm[None], frames, axis=0)
+
+def test_score_landmarks_good_posture():
+    landmarks = upright_video()
+
+    results = score_landmarks(landmarks, np.arange(20) * 1000.0)
+
+    assert results['detected_frames'] == 20
+    assert results['detection_rate'] == 100
+    assert results['issues'][0]['topic'] == "Good Posture Maintained"
+    assert results['gesture_metrics']['frames'] == 20
+    assert results['movement_metrics']['movement_intensity'] == "low"
+
+def test_score_landmarks_counts_rule_hits_and_missing_frames():
+    landmarks = upright_video()
+    landmarks[:10, LEFT_EAR, Y] = 0.6  # Head tilted in half of the frames
+    landmarks[15:] = np.nan  # No pose detected in the last 5 frames
+
+    results = score_landmarks(landmarks)
+
+    assert results['detected_frames'] == 15
+    assert results['detection_rate'] == 75
+    head_tilt = [issue for issue in results['issues'] if issue['topic'] == "Head Tilt"]
+    assert head_tilt and head_tilt[0]['examples'][0] == "Observed in 66.7% of your presentation"
+
+def test_score_landmarks_poor_detection():
+    landmarks = upright_video()
+    landmarks[3:] = np.nan
+
+    results = score_landmarks(landmarks)
+
+    assert results['score'] == 5
+    assert 'error' in results
+
+def test_analyze_movement_thresholds():
+    still = np.full((20, 2), 0.5)
+    assert analyze_movement(still) == 0
+
+    moving = np.column_stack([np.arange(20) * 0.05, np.zeros(20)])
+    assert analyze_movement(moving) == 0.8
+
+def test_rescore_report_applies_threshold_overrides(tmp_path, monkeypatch):
+    monkeypatch.setenv("LANDMARK_ARCHIVE_DIR", str(tmp_path))
+    landmarks = upright_video()
+    landmarks[:, LEFT_EAR, Y] += 0.03  # Ears 0.03 apart: tilted at the default 0.02 threshold
+    archive_landmarks("report-1", landmarks, np.arange(20) * 1000.0)
+
+    default = rescore_report("report-1")
+    relaxed = rescore_report("report-1", thresholds={'head_tilt_frames': 0.05})
+
+    assert "Head Tilt" in [issue['topic'] for issue in default['issues']]
+    assert "Head Tilt" not in [issue['topic'] for issue in relaxed['issues']]
+    assert relaxed['score'] > default['score']
+
+def test_rescore_reports_reports_missing_archives(tmp_path, monkeypatch):
+    monkeypatch.setenv("LANDMARK_ARCHIVE_DIR", str(tmp_path))
+    archive_landmarks("report-1", upright_video(), np.arange(20) * 1000.0)
+
+    results = rescore_reports(["report-1", "missing"])
+
+    assert results["report-1"]['issues'][0]['topic'] == "Good Posture Maintained"
+    assert 'error' in results["missing"]
+    with pytest.raises(ValueError):
+        rescore_reports(thresholds={'not_a_rule': 1.0})
+
+def test_plan_shards_covers_video_with_overlap():
+    shards = plan_shards(1000, 3, 90)
+
+    assert shards == [(0, 0, 333), (243, 333, 667), (577, 667, None)]
+
+def test_merge_shard_results_concatenates_in_order():
+    def shard(frame_numbers, decoded, frame_count):
+        return {
+            "landmarks": upright_video(len(frame_numbers)),
+            "frame_numbers": np.array(frame_numbers),
+            "timestamps_ms": np.array(frame_numbers) * 100.0,
+            "carried_over": np.array([False, True, False]),
+            "stats": {"frame_count": frame_count, "decoded_frames": decoded, "skipped_frames": 10,
+                      "analyzed_frames": {"PoseFrameAnalyzer": decoded}, "fps": 10.0, "total_frames": 60,
+                      "pose_gate": {"inferred_frames": 2, "carried_frames": 1}}
+        }
+
+    landmarks, frame_numbers, timestamps_ms, carried_over, stats = merge_shard_results([
+        shard([10, 20, 30], 3, 30), shard([40, 50, 60], 5, 60)
+    ])
+
+    assert landmarks.shape == (6, 33, 4)
+    np.testing.assert_array_equal(frame_numbers, [10, 20, 30, 40, 50, 60])
+    np.testing.assert_array_equal(timestamps_ms, frame_numbers * 100.0)
+    assert stats["frame_count"] == 60
+    assert stats["decoded_frames"] == 8
+    assert stats["analyzed_frames"] == {"PoseFrameAnalyzer": 8}
+    assert stats["shards"] == 2
+    assert carried_over.tolist() == [False, True, False] * 2
+    assert stats["pose_gate"] == {"inferred_frames": 4, "carried_frames": 2, "skip_ratio": 2 / 6}
+
+def test_shard_count_defaults_to_the_worker_share_of_cores(monkeypatch):
+    monkeypatch.setattr(pose_analysis_service, "SHARD_WORKERS", 0)
+    monkeypatch.setattr(pose_analysis_service.worker_pool, "nested_worker_count", lambda: 4)
+
+    assert pose_analysis_service._get_shard_count(30, 30 * 600) == 4
+    assert pose_analysis_service._get_shard_count(30, 30 * 150) == 1  # Shorter than LONG_VIDEO_SECONDS
+
+    monkeypatch.setattr(pose_analysis_service.worker_pool, "nested_worker_count", lambda: 1)
+    assert pose_analysis_service._get_shard_count(30, 30 * 600) == 1
+
+def test_shard_pool_is_sized_from_the_budget_and_shut_down(monkeypatch):
+    created = []
+    def make_executor(**kwargs):
+        created.append(MagicMock(kwargs=kwargs))
+        return created[-1]
+    monkeypatch.setattr(pose_analysis_service, "ProcessPoolExecutor", make_executor)
+    monkeypatch.setattr(pose_analysis_service, "SHARD_WORKERS", 0)
+    monkeypatch.setattr(pose_analysis_service, "_shard_executor", None)
+    monkeypatch.setattr(pose_analysis_service.worker_pool, "nested_worker_count", lambda: 3)
+    monkeypatch.setattr(pose_analysis_service.worker_pool, "_nested_pool_shutdowns", [])
+
+    executor = pose_analysis_service._get_shard_executor()
+
+    assert pose_analysis_service._get_shard_executor() is executor and len(created) == 1
+    assert executor.kwargs["max_workers"] == 3 and executor.kwargs["initargs"] == (3,)
+
+    pose_analysis_service.worker_pool.shutdown()
+
+    executor.shutdown.assert_called_once()
+    assert pose_analysis_service._shard_executor is None
+
+def test_malformed_settings_fall_back_to_defaults(monkeypatch):
+    import importlib
+    monkeypatch.setenv("POSE_SHARD_WORKERS", "four")
+    monkeypatch.setenv("POSE_FRAME_BUDGET", "900.5")
+    monkeypatch.setenv("POSE_SAMPLE_INTERVAL_MS", "1s")
+    try:
+        module = importlib.reload(pose_analysis_service)
+        assert module.SHARD_WORKERS == 0
+        assert module.FRAME_BUDGET == 900
+        assert module.SAMPLE_INTERVAL_MS == 1000.0
+    finally:
+        monkeypatch.delenv("POSE_SHARD_WORKERS")
+        monkeypatch.delenv("POSE_FRAME_BUDGET")
+        monkeypatch.delenv("POSE_SAMPLE_INTERVAL_MS")
+        importlib.reload(pose_analysis_service)
+
+def test_roi_from_landmarks_pads_visible_landmarks():
+    pose = upright_video(1)[0]
+    pose[:, [X, Y]] = 0.5
+    pose[LEFT_SHOULDER, [X, Y]] = (0.4, 0.3)
+    pose[RIGHT_HIP, [X, Y]] = (0.6, 0.7)
+    pose[NOSE, VISIBILITY] = 0.1
+    pose[NOSE, [X, Y]] = (0.0, 0.0)  # Not visible, so ignored
+
+    roi = roi_from_landmarks(pose, padding=0.25)
+
+    np.testing.assert_allclose(roi, (0.35, 0.2, 0.65, 0.8), atol=1e-6)
+    assert roi_contains(roi, pose, roi)
+    # A pose filling most of the frame is analyzed in full
+    assert roi_from_landmarks(pose, padding=2.0) is None
+
+def mock_pose_results(landmarks):
+    results = MagicMock()
+    if landmarks is None:
+        results.pose_landmarks = None
+    else:
+        results.pose_landmarks.landmark = [MagicMock(x=x, y=y, z=z, visibility=v) for x, y, z, v in landmarks]
+    return results
+
+def test_roi_crop_maps_landmarks_to_full_frame():
+    pose = upright_video(1)[0]
+    graph = MagicMock()
+    analyzer = PoseFrameAnalyzer(pose=graph, use_roi=True, use_motion_gate=False)
+    image = np.zeros((200, 400, 3), dtype=np.uint8)
+
+    # First frame: full-frame detection sets the crop around the pose
+    graph.process.return_value = mock_pose_results(pose)
+    analyzer.process_frame(Frame(1, 0.0, image, (400, 200)))
+    roi = analyzer.roi
+    assert roi is not None
+
+    # Second frame: the graph sees only the crop and reports crop coordinates
+    left, top = int(roi[0] * 400), int(roi[1] * 200)
+    crop_w, crop_h = int(np.ceil(roi[2] * 400)) - left, int(np.ceil(roi[3] * 200)) - top
+    in_crop = pose.copy()
+    in_crop[:, X] = (pose[:, X] * 400 - left) / crop_w
+    in_crop[:, Y] = (pose[:, Y] * 200 - top) / crop_h
+    graph.process.return_value = mock_pose_results(in_crop)
+    analyzer.process_frame(Frame(2, 1000.0, image, (400, 200)))
+
+    assert graph.process.call_args[0][0].shape == (crop_h, crop_w, 3)
+    landmarks, _ = analyzer.get_landmarks()
+    np.testing.assert_allclose(landmarks[1, :, :2], pose[:, :2], atol=1e-5)
+    assert analyzer.roi_stats["roi_frames"] == 1
+
+def test_roi_crop_switch_resets_tracking_only_when_the_view_moves():
+    pose = upright_video(1)[0]
+    graph = MagicMock()
+    analyzer = PoseFrameAnalyzer(pose=graph, use_roi=True, use_motion_gate=False)
+    image = np.zeros((200, 400, 3), dtype=np.uint8)
+
+    # Full frame to the first crop scales the view: tracking restarts
+    graph.process.return_value = mock_pose_results(pose)
+    analyzer.process_frame(Frame(1, 0.0, image, (400, 200)))
+    first_roi = analyzer.roi
+    assert graph.reset.call_count == 1
+
+    def in_crop(shift):
+        roi = analyzer.roi
+        left, top = int(roi[0] * 400), int(roi[1] * 200)
+        crop_w, crop_h = int(np.ceil(roi[2] * 400)) - left, int(np.ceil(roi[3] * 200)) - top
+        landmarks = pose.copy()
+        landmarks[:, X] = (pose[:, X] * 400 - left) / crop_w + shift
+        landmarks[:, Y] = (pose[:, Y] * 200 - top) / crop_h
+        return mock_pose_results(landmarks)
+
+    # A small move stays inside the crop: same crop, tracking kept
+    graph.process.return_value = in_crop(0.02)
+    analyzer.process_frame(Frame(2, 1000.0, image, (400, 200)))
+    assert analyzer.roi == first_roi
+    assert graph.reset.call_count == 1
+
+    # The presenter walks well to the side: the crop follows and tracking restarts
+    graph.process.return_value = in_crop(0.5)
+    analyzer.process_frame(Frame(3, 2000.0, image, (400, 200)))
+    assert analyzer.roi[0] > first_roi[0]
+    assert graph.reset.call_count == 2
+    assert analyzer.roi_stats["tracking_resets"] == 2
+
+def test_roi_moved_ignores_small_crop_adjustments():
+    crop = (0.3, 0.2, 0.7, 0.8)
+
+    assert not roi_moved(crop, (0.32, 0.21, 0.72, 0.81))
+    assert roi_moved(crop, (0.42, 0.2, 0.82, 0.8))  # Shifted by 30% of the width
+    assert roi_moved(crop, (0.2, 0.1, 0.8, 0.9))  # Grown by half
+    assert roi_moved(crop, None) and roi_moved(None, crop)
+    assert not roi_moved(None, None)
+
+def test_holistic_mode_passes_face_landmarks_to_the_face_stage():
+    pose = upright_video(1)[0]
+    graph = MagicMock()
+    results = mock_pose_results(pose)
+    graph.process.return_value = results
+    face_stage = MagicMock()
+    analyzer = PoseFrameAnalyzer(pose=graph, use_roi=True, use_motion_gate=False, face_stage=face_stage, holistic=True)
+    image = np.zeros((200, 400, 3), dtype=np.uint8)
+
+    for frame_number in (1, 2):
+        analyzer.process_frame(Frame(frame_number, frame_number * 1000.0, image, (400, 200)))
+
+    # One call per frame on the whole frame, no crop and no head-crop FaceMesh
+    assert graph.process.call_count == 2
+    assert graph.process.call_args[0][0].shape == (200, 400, 3)
+    assert analyzer.roi_stats["roi_frames"] == 0
+    assert face_stage.process_face_landmarks.call_count == 2
+    assert face_stage.process_face_landmarks.call_args[0][1] is results.face_landmarks
+    face_stage.process_head.assert_not_called()
+
+def test_roi_crop_falls_back_to_full_frame_when_pose_is_lost():
+    pose = upright_video(1)[0]
+    graph = MagicMock()
+    analyzer = PoseFrameAnalyzer(pose=graph, use_roi=True, use_motion_gate=False)
+    image = np.zeros((200, 400, 3), dtype=np.uint8)
+    graph.process.return_value = mock_pose_results(pose)
+    analyzer.process_frame(Frame(1, 0.0, image, (400, 200)))
+
+    # Nothing in the crop, then the full frame finds the pose again
+    graph.process.side_effect = [mock_pose_results(None), mock_pose_results(pose)]
+    analyzer.process_frame(Frame(2, 1000.0, image, (400, 200)))
+
+    assert graph.process.call_args[0][0].shape == (200, 400, 3)
+    landmarks, _ = analyzer.get_landmarks()
+    np.testing.assert_allclose(landmarks[1], pose, atol=1e-6)
+    assert analyzer.roi_stats["fallback_frames"] == 1
+
+def test_motion_gate_carries_landmarks_over_static_frames():
+    pose = upright_video(1)[0]
+    graph = MagicMock()
+    graph.process.return_value = mock_pose_results(pose)
+    analyzer = PoseFrameAnalyzer(pose=graph, use_roi=False, use_motion_gate=True)
+    still = np.full((200, 400, 3), 100, dtype=np.uint8)
+    moved = still.copy()
+    moved[50:150, 100:200] = 200
+
+    for frame_number, image in enumerate([still, still, still, moved], 1):
+        analyzer.process_frame(Frame(frame_number, frame_number * 1000.0, image, (400, 200)))
+
+    assert graph.process.call_count == 2
+    assert analyzer.get_carried_over().tolist() == [False, True, True, False]
+    landmarks, _ = analyzer.get_landmarks()
+    np.testing.assert_allclose(landmarks[1], landmarks[0])
+    assert analyzer.get_gate_stats() == {"inferred_frames": 2, "carried_frames": 2, "skip_ratio": 0.5}
+
+def test_motion_gate_limits_consecutive_carried_frames(monkeypatch):
+    monkeypatch.setattr(pose_analysis_service, "MOTION_GATE_MAX_CARRY", 2)
+    graph = MagicMock()
+    graph.process.return_value = mock_pose_results(None)
+    analyzer = PoseFrameAnalyzer(pose=graph, use_roi=False, use_motion_gate=True)
+    still = np.full((200, 400, 3), 100, dtype=np.uint8)
+
+    for frame_number in range(1, 7):
+        analyzer.process_frame(Frame(frame_number, frame_number * 1000.0, still, (400, 200)))
+
+    assert analyzer.get_carried_over().tolist() == [False, True, True, False, True, True]
+
+
+def test_score_landmarks_weights_frames_by_duration():
+    landmarks = upright_video(12)
+    landmarks[:2, LEFT_EAR, Y] = 0.6  # Head tilted in 2 of 12 frames...
+    # ...but those two frames stand for 10 s each of a 30 s video
+    timestamps_ms = np.array([0, 10000] + [20000 + 1000 * i for i in range(10)], dtype=np.float64)
+
+    results = score_landmarks(landmarks, timestamps_ms)
+
+    head_tilt = [issue for issue in results['issues'] if issue['topic'] == "Head Tilt"]
+    assert head_tilt and head_tilt[0]['examples'][0] == "Observed in 66.7% of your presentation"
+
+def test_early_stopping_stops_once_buckets_are_settled(monkeypatch):
+    pose = upright_video(1)[0]
+    graph = MagicMock()
+    graph.process.return_value = mock_pose_results(pose)
+    monkeypatch.setattr(pose_analysis_service, "static_pose_graphs",
+                        pose_analysis_service.GraphPool("pose_static_test", lambda: graph))
+    source = MagicMock(fps=30, total_frames=30 * 600)
+    image = np.zeros((200, 400, 3), dtype=np.uint8)
+    source.read_frame.side_effect = lambda n: Frame(n, n * 1000 / 30, image, (400, 200))
+
+    landmarks, frame_numbers, timestamps_ms, _, stats, movement = pose_analysis_service._analyze_early_stopping(
+        source, 30, rng=np.random.default_rng(0)
+    )
+
+    # A consistently good posture is settled well before all 600 frames
+    assert stats["early_stopping"]["stopped_early"]
+    assert len(landmarks) == stats["early_stopping"]["analyzed_frames"] < 600
+    assert (np.diff(frame_numbers) > 0).all() and (frame_numbers % 30 == 0).all()
+    assert (np.diff(timestamps_ms) > 0).all()
+    assert stats["early_stopping"]["movement_window_frames"] == 30
+    results = score_landmarks(landmarks, timestamps_ms, weight_by_duration=False, movement=movement)
+    assert results['issues'][0]['topic'] == "Good Posture Maintained"
+
+def test_early_stopping_matches_a_full_run(monkeypatch):
+    # 10 minutes at 30 fps, one candidate frame per second. The head is
+    # tilted 7 seconds out of 10 and the presenter sways 0.05 every second.
+    seconds = 600
+    stream = upright_video(seconds + 1)
+    tilted = np.arange(seconds + 1) % 10 < 7
+    stream[tilted, LEFT_EAR, Y] += 0.1
+    stream[:, :, X] += 0.05 * (np.arange(seconds + 1) % 2)[:, None]
+    
+    graph = MagicMock()
+    current = {}
+    graph.process.side_effect = lambda image: mock_pose_results(stream[current["second"]])
+    monkeypatch.setattr(pose_analysis_service, "static_pose_graphs",
+                        pose_analysis_service.GraphPool("pose_static_compare", lambda: graph))
+    source = MagicMock(fps=30, total_frames=30 * seconds)
+    image = np.zeros((200, 400, 3), dtype=np.uint8)
+    
+    def read_frame(frame_number):
+        current["second"] = frame_number // 30
+        return Frame(frame_number, frame_number * 1000 / 30, image, (400, 200))
+    source.read_frame.side_effect = read_frame
+    
+    landmarks, _, timestamps_ms, _, stats, movement = pose_analysis_service._analyze_early_stopping(
+        source, 30, rng=np.random.default_rng(1)
+    )
+    early = score_landmarks(landmarks, timestamps_ms, weight_by_duration=False, movement=movement)
+    full = score_landmarks(stream[1:], np.arange(1, seconds + 1) * 1000.0)
+    
+    assert stats["early_stopping"]["stopped_early"]
+    assert [issue['topic'] for issue in early['issues']] == [issue['topic'] for issue in full['issues']]
+    assert "Excessive Movement" in [issue['topic'] for issue in full['issues']]
+    assert early['score'] == full['score']
+    assert early['movement_metrics']['movement_intensity'] == full['movement_metrics']['movement_intensity']
+
+def test_presenter_movement_uses_real_time_between_frames():
+    # The hips move 0.018 per step, but the steps are 2 s apart: 0.009 per second
+    hip_centers = np.stack([np.arange(10) * 0.018, np.full(10, 0.5)], axis=1)
+
+    per_frame = analyze_presenter_movement_batch(hip_centers, frame_rate=1.0)
+    per_second = analyze_presenter_movement_batch(hip_centers, timestamps_ms=np.arange(10) * 2000.0)
+
+    assert per_frame['movement_intensity'] == "moderate"
+    assert per_second['avg_movement'] == pytest.approx(0.009)
+    assert per_second['movement_intensity'] == "low"
@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+
+from services import posture_rules
+from services.posture_rules import (
+    evaluate_posture_rules, rule_results_to_dict, landmarks_to_array,
+    LEFT_EAR, RIGHT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP,
+    LEFT_WRIST, RIGHT_WRIST, NOSE, LEFT_EYE, RIGHT_EYE, X, Y, VISIBILITY
+)
+
+def upright_pose():
+    """A centered, level, fully visible pose that triggers no rule"""
+    lm = np.zeros((33, 4), dtype=np.float32)
+    lm[:, VISIBILITY] = 1.0
+    lm[NOSE, [X, Y]] = (0.5, 0.2)
+    lm[LEFT_EYE, [X, Y]] = (0.48, 0.18)
+    lm[RIGHT_EYE, [X, Y]] = (0.52, 0.18)
+    lm[LEFT_EAR, [X, Y]] = (0.45, 0.2)
+    lm[RIGHT_EAR, [X, Y]] = (0.55, 0.2)
+    lm[LEFT_SHOULDER, [X, Y]] = (0.4, 0.35)
+    lm[RIGHT_SHOULDER, [X, Y]] = (0.6, 0.35)
+    lm[LEFT_HIP, [X, Y]] = (0.41, 0.7)
+    lm[RIGHT_HIP, [X, Y]] = (0.63, 0.7)
+    lm[LEFT_WRIST, [X, Y]] = (0.2, 0.5)
+    lm[RIGHT_WRIST, [X, Y]] = (0.8, 0.5)
+    return lm
+
+def test_upright_pose_has_no_issues():
+    results = rule_results_to_dict(evaluate_posture_rules(upright_pose()))
+
+    assert not any(results.values())
+
+def test_head_tilt_detected():
+    lm = upright_pose()
+    lm[LEFT_EAR, Y] = 0.25
+
+    results = rule_results_to_dict(evaluate_posture_rules(lm))
+
+    assert results['head_tilt_frames']
+    assert sum(bool(v) for v in results.values()) == 1
+
+def test_rule_ignored_when_landmarks_not_visible():
+    lm = upright_pose()
+    lm[LEFT_EAR, Y] = 0.25
+    lm[LEFT_EAR, VISIBILITY] = 0.3
+
+    results = rule_results_to_dict(evaluate_posture_rules(lm))
+
+    assert not results['head_tilt_frames']
+
+def test_hand_near_hip_detected_only_with_visible_hip():
+    lm = upright_pose()
+    lm[LEFT_WRIST, [X, Y]] = (0.42, 0.72)
+    assert rule_results_to_dict(evaluate_posture_rules(lm))['hand_position_frames']
+
+    lm[LEFT_HIP, VISIBILITY] = 0.5
+    assert not rule_results_to_dict(evaluate_posture_rules(lm))['hand_position_frames']
+
+def test_batch_matches_single_frame_evaluation():
+    rng = np.random.default_rng(0)
+    frames = np.repeat(upright_pose()[None], 50, axis=0)
+    frames[:, :, :2] += rng.normal(0, 0.03, size=(50, 33, 2)).astype(np.float32)
+    frames[:, :, VISIBILITY] = rng.uniform(0.4, 1.0, size=(50, 33))
+
+    batch = evaluate_posture_rules(frames)
+
+    assert batch.shape == (50, len(posture_rules.RULE_NAMES))
+    for i in range(50):
+        np.testing.assert_array_equal(batch[i], evaluate_posture_rules(frames[i]))
+
+def test_threshold_override():
+    lm = upright_pose()
+    lm[LEFT_EAR, Y] = 0.21  # 0.01 difference, below the default 0.02 cutoff
+
+    assert not rule_results_to_dict(evaluate_posture_rules(lm))['head_tilt_frames']
+    results = rule_results_to_dict(evaluate_posture_rules(lm, thresholds={'head_tilt_frames': 0.005}))
+    assert results['head_tilt_frames']
+
+def test_landmarks_to_array():
+    class Landmark:
+        def __init__(self, i):
+            self.x, self.y, self.z, self.visibility = i, i + 0.5, 0.0, 1.0
+
+    array = landmarks_to_array([Landmark(i) for i in range(33)])
+
+    assert array.shape == (33, 4)
+    assert array.dtype == np.float32
+    assert array[10, Y] == 10.5
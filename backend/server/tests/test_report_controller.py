@@ -0,0 +1,44 @@
+import asyncio
+from unittest.mock import patch, MagicMock
+
+# The controller creates its Supabase client at import, which fails without
+# real credentials; the tests replace it with mock_supabase
+with patch("supabase.create_client", MagicMock(name="create_client")):
+    from controllers import report_controller
+    from controllers.report_controller import get_complete_report, REPORT_COLUMNS, OPTIONAL_REPORT_COLUMNS
+
+REPORT = {"scoreContext": 7, "scoreVoice": 8, "weaknessTopicsVoice": []}
+
+def mock_supabase(select_side_effect):
+    supabase = MagicMock()
+    table = supabase.table.return_value
+    table.select.side_effect = select_side_effect
+    return supabase, table
+
+def query(data):
+    response = MagicMock()
+    response.data = data
+    result = MagicMock()
+    result.eq.return_value.execute.return_value = response
+    return result
+
+def test_complete_report_includes_facial_section():
+    supabase, table = mock_supabase([query([dict(REPORT, scoreFacial=6, weaknessTopicsFacial=[{"topic": "x"}])])])
+    
+    with patch.object(report_controller.storage_service, "supabase", supabase):
+        report = asyncio.run(get_complete_report(report_id="r1", user_id="u1"))
+    
+    assert table.select.call_args[0] == tuple(REPORT_COLUMNS + OPTIONAL_REPORT_COLUMNS)
+    assert report["facial"] == {"scoreFacial": 6, "weaknessTopics": [{"topic": "x"}]}
+    assert report["voice"]["scoreVoice"] == 8
+
+def test_complete_report_without_facial_columns_in_the_table():
+    missing = Exception("column UserReport.scoreFacial does not exist")
+    supabase, table = mock_supabase([missing, query([REPORT])])
+    
+    with patch.object(report_controller.storage_service, "supabase", supabase):
+        report = asyncio.run(get_complete_report(report_id="r1", user_id="u1"))
+    
+    assert table.select.call_args[0] == tuple(REPORT_COLUMNS)
+    assert report["facial"] == {"scoreFacial": None, "weaknessTopics": []}
+    assert report["context"]["overall_score"] == 7
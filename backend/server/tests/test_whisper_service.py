@@ -0,0 +1,202 @@
+import pytest
+import os
+import sys
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import whisper_service, transcription_cache
+
+@pytest.fixture(autouse=True)
+def empty_registry(monkeypatch, tmp_path):
+    """Start every test with an empty model registry and transcription cache"""
+    for registry in (whisper_service._model_pools, whisper_service._model_instance_counts, whisper_service._model_metrics):
+        registry.clear()
+    monkeypatch.setenv("TRANSCRIPTION_CACHE_DIR", str(tmp_path / "cache"))
+    yield
+
+def mock_model(text="Hello there"):
+    model = MagicMock()
+    model.transcribe.return_value = {"text": text, "segments": [{"start": 0.0, "end": 1.0, "text": text}]}
+    return model
+
+@patch('services.whisper_service.whisper')
+def test_model_is_loaded_once_and_reused(mock_whisper):
+    mock_whisper.load_model.return_value = MagicMock()
+    
+    first = whisper_service.acquire_model("base")
+    whisper_service.release_model(first, "base")
+    second = whisper_service.acquire_model("base")
+    whisper_service.release_model(second, "base")
+    
+    assert first is second
+    mock_whisper.load_model.assert_called_once_with("base")
+    metrics = whisper_service.get_model_metrics()["base"]
+    assert metrics["loads"] == 1
+    assert metrics["checkouts"] == 2
+    assert metrics["last_load_seconds"] is not None
+
+@patch('services.whisper_service.whisper')
+def test_each_model_size_has_its_own_instance(mock_whisper):
+    mock_whisper.load_model.side_effect = lambda name: MagicMock(name=name)
+    
+    base = whisper_service.acquire_model("base")
+    small = whisper_service.acquire_model("small")
+    
+    assert base is not small
+    assert set(whisper_service.get_model_metrics()) == {"base", "small"}
+
+@patch('services.whisper_service.whisper')
+@patch('services.whisper_service.os.path.exists', return_value=True)
+def test_transcribe_audio_uses_registry(mock_exists, mock_whisper, monkeypatch):
+    monkeypatch.setenv("TRANSCRIPTION_CACHE_MAX_MB", "0")
+    model = mock_model()
+    mock_whisper.load_model.return_value = model
+    mock_whisper.load_audio.return_value = np.zeros(16000, dtype=np.float32)
+    
+    whisper_service.transcribe_audio("tmp/test_report/audio/audio.mp3", "test_report")
+    transcription, segments = whisper_service.transcribe_audio("tmp/test_report/audio/audio.mp3", "test_report")
+    
+    assert transcription == "Hello there"
+    assert len(segments) == 1
+    assert model.transcribe.call_count == 2
+    mock_whisper.load_model.assert_called_once()
+    # The instance is back in the registry after use
+    assert whisper_service._model_pools[whisper_service.DEFAULT_WHISPER_MODEL].qsize() == 1
+
+@patch('services.whisper_service.whisper')
+@patch('services.whisper_service.os.path.exists', return_value=True)
+def test_transcribe_audio_cache_hit_skips_model(mock_exists, mock_whisper):
+    model = mock_model()
+    mock_whisper.load_model.return_value = model
+    mock_whisper.load_audio.return_value = np.ones(16000, dtype=np.float32)
+    stats_before = transcription_cache.get_cache_stats()
+    
+    first = whisper_service.transcribe_audio("tmp/a/audio/audio.mp3")
+    # Same decoded audio under a different path is a hit
+    second = whisper_service.transcribe_audio("tmp/b/audio/audio.mp3")
+    
+    assert first == second
+    assert model.transcribe.call_count == 1
+    stats = transcription_cache.get_cache_stats()
+    assert stats["hits"] - stats_before["hits"] == 1
+    assert stats["misses"] - stats_before["misses"] == 1
+
+@patch('services.whisper_service.whisper')
+@patch('services.whisper_service.os.path.exists', return_value=True)
+def test_transcription_cache_key_includes_model(mock_exists, mock_whisper):
+    model = mock_model()
+    mock_whisper.load_model.return_value = model
+    mock_whisper.load_audio.return_value = np.ones(16000, dtype=np.float32)
+    
+    whisper_service.transcribe_audio("tmp/a/audio/audio.mp3", model_name="base")
+    whisper_service.transcribe_audio("tmp/a/audio/audio.mp3", model_name="small")
+    
+    assert model.transcribe.call_count == 2
+
+def test_transcription_cache_evicts_least_recently_used(monkeypatch):
+    entry = {"text": "x" * 1000, "segments": []}
+    for key in ("old", "middle", "new"):
+        transcription_cache.put(key, entry)
+    cache_dir = transcription_cache.get_cache_dir()
+    # Make "old" the least recently used, then read it so "middle" becomes oldest
+    os.utime(os.path.join(cache_dir, "old.json"), (1, 1))
+    os.utime(os.path.join(cache_dir, "middle.json"), (2, 2))
+    assert transcription_cache.get("old") == entry
+    
+    entry_size = os.path.getsize(os.path.join(cache_dir, "new.json"))
+    transcription_cache.evict(entry_size * 2)
+    
+    assert transcription_cache.get("middle") is None
+    assert transcription_cache.get("old") == entry
+    assert transcription_cache.get("new") == entry
+
+def test_find_chunk_boundaries_cuts_at_silence():
+    sample_rate = 16000
+    # 60 s of "speech" with a 1 s silence centred at 21 s and another at 39 s
+    audio = np.full(60 * sample_rate, 0.5, dtype=np.float32)
+    audio[int(20.5 * sample_rate):int(21.5 * sample_rate)] = 0
+    audio[int(38.5 * sample_rate):int(39.5 * sample_rate)] = 0
+    
+    chunks = whisper_service.find_chunk_boundaries(audio, sample_rate, chunk_seconds=20, search_seconds=3)
+    
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == len(audio)
+    # Chunks are contiguous
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(chunks, chunks[1:]))
+    # Cuts land inside the silent stretches
+    cuts = [start / sample_rate for start, _ in chunks[1:]]
+    assert len(cuts) == 2
+    assert 20.5 <= cuts[0] <= 21.5
+    assert 38.5 <= cuts[1] <= 39.5
+
+def test_find_chunk_boundaries_short_audio_is_one_chunk():
+    audio = np.zeros(16000 * 5, dtype=np.float32)
+    assert whisper_service.find_chunk_boundaries(audio, 16000, chunk_seconds=20) == [(0, len(audio))]
+
+@patch('services.whisper_service.acquire_model')
+@patch('services.whisper_service.release_model')
+def test_transcribe_chunk_offsets_timestamps(mock_release, mock_acquire):
+    model = MagicMock()
+    model.transcribe.return_value = {"text": " Hi", "segments": [
+        {"id": 0, "start": 1.0, "end": 2.0, "text": " Hi", "words": [{"word": " Hi", "start": 1.0, "end": 2.0}]}
+    ]}
+    mock_acquire.return_value = model
+    
+    segments = whisper_service._transcribe_chunk(np.zeros(16000, dtype=np.float32), "base", 120.0)
+    
+    assert segments[0]["start"] == 121.0
+    assert segments[0]["end"] == 122.0
+    assert segments[0]["words"][0]["start"] == 121.0
+    mock_release.assert_called_once_with(model, "base")
+
+@patch('services.whisper_service.whisper')
+def test_load_audio_reads_16k_wav_without_ffmpeg(mock_whisper, tmp_path):
+    import wave
+    samples = np.array([0, 16384, -16384, 32767], dtype=np.int16)
+    wav_path = str(tmp_path / "audio.wav")
+    with wave.open(wav_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    
+    audio = whisper_service.load_audio(wav_path)
+    
+    mock_whisper.load_audio.assert_not_called()
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, samples / 32768.0)
+
+@patch('services.whisper_service.ProcessPoolExecutor')
+def test_chunk_pools_are_kept_per_model_and_shut_down(mock_executor, monkeypatch):
+    monkeypatch.setattr(whisper_service, "CHUNK_WORKERS", 0)
+    monkeypatch.setattr(whisper_service.worker_pool, "nested_worker_count", lambda: 3)
+    monkeypatch.setattr(whisper_service.worker_pool, "_nested_pool_shutdowns", [])
+    mock_executor.side_effect = lambda **kwargs: MagicMock(kwargs=kwargs)
+    
+    base = whisper_service._get_chunk_executor("base")
+    small = whisper_service._get_chunk_executor("small")
+    
+    assert whisper_service._get_chunk_executor("base") is base and small is not base
+    assert base.kwargs["max_workers"] == 3
+    assert base.kwargs["initargs"] == ("base", 3) and small.kwargs["initargs"] == ("small", 3)
+    
+    whisper_service.worker_pool.shutdown()
+    
+    base.shutdown.assert_called_once()
+    small.shutdown.assert_called_once()
+    assert whisper_service._chunk_executors == {}
+
+def test_malformed_settings_fall_back_to_defaults(monkeypatch):
+    import importlib
+    monkeypatch.setenv("WHISPER_MODEL_INSTANCES", "two")
+    monkeypatch.setenv("WHISPER_CHUNK_WORKERS", "4x")
+    try:
+        module = importlib.reload(whisper_service)
+        assert module.MAX_MODEL_INSTANCES == 1
+        assert module.CHUNK_WORKERS == 0
+    finally:
+        monkeypatch.delenv("WHISPER_MODEL_INSTANCES")
+        monkeypatch.delenv("WHISPER_CHUNK_WORKERS")
+        importlib.reload(whisper_service)
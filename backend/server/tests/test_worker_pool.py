@@ -0,0 +1,59 @@
+import pytest
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import worker_pool
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Start a single-worker pool and shut it down after the test"""
+    monkeypatch.setenv("ANALYSIS_WORKERS", "1")
+    monkeypatch.setattr(worker_pool, "PRELOAD_MODULES", [])
+    worker_pool.shutdown()
+    yield
+    worker_pool.shutdown()
+
+def test_get_worker_count(monkeypatch):
+    monkeypatch.setenv("ANALYSIS_WORKERS", "3")
+    assert worker_pool.get_worker_count() == 3
+    
+    monkeypatch.setenv("ANALYSIS_WORKERS", "invalid")
+    assert worker_pool.get_worker_count() == worker_pool.DEFAULT_ANALYSIS_WORKERS
+
+def test_disabled_pool_runs_in_process():
+    # conftest sets ANALYSIS_WORKERS=0
+    assert worker_pool.get_executor() is None
+    assert worker_pool.call_in_worker(os.getpid) == os.getpid()
+    assert asyncio.run(worker_pool.run_in_worker(sum, [1, 2, 3])) == 6
+
+def test_run_in_worker_uses_separate_process(pool):
+    worker_pid = asyncio.run(worker_pool.run_in_worker(os.getpid))
+    
+    assert worker_pid != os.getpid()
+    assert worker_pool.call_in_worker(os.getpid) == worker_pid
+
+def test_worker_exceptions_are_reraised(pool):
+    with pytest.raises(FileNotFoundError):
+        worker_pool.call_in_worker(os.stat, "tmp/does-not-exist/audio.mp3")
+
+def test_nested_pools_share_the_cores_between_workers(monkeypatch):
+    monkeypatch.setattr(worker_pool.os, "cpu_count", lambda: 8)
+    monkeypatch.setenv("ANALYSIS_WORKERS", "2")
+    assert worker_pool.nested_worker_count() == 4
+    
+    monkeypatch.setenv("ANALYSIS_WORKERS", "0")
+    assert worker_pool.nested_worker_count() == 8
+
+def test_shutdown_closes_registered_nested_pools(monkeypatch):
+    monkeypatch.setattr(worker_pool, "_nested_pool_shutdowns", [])
+    shutdown_pool = MagicMock()
+    worker_pool.register_nested_pool(shutdown_pool)
+    worker_pool.register_nested_pool(shutdown_pool)
+    
+    worker_pool.shutdown()
+    
+    shutdown_pool.assert_called_once()